@@ -17,8 +17,16 @@ interface EligibilityResult {
   employability_rate: number;
   message: string;
   eligible_students_list: EligibleStudent[];
+  page: number;
+  page_size: number;
+  total_pages: number;
+  sort_by: string;
+  order: string;
 }
 
+// The API returns eligible students one page at a time
+const EXPORT_PAGE_SIZE = 1000;
+
 export default function TAEligibility() {
   const [result, setResult] = useState<EligibilityResult | null>(null);
   const [loading, setLoading] = useState(false);
@@ -49,14 +57,44 @@ export default function TAEligibility() {
     fetchEligibility();
   }, []);
 
-  const exportToCSV = () => {
-    if (!result || !result.eligible_students_list) return;
+  const fetchAllEligibleStudents = async (): Promise<EligibleStudent[]> => {
+    const apiUrl = process.env.NEXT_PUBLIC_API_URL;
+    const students: EligibleStudent[] = [];
+    let page = 1;
+    let totalPages = 1;
+    
+    do {
+      const response = await fetch(
+        `${apiUrl}/api/admin/eligibility?page=${page}&page_size=${EXPORT_PAGE_SIZE}&sort_by=eligibility_score&order=desc`
+      );
+      if (!response.ok) {
+        throw new Error("Failed to fetch TA eligibility data");
+      }
+      const data: EligibilityResult = await response.json();
+      students.push(...data.eligible_students_list);
+      totalPages = data.total_pages;
+      page += 1;
+    } while (page <= totalPages);
+    
+    return students;
+  };
+
+  const exportToCSV = async () => {
+    if (!result) return;
+    
+    let students: EligibleStudent[];
+    try {
+      students = await fetchAllEligibleStudents();
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "An error occurred");
+      return;
+    }
 
     // Create CSV header
     const headers = ["Student ID", "Name", "Average Score", "Program", "Eligibility Score"];
     
     // Create CSV rows
-    const rows = result.eligible_students_list.map(student => [
+    const rows = students.map(student => [
       student.student_id,
       student.name,
       student.average_score.toString(),
@@ -0,0 +1,105 @@
+"""
+Application settings.
+All values can be overridden with environment variables (STRATUS_*).
+"""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+
+def _env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    value = os.getenv(name)
+    return value if value not in (None, "") else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = _env_str(name)
+    return int(value) if value is not None else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = _env_str(name)
+    return float(value) if value is not None else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = _env_str(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Directory holding the trained model pickles
+MODELS_DIR = Path(__file__).parent / "models"
+
+# Seconds between checks of MODELS_DIR for new model versions (<stem>@<version>.pkl
+# next to the original artefact) or changed files, which are then validated and
+# hot-swapped without a restart; 0 disables hot reload
+MODEL_POLL_INTERVAL: float = _env_float("STRATUS_MODEL_POLL_INTERVAL", 5.0)
+
+# Load a model from its compact bundle (<stem>.bundle/ next to the pickle, written
+# by `python -m app.services.model_store export`) when the bundle matches the
+# pickle; falls back to the pickle otherwise
+MODEL_BUNDLES: bool = _env_bool("STRATUS_MODEL_BUNDLES", True)
+
+# Shared cache directory for memory-mapped model artefacts. When set, each pickle
+# is converted once into an uncompressed joblib file there and loaded with
+# mmap_mode="r", so the NumPy arrays inside the models are shared read-only
+# between uvicorn workers instead of copied into every process.
+MODEL_CACHE_DIR: Optional[str] = _env_str("STRATUS_MODEL_CACHE_DIR")
+
+# Micro-batching of single-student prediction requests: requests arriving within
+# the window (or until the batch is full) are scored together in one model call
+BATCHING_ENABLED: bool = _env_bool("STRATUS_BATCHING_ENABLED", True)
+BATCH_WINDOW_MS: float = _env_float("STRATUS_BATCH_WINDOW_MS", 2.0)
+BATCH_MAX_SIZE: int = _env_int("STRATUS_BATCH_MAX_SIZE", 64)
+
+# Dedicated executor for CPU-bound model inference, so the event loop (and
+# /health) stays responsive while predictions run
+INFERENCE_THREADS: int = _env_int("STRATUS_INFERENCE_THREADS", min(4, os.cpu_count() or 1))
+# "thread" (default) shares the inference thread pool; "process" runs the heavier
+# recommendation model in its own pool of worker processes
+RECOMMENDATION_EXECUTOR: str = _env_str("STRATUS_RECOMMENDATION_EXECUTOR", "thread")
+RECOMMENDATION_PROCESSES: int = _env_int("STRATUS_RECOMMENDATION_PROCESSES", 2)
+
+# Score tree ensembles and logistic regressions with compiled NumPy evaluators
+# (flattened trees / closed-form sigmoid) instead of the generic sklearn path
+COMPILED_INFERENCE: bool = _env_bool("STRATUS_COMPILED_INFERENCE", False)
+
+# In-process cache of prediction results keyed on the request and the model
+# file's fingerprint (size 0 disables it; TTL in seconds)
+PREDICTION_CACHE_SIZE: int = _env_int("STRATUS_PREDICTION_CACHE_SIZE", 10000)
+PREDICTION_CACHE_TTL: float = _env_float("STRATUS_PREDICTION_CACHE_TTL", 3600.0)
+
+# Logging: level and format ("json" or "text") for the app.* loggers, plus
+# per-endpoint sampling of INFO/DEBUG records, e.g. "success=0.01,dropout=0.1"
+# (bare names refer to app.routers.<name>; warnings and errors are never sampled)
+LOG_LEVEL: str = _env_str("STRATUS_LOG_LEVEL", "INFO")
+LOG_FORMAT: str = _env_str("STRATUS_LOG_FORMAT", "json")
+LOG_SAMPLING: str = _env_str("STRATUS_LOG_SAMPLING", "")
+
+# Cache-Control max-age (seconds) sent with enrollment forecasts; clients
+# revalidate with If-None-Match against the forecast's ETag afterwards
+FORECAST_CACHE_MAX_AGE: int = _env_int("STRATUS_FORECAST_MAX_AGE", 300)
+
+# Threads used to fit enrollment series in parallel (groups of series that
+# share the same training years are fitted together)
+FORECAST_FIT_WORKERS: int = _env_int("STRATUS_FORECAST_FIT_WORKERS", os.cpu_count() or 1)
+
+# File the fitted enrollment series are stored in (NumPy .npz, replaced
+# atomically on every fit). Each worker process reloads it when it changes,
+# so series fitted through one uvicorn worker are served by all of them and
+# survive restarts
+FORECAST_SERIES_PATH: Path = Path(_env_str("STRATUS_FORECAST_SERIES_PATH", str(Path(__file__).parent.parent / "data" / "enrollment_series.npz")))
+
+# Student roster scored by GET /api/admin/eligibility (CSV, or Parquet when
+# pyarrow/fastparquet is installed). Scores are cached until the file changes.
+# The default is the synthetic sample roster shipped with the repo (written by
+# benchmarks.profiles.write_roster); deployments point this at the real one
+TA_ROSTER_PATH: Path = Path(_env_str("STRATUS_TA_ROSTER_PATH", str(Path(__file__).parent.parent / "samples" / "ta_roster.csv")))
+
+# Training CSV (scholarship_status, baccalaureate_score, origin_governorate,
+# chosen_program) to rebuild the segmentation encoders, scaler and KMeans from
+# at startup instead of loading the pickled model
+SEGMENTATION_TRAINING_CSV: Optional[str] = _env_str("STRATUS_SEGMENTATION_TRAINING_CSV")
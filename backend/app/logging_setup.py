@@ -0,0 +1,142 @@
+"""
+Logging Setup
+Structured, sampled logging for the app.* loggers. Records are filtered and
+sampled on the calling thread, then handed to a queue and written by a
+background listener thread, so request handlers never block on stream I/O.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from typing import Dict, Optional
+
+from app import config
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of INFO/DEBUG records per logger.
+
+    Rates are matched on the longest logger-name prefix, so "app.routers.success"
+    also covers its children. WARNING and above always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(sorted(rates.items(), key=lambda item: len(item[0]), reverse=True))
+
+    def _rate_for(self, name: str) -> float:
+        for prefix, rate in self.rates.items():
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the args and render any traceback on the calling thread (the objects
+        # may change or be gone by the time the listener gets to the record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+def parse_sampling(spec: str) -> Dict[str, float]:
+    """Parse "success=0.01,app.services=0.5" into {logger name: rate}."""
+    rates = {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, sep, rate = part.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid log sampling entry '{part}'. Expected name=rate")
+        name = name.strip()
+        if "." not in name:
+            name = f"app.routers.{name}"
+        rates[name] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None, sampling: Optional[str] = None):
+    """
+    Configure the "app" logger hierarchy (idempotent).
+
+    Uvicorn's own loggers are left alone; app.* records do not propagate to the
+    root logger, so they are written exactly once by the queue listener.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or config.LOG_LEVEL).upper()
+    fmt = (fmt or config.LOG_FORMAT).lower()
+    rates = parse_sampling(config.LOG_SAMPLING if sampling is None else sampling)
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if fmt == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    if rates:
+        queue_handler.addFilter(SamplingFilter(rates))
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(level)
+    app_logger.handlers[:] = [queue_handler]
+    app_logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,11 +1,49 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import success, dropout, recommendation, enrollment, segmentation, ta_eligibility, student_ta_eligibility
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.logging_setup import setup_logging
+
+# Structured, sampled app.* logging written from a background thread (STRATUS_LOG_*).
+# Configured before the routers are imported, since some services load their models at import.
+setup_logging()
+
+from app.routers import success, dropout, recommendation, enrollment, segmentation, ta_eligibility, student_ta_eligibility, models
+from app.services.warmup import warm_up_models
+from app.services.model_registry import model_registry
+from app.services.inference_executor import get_executor_stats, shutdown_executors
+from app.services.prediction_cache import prediction_cache
+from app.services.metrics import REQUESTS, REQUEST_LATENCY, render_metrics
+
+
+async def _warm_up(app: FastAPI):
+    """Load and warm all models off the event loop, then mark the worker ready."""
+    app.state.model_status = await asyncio.to_thread(warm_up_models)
+    app.state.ready = True
+    # Watch app/models for new model versions once the current ones are live
+    model_registry.start_polling()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start serving immediately (/health stays up) and warm the models in the background
+    app.state.ready = False
+    app.state.model_status = {}
+    warmup_task = asyncio.create_task(_warm_up(app))
+    yield
+    warmup_task.cancel()
+    model_registry.stop_polling()
+    shutdown_executors()
+
 
 app = FastAPI(
     title="Stratus ML API",
     description="Machine Learning API for Student Success Prediction",
-    version="0.7.2"
+    version="0.7.2",
+    lifespan=lifespan
 )
 
 # CORS - Allow frontend access
@@ -17,6 +55,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and time them per route template (unmatched paths share one label)."""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint, request.method)
+        REQUESTS.inc(endpoint, request.method, str(status))
+
+
 # Active routers
 app.include_router(success.router, prefix="/api/predict", tags=["Success Prediction"])
 app.include_router(dropout.router, prefix="/api/predict", tags=["Dropout Prediction"])
@@ -25,6 +80,7 @@ app.include_router(enrollment.router, prefix="/api/admin", tags=["Enrollment For
 app.include_router(segmentation.router, prefix="/api/student", tags=["Student Segmentation"])
 app.include_router(ta_eligibility.router, prefix="/api/admin", tags=["TA Eligibility"])
 app.include_router(student_ta_eligibility.router, prefix="/api/student", tags=["Student TA Check"])
+app.include_router(models.router, prefix="/api/admin", tags=["Model Registry"])
 
 @app.get("/")
 async def root():
@@ -39,10 +95,43 @@ async def root():
             "ta_eligibility": "/api/admin/eligibility",
             "student_ta_check": "/api/student/ta-check",
             "student_segmentation": "/api/student/segment",
+            "models": "/api/admin/models",
+            "ready": "/ready",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "inference": get_executor_stats(),
+        "prediction_cache": prediction_cache.stats()
+    }
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe for the load balancer.
+    
+    Returns 503 until every model has been loaded and warmed. Afterwards it
+    returns 200 with the per-model status; models that failed to load are
+    reported as "degraded" rather than keeping the worker out of rotation,
+    since a retry on another worker would fail the same way.
+    """
+    if not getattr(app.state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    
+    failed = [name for name, status in app.state.model_status.items() if status["status"] != "ready"]
+    return {
+        "status": "degraded" if failed else "ready",
+        "models": app.state.model_status
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request, per-stage latency, cache and model-load metrics in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
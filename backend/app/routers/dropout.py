@@ -1,8 +1,92 @@
+import logging
+from functools import lru_cache
+
 from fastapi import APIRouter, HTTPException
-from app.schemas.dropout import DropoutPredictionRequest, DropoutPredictionResponse
-from app.services.dropout_service import get_dropout_service
+from app.schemas.dropout import (
+    DropoutPredictionRequest,
+    DropoutPredictionResponse,
+    DropoutBatchRequest,
+    DropoutBatchResponse,
+)
+from app.services.dropout_service import (
+    CONCERN_ACADEMIC,
+    CONCERN_INTERNSHIP,
+    CONCERN_LINKEDIN,
+    CONCERN_PORTFOLIO,
+    CONCERN_PROJECTS,
+    CONCERN_SKILLS,
+    FACTOR_TEMPLATES,
+    get_dropout_service,
+)
+from app.services.factors import factor_flags, render_factors
+from app.services.prediction_cache import prediction_cache
+from app.services.model_registry import model_registry
+from app.services.batching import MicroBatcher
+from app.services.inference_executor import inference_executor
+from app.services.metrics import stage_timer
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Concurrent single-student requests are scored together in one model call
+_batcher = MicroBatcher("dropout", lambda students: get_dropout_service().predict_many(students), executor=inference_executor)
+
+# Advice per concern flag, in the order it is given
+HIGH_RISK_ADVICE = [
+    (CONCERN_ACADEMIC, (
+        "CRITICAL: Enroll in intensive academic support programs immediately",
+        "Schedule weekly meetings with academic advisor",
+        "Access tutoring services for challenging courses",
+    )),
+    (CONCERN_SKILLS, (
+        "URGENT: Improve technical and soft skills through workshops and training",
+        "Join communication skills development programs",
+    )),
+    (CONCERN_PROJECTS, (
+        "Start working on projects immediately - aim for at least 4 completed projects",
+        "Join project-based learning groups",
+    )),
+    (CONCERN_INTERNSHIP, (
+        "CRITICAL: Secure an internship as soon as possible (min 3 months)",
+        "Visit career services for internship opportunities",
+    )),
+    (CONCERN_PORTFOLIO, ("Create a professional portfolio showcasing your work",)),
+    (CONCERN_LINKEDIN, ("Create a LinkedIn profile and build your professional network",)),
+]
+
+MEDIUM_RISK_ADVICE = [
+    (CONCERN_ACADEMIC, (
+        "Strengthen academic skills through tutoring and study groups",
+        "Monitor grades closely and seek help early if struggling",
+    )),
+    (CONCERN_SKILLS, (
+        "Develop technical and communication skills through workshops",
+        "Practice presentation and collaboration skills",
+    )),
+    (CONCERN_PROJECTS, ("Increase project involvement - aim for 4+ projects",)),
+]
+
+# Low-risk advice per confidence level
+LOW_RISK_ADVICE = {
+    "High": (
+        "Excellent retention profile! Keep up the great work",
+        "Consider becoming a peer mentor to help at-risk students",
+        "Explore leadership opportunities and extracurricular activities",
+        "Focus on building skills for career success",
+    ),
+    "Medium": (
+        "Good retention indicators - maintain your current path",
+        "Continue strong academic performance",
+        "Stay engaged with campus community",
+        "Build professional network through internships and projects",
+    ),
+    "Low": (
+        "Low risk but stay vigilant - maintain consistent effort",
+        "Monitor your academic performance each semester",
+        "Keep up with coursework and don't fall behind",
+        "Use academic resources when needed",
+    ),
+}
 
 @router.post("/dropout", response_model=DropoutPredictionResponse)
 async def predict_dropout(request: DropoutPredictionRequest):
@@ -11,126 +95,133 @@ async def predict_dropout(request: DropoutPredictionRequest):
     Based on enrollment and demographic data.
     """
     try:
-        # Get the dropout prediction service
-        service = get_dropout_service()
-        
         # Convert request to dictionary
         student_data = request.model_dump()
         
-        # Debug logging
-        print(f"\n=== Dropout API Request Received ===")
-        print(f"Baccalaureate Score: {student_data.get('baccalaureate_score')} (type: {type(student_data.get('baccalaureate_score'))})")
-        print(f"Full request: {student_data}")
+        logger.debug("Dropout request received", extra={"request": student_data})
         
-        # Get prediction from ML model
-        prediction = service.predict(student_data)
+        # Get prediction from ML model (repeated profiles are served from the cache)
+        cache_key = prediction_cache.make_key("dropout", model_registry.active_path("dropout"), student_data)
+        prediction = prediction_cache.get(cache_key)
+        if prediction is None:
+            prediction = await _batcher.submit(student_data)
+            prediction_cache.set(cache_key, prediction)
         
-        print(f"Dropout prediction result: {prediction['dropout_probability']}")
+        logger.debug("Dropout prediction result: %s", prediction["dropout_probability"])
         
         # Generate recommendations
-        recommendations = _generate_recommendations(
-            prediction["dropout_prediction"],
-            prediction["confidence"],
-            prediction["factors"]
-        )
-        
-        return DropoutPredictionResponse(
-            dropout_prediction=prediction["dropout_prediction"],
-            dropout_probability=prediction["dropout_probability"],
-            retention_probability=prediction["retention_probability"],
-            confidence=prediction["confidence"],
-            factors=prediction["factors"],
-            recommendations=recommendations
-        )
+        with stage_timer("dropout", "recommendations"):
+            recommendations = _generate_recommendations(
+                prediction["dropout_prediction"],
+                prediction["confidence"],
+                prediction["factors"]
+            )
+        
+        with stage_timer("dropout", "serialization"):
+            return DropoutPredictionResponse(
+                dropout_prediction=prediction["dropout_prediction"],
+                dropout_probability=prediction["dropout_probability"],
+                retention_probability=prediction["retention_probability"],
+                confidence=prediction["confidence"],
+                factors=render_factors(prediction["factors"], FACTOR_TEMPLATES),
+                recommendations=recommendations
+            )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dropout prediction failed: {str(e)}")
 
 
-def _generate_recommendations(prediction: str, confidence: str, factors: dict) -> list[str]:
+@router.post("/dropout/batch", response_model=DropoutBatchResponse)
+async def predict_dropout_batch(request: DropoutBatchRequest):
+    """
+    Predict dropout risk for a whole cohort in one call.
+    The students are scored together in a single vectorized model pass
+    and results are returned in request order, along with how many
+    students in the cohort have each factor.
+    """
+    try:
+        service = get_dropout_service()
+        
+        students = [student.model_dump() for student in request.students]
+        predictions = await inference_executor.run(service.predict_many, students)
+        
+        # Cohort-level factor counts straight from the code matrix
+        factor_counts = await inference_executor.run(service.factor_counts, students)
+        
+        with stage_timer("dropout_batch", "recommendations"):
+            recommendations = [
+                _generate_recommendations(
+                    prediction["dropout_prediction"],
+                    prediction["confidence"],
+                    prediction["factors"]
+                )
+                for prediction in predictions
+            ]
+        
+        with stage_timer("dropout_batch", "serialization"):
+            results = [
+                DropoutPredictionResponse(
+                    dropout_prediction=prediction["dropout_prediction"],
+                    dropout_probability=prediction["dropout_probability"],
+                    retention_probability=prediction["retention_probability"],
+                    confidence=prediction["confidence"],
+                    factors=render_factors(prediction["factors"], FACTOR_TEMPLATES),
+                    recommendations=student_recommendations
+                )
+                for prediction, student_recommendations in zip(predictions, recommendations)
+            ]
+            
+            return DropoutBatchResponse(
+                count=len(results),
+                factor_counts={code.name.lower(): count for code, count in factor_counts.items()},
+                results=results
+            )
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch dropout prediction failed: {str(e)}")
+
+
+def _generate_recommendations(prediction: str, confidence: str, factors: tuple) -> tuple:
     """
     Generate personalized recommendations based on dropout risk prediction.
+    
+    The advice is selected from the concern flags of the structured factors;
+    students with the same prediction, confidence and concerns share one
+    (immutable) recommendation tuple.
     """
+    if prediction == "Low Risk":
+        # Low-risk advice does not depend on the concerns
+        return _recommendation_list(prediction, confidence, 0)
+    return _recommendation_list(prediction, confidence, factor_flags(factors, FACTOR_TEMPLATES))
+
+
+@lru_cache(maxsize=None)
+def _recommendation_list(prediction: str, confidence: str, flags: int) -> tuple:
+    """Recommendations for one factor signature (at most a few hundred distinct tuples, memoized)"""
     recommendations = []
     
     if prediction == "High Risk":
         recommendations.append("URGENT: Immediate intervention required to prevent dropout")
-        
-        # Check specific concerns
-        has_academic_concern = any("average" in concern.lower() or "baccalaureate" in concern.lower() for concern in factors["concerns"])
-        has_skills_concern = any("skills" in concern.lower() for concern in factors["concerns"])
-        has_projects_concern = any("projects" in concern.lower() for concern in factors["concerns"])
-        has_internship_concern = any("internship" in concern.lower() for concern in factors["concerns"])
-        has_portfolio_concern = any("portfolio" in concern.lower() for concern in factors["concerns"])
-        has_linkedin_concern = any("linkedin" in concern.lower() for concern in factors["concerns"])
-        
-        if has_academic_concern:
-            recommendations.append("CRITICAL: Enroll in intensive academic support programs immediately")
-            recommendations.append("Schedule weekly meetings with academic advisor")
-            recommendations.append("Access tutoring services for challenging courses")
-        
-        if has_skills_concern:
-            recommendations.append("URGENT: Improve technical and soft skills through workshops and training")
-            recommendations.append("Join communication skills development programs")
-        
-        if has_projects_concern:
-            recommendations.append("Start working on projects immediately - aim for at least 4 completed projects")
-            recommendations.append("Join project-based learning groups")
-        
-        if has_internship_concern:
-            recommendations.append("CRITICAL: Secure an internship as soon as possible (min 3 months)")
-            recommendations.append("Visit career services for internship opportunities")
-        
-        if has_portfolio_concern:
-            recommendations.append("Create a professional portfolio showcasing your work")
-        
-        if has_linkedin_concern:
-            recommendations.append("Create a LinkedIn profile and build your professional network")
-        
+        for flag, advice in HIGH_RISK_ADVICE:
+            if flags & flag:
+                recommendations.extend(advice)
         recommendations.append("Register for early warning system and progress monitoring")
         recommendations.append("Maintain regular contact with student success center")
         
     elif prediction == "Medium Risk":
         recommendations.append("Moderate risk detected - proactive measures recommended")
-        
-        has_academic_concern = any("average" in concern.lower() or "baccalaureate" in concern.lower() for concern in factors["concerns"])
-        has_skills_concern = any("skills" in concern.lower() for concern in factors["concerns"])
-        has_projects_concern = any("projects" in concern.lower() for concern in factors["concerns"])
-        
-        if has_academic_concern:
-            recommendations.append("Strengthen academic skills through tutoring and study groups")
-            recommendations.append("Monitor grades closely and seek help early if struggling")
-        
-        if has_skills_concern:
-            recommendations.append("Develop technical and communication skills through workshops")
-            recommendations.append("Practice presentation and collaboration skills")
-        
-        if has_projects_concern:
-            recommendations.append("Increase project involvement - aim for 4+ projects")
-        
+        for flag, advice in MEDIUM_RISK_ADVICE:
+            if flags & flag:
+                recommendations.extend(advice)
         recommendations.append("Build connections with peers and faculty for support network")
         recommendations.append("Use time management tools to balance coursework effectively")
         recommendations.append("Set clear academic goals and track progress regularly")
         recommendations.append("Utilize campus resources (library, career center, counseling)")
         
     else:  # Low Risk
-        if confidence == "High":
-            recommendations.append("Excellent retention profile! Keep up the great work")
-            recommendations.append("Consider becoming a peer mentor to help at-risk students")
-            recommendations.append("Explore leadership opportunities and extracurricular activities")
-            recommendations.append("Focus on building skills for career success")
-        elif confidence == "Medium":
-            recommendations.append("Good retention indicators - maintain your current path")
-            recommendations.append("Continue strong academic performance")
-            recommendations.append("Stay engaged with campus community")
-            recommendations.append("Build professional network through internships and projects")
-        else:  # Low confidence
-            recommendations.append("Low risk but stay vigilant - maintain consistent effort")
-            recommendations.append("Monitor your academic performance each semester")
-            recommendations.append("Keep up with coursework and don't fall behind")
-            recommendations.append("Use academic resources when needed")
+        recommendations.extend(LOW_RISK_ADVICE.get(confidence, LOW_RISK_ADVICE["Low"]))
     
     # Add general recommendations
     recommendations.append("Regular check-ins with advisors help catch issues early")
     
-    return recommendations
+    return tuple(recommendations)
@@ -1,11 +1,67 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas.enrollment import EnrollmentForecastRequest, EnrollmentForecastResponse
+import logging
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from app import config
+from app.schemas.enrollment import (
+    EnrollmentBatchForecastRequest,
+    EnrollmentBatchForecastResponse,
+    EnrollmentForecastRequest,
+    EnrollmentForecastResponse,
+    EnrollmentSeriesFitRequest,
+    EnrollmentSeriesFitResponse,
+)
 from app.services.enrollment_service import get_enrollment_service
+from app.services.inference_executor import inference_executor
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _cache_headers(etag: str) -> dict:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={config.FORECAST_CACHE_MAX_AGE}, must-revalidate",
+    }
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+@router.get("/forecast", response_model=EnrollmentForecastResponse)
+async def get_enrollment_forecast(
+    request: Request,
+    response: Response,
+    years_ahead: int = Query(default=5, ge=1, le=10, description="Number of years to forecast (1-10)"),
+):
+    """
+    Cacheable enrollment forecast for dashboards that poll.
+    Responses carry an ETag; sending it back in If-None-Match returns
+    304 Not Modified while the model is unchanged.
+    """
+    try:
+        service = get_enrollment_service()
+        etag = service.forecast_etag(years_ahead)
+        headers = _cache_headers(etag)
+        
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        
+        response.headers.update(headers)
+        return service.forecast(years_ahead)
+        
+    except Exception as e:
+        logger.exception("Error in enrollment forecast endpoint")
+        raise HTTPException(status_code=500, detail=f"Forecast failed: {str(e)}")
+
 
 @router.post("/forecast", response_model=EnrollmentForecastResponse)
-async def forecast_enrollment(request: EnrollmentForecastRequest):
+async def forecast_enrollment(request: EnrollmentForecastRequest, response: Response):
     """
     Forecast student enrollment for upcoming years using time series model.
     Uses polynomial regression to predict enrollment trends.
@@ -13,19 +69,71 @@ async def forecast_enrollment(request: EnrollmentForecastRequest):
     try:
         service = get_enrollment_service()
         
-        print(f"\n=== Enrollment Forecast Request ===")
-        print(f"Years ahead: {request.years_ahead}")
+        logger.debug("Enrollment forecast request: years_ahead=%s", request.years_ahead)
         
-        # Get forecast
+        # Precomputed at model load, so a dictionary lookup (no executor needed)
         forecast_data = service.forecast(request.years_ahead)
+        response.headers.update(_cache_headers(service.forecast_etag(request.years_ahead)))
         
-        print(f"Forecast generated for {len(forecast_data['forecasts'])} years")
-        print(f"Total growth: {forecast_data['total_growth']}%")
+        logger.debug("Forecast generated for %d years (total growth %s%%)",
+                     len(forecast_data["forecasts"]), forecast_data["total_growth"])
         
-        return EnrollmentForecastResponse(**forecast_data)
+        return forecast_data
         
     except Exception as e:
-        import traceback
-        print(f"\n❌ ERROR in enrollment forecast:")
-        print(traceback.format_exc())
+        logger.exception("Error in enrollment forecast endpoint")
         raise HTTPException(status_code=500, detail=f"Forecast failed: {str(e)}")
+
+
+@router.post("/forecast/series/fit", response_model=EnrollmentSeriesFitResponse)
+async def fit_enrollment_series(request: EnrollmentSeriesFitRequest):
+    """
+    Fit and store enrollment trends for many series (e.g. per campus and program).
+    Series sharing the same training years are fitted together and the
+    groups run in parallel; refitting an existing key replaces it.
+    """
+    try:
+        service = get_enrollment_service()
+        
+        series = [item.model_dump() for item in request.series]
+        summaries = await inference_executor.run(service.fit_series, series, request.degree)
+        
+        return EnrollmentSeriesFitResponse(
+            count=len(summaries),
+            total_series=len(service.series_keys()),
+            series=summaries
+        )
+        
+    except ValueError as e:
+        logger.error("Validation error in enrollment series fit: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error in enrollment series fit endpoint")
+        raise HTTPException(status_code=500, detail=f"Series fit failed: {str(e)}")
+
+
+@router.post("/forecast/series", response_model=EnrollmentBatchForecastResponse)
+async def forecast_enrollment_series(request: EnrollmentBatchForecastRequest):
+    """
+    Forecast every requested series (all stored series by default) in one call.
+    The polynomials of all series are evaluated together in a single
+    vectorized pass.
+    """
+    try:
+        service = get_enrollment_service()
+        
+        forecasts = await inference_executor.run(service.forecast_series, request.years_ahead, request.keys)
+        
+        logger.debug("Forecast generated for %d series over %d years", len(forecasts), request.years_ahead)
+        
+        return EnrollmentBatchForecastResponse(
+            count=len(forecasts),
+            years_ahead=request.years_ahead,
+            series=forecasts
+        )
+        
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except Exception as e:
+        logger.exception("Error in enrollment series forecast endpoint")
+        raise HTTPException(status_code=500, detail=f"Series forecast failed: {str(e)}")
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+
+from fastapi import APIRouter
+from app.schemas.models import ModelRegistryResponse
+from app.services.model_registry import model_registry
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _registry_status(swapped=None) -> ModelRegistryResponse:
+    return ModelRegistryResponse(
+        poll_interval_seconds=model_registry.poll_interval,
+        polling=model_registry.polling,
+        models=model_registry.status(),
+        swapped=swapped or [],
+    )
+
+
+@router.get("/models", response_model=ModelRegistryResponse)
+async def get_models():
+    """
+    Active model version of every endpoint.
+    
+    Lists the artefact each model service is serving, when it was loaded,
+    the versions available in app/models and why the last new version was
+    rejected, if it was.
+    """
+    return _registry_status()
+
+
+@router.post("/models/refresh", response_model=ModelRegistryResponse)
+async def refresh_models():
+    """
+    Check app/models for new model versions now instead of waiting for the next poll.
+    
+    New versions are loaded and validated off the event loop and swapped in;
+    requests already running finish on the previous version.
+    """
+    swapped = await asyncio.to_thread(model_registry.check_for_updates)
+    if swapped:
+        logger.info("Model refresh swapped: %s", ", ".join(swapped))
+    return _registry_status(swapped)
@@ -1,8 +1,20 @@
+import logging
+
 from fastapi import APIRouter, HTTPException
 from app.schemas.recommendation import ProgramRecommendationRequest, ProgramRecommendationResponse
-from app.services.recommendation_service import get_recommendation_service
+from app.services.recommendation_service import recommend_many
+from app.services.prediction_cache import prediction_cache
+from app.services.model_registry import model_registry
+from app.services.batching import MicroBatcher
+from app.services.inference_executor import recommendation_executor
+from app.services.metrics import stage_timer
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Concurrent single-student requests are scored together in one model call
+# (recommend_many is a module-level function so it can also run in a process pool)
+_batcher = MicroBatcher("recommendation", recommend_many, executor=recommendation_executor)
 
 @router.post("/recommend", response_model=ProgramRecommendationResponse)
 async def recommend_program(request: ProgramRecommendationRequest):
@@ -11,35 +23,31 @@ async def recommend_program(request: ProgramRecommendationRequest):
     Based on comprehensive student profile including academic, technical, and soft skills.
     """
     try:
-        # Get the recommendation service
-        service = get_recommendation_service()
-        
         # Convert request to dictionary
         student_data = request.model_dump()
         
-        # Debug logging
-        print(f"\n=== Program Recommendation Request ===")
-        print(f"Academic Strength: Bacc={student_data.get('baccalaureate_score')}, Avg={student_data.get('previous_years_average')}")
-        print(f"Technical: {student_data.get('technical_skills_score')}, Projects={student_data.get('projects_completed')}")
-        print(f"Soft Skills: {student_data.get('soft_skills_score')}, Comm={student_data.get('communication_skills_score')}")
+        logger.debug("Program recommendation request received", extra={"request": student_data})
         
-        # Get recommendation from ML model
-        recommendation = service.predict(student_data)
+        # Get recommendation from ML model (repeated profiles are served from the cache)
+        cache_key = prediction_cache.make_key("recommendation", model_registry.active_path("recommendation"), student_data)
+        recommendation = prediction_cache.get(cache_key)
+        if recommendation is None:
+            recommendation = await _batcher.submit(student_data)
+            prediction_cache.set(cache_key, recommendation)
         
-        print(f"Recommendation: {recommendation['recommended_program']} (Cluster {recommendation['cluster']})")
+        logger.debug("Recommendation: %s (Cluster %s)", recommendation["recommended_program"], recommendation["cluster"])
         
-        return ProgramRecommendationResponse(
-            recommended_program=recommendation["recommended_program"],
-            cluster=recommendation["cluster"],
-            explanation=recommendation["explanation"],
-            confidence=recommendation["confidence"],
-            program_details=recommendation["program_details"],
-            student_profile=recommendation["student_profile"],
-            alternative_programs=recommendation["alternative_programs"]
-        )
+        with stage_timer("recommendation", "serialization"):
+            return ProgramRecommendationResponse(
+                recommended_program=recommendation["recommended_program"],
+                cluster=recommendation["cluster"],
+                explanation=recommendation["explanation"],
+                confidence=recommendation["confidence"],
+                program_details=recommendation["program_details"],
+                student_profile=recommendation["student_profile"],
+                alternative_programs=recommendation["alternative_programs"]
+            )
         
     except Exception as e:
-        import traceback
-        print(f"\n❌ ERROR in recommendation:")
-        print(traceback.format_exc())
+        logger.exception("Error in recommendation endpoint")
         raise HTTPException(status_code=500, detail=f"Recommendation failed: {str(e)}")
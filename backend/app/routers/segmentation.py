@@ -1,6 +1,14 @@
 from fastapi import APIRouter, HTTPException
-from app.schemas.segmentation import SegmentationRequest, SegmentationResponse
+from app.schemas.segmentation import (
+    ClusterSummary,
+    SegmentationBatchRequest,
+    SegmentationBatchResponse,
+    SegmentationRequest,
+    SegmentationResponse,
+)
 from app.services.segmentation_service import segmentation_service
+from app.services.inference_executor import inference_executor
+from app.services.metrics import stage_timer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,17 +32,17 @@ async def segment_student(request: SegmentationRequest):
     - Chosen academic program
     """
     try:
-        logger.info(f"Segmentation request - Score: {request.baccalaureate_score}, "
-                   f"Scholarship: {request.scholarship_status}, "
-                   f"Governorate: {request.origin_governorate}, "
-                   f"Program: {request.chosen_program}")
+        logger.info("Segmentation request - Score: %s, Scholarship: %s, Governorate: %s, Program: %s",
+                    request.baccalaureate_score, request.scholarship_status,
+                    request.origin_governorate, request.chosen_program)
         
         # Perform segmentation
-        result = segmentation_service.segment_student(
-            baccalaureate_score=request.baccalaureate_score,
-            scholarship_status=request.scholarship_status,
-            origin_governorate=request.origin_governorate,
-            chosen_program=request.chosen_program
+        result = await inference_executor.run(
+            segmentation_service.segment_student,
+            request.baccalaureate_score,
+            request.scholarship_status,
+            request.origin_governorate,
+            request.chosen_program
         )
         
         response = SegmentationResponse(
@@ -47,15 +55,70 @@ async def segment_student(request: SegmentationRequest):
             cluster_characteristics=result["cluster_characteristics"]
         )
         
-        logger.info(f"Segmentation successful - Cluster: {result['cluster']} ({result['cluster_name']})")
+        logger.info("Segmentation successful - Cluster: %s (%s)", result["cluster"], result["cluster_name"])
+        
+        return response
+        
+    except ValueError as e:
+        logger.error("Validation error in segmentation: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error in segmentation endpoint: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error during segmentation")
+
+
+
+@router.post("/segment/batch", response_model=SegmentationBatchResponse)
+async def segment_students_batch(request: SegmentationBatchRequest):
+    """
+    Segment a whole cohort in one call
+    
+    All students are encoded through lookup arrays and assigned to their
+    nearest cluster in a single distance computation. Besides the
+    per-student results, the response summarizes the size, share and
+    average baccalaureate score of each cluster for cohort reports.
+    """
+    try:
+        students = [student.model_dump() for student in request.students]
+        results = await inference_executor.run(segmentation_service.segment_many, students)
+        
+        with stage_timer("segmentation_batch", "serialization"):
+            clusters = []
+            for cluster, cluster_name in segmentation_service.cluster_interpretations.items():
+                scores = [s["baccalaureate_score"] for s, r in zip(students, results) if r["cluster"] == cluster]
+                clusters.append(ClusterSummary(
+                    cluster=cluster,
+                    cluster_name=cluster_name,
+                    count=len(scores),
+                    share=round(len(scores) / len(students) * 100, 2),
+                    average_baccalaureate_score=round(sum(scores) / len(scores), 2) if scores else 0.0
+                ))
+            
+            response = SegmentationBatchResponse(
+                count=len(results),
+                clusters=clusters,
+                results=[
+                    SegmentationResponse(
+                        cluster=result["cluster"],
+                        cluster_name=result["cluster_name"],
+                        scholarship_status=student["scholarship_status"],
+                        baccalaureate_score=student["baccalaureate_score"],
+                        origin_governorate=student["origin_governorate"],
+                        chosen_program=student["chosen_program"],
+                        cluster_characteristics=result["cluster_characteristics"]
+                    )
+                    for student, result in zip(students, results)
+                ]
+            )
+        
+        logger.info("Batch segmentation successful - %d students: %s", response.count,
+                    ", ".join(f"cluster {c.cluster}={c.count}" for c in clusters))
         
         return response
         
     except ValueError as e:
-        logger.error(f"Validation error in segmentation: {e}")
+        logger.error("Validation error in batch segmentation: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error in segmentation endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in batch segmentation endpoint: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error during segmentation")
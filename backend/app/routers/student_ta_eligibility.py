@@ -1,6 +1,14 @@
 from fastapi import APIRouter, HTTPException
-from app.schemas.student_ta_eligibility import StudentTAEligibilityRequest, StudentTAEligibilityResponse
-from app.services.student_ta_eligibility_service import student_ta_eligibility_service
+from app.schemas.student_ta_eligibility import (
+    StudentTAEligibilityBatchRequest,
+    StudentTAEligibilityBatchResponse,
+    StudentTAEligibilityRequest,
+    StudentTAEligibilityResponse,
+)
+from app.services.student_ta_eligibility_service import RULES_VERSION, student_ta_eligibility_service
+from app.services.inference_executor import inference_executor
+from app.services.prediction_cache import prediction_cache
+from app.services.metrics import stage_timer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,14 +35,19 @@ async def check_student_ta_eligibility(request: StudentTAEligibilityRequest):
         - recommendations: Personalized improvement suggestions
     """
     try:
-        logger.info(f"Student TA eligibility check - Average: {request.previous_years_average}, "
-                   f"Skills: C{request.communication_skills_score}/T{request.technical_skills_score}/S{request.soft_skills_score}")
+        logger.info("Student TA eligibility check - Average: %s, Skills: C%s/T%s/S%s",
+                    request.previous_years_average, request.communication_skills_score,
+                    request.technical_skills_score, request.soft_skills_score)
         
         # Convert request to dict
         student_data = request.model_dump()
         
-        # Get prediction
-        result = student_ta_eligibility_service.predict_student_eligibility(student_data)
+        # Get prediction (repeated profiles are served from the cache)
+        cache_key = prediction_cache.make_key("student_ta", None, student_data, version=RULES_VERSION)
+        result = prediction_cache.get(cache_key)
+        if result is None:
+            result = await inference_executor.run(student_ta_eligibility_service.predict_student_eligibility, student_data)
+            prediction_cache.set(cache_key, result)
         
         response = StudentTAEligibilityResponse(
             employable=result["employable"],
@@ -43,15 +56,45 @@ async def check_student_ta_eligibility(request: StudentTAEligibilityRequest):
             recommendations=result["recommendations"]
         )
         
-        logger.info(f"Student TA eligibility check successful: {'Eligible' if result['employable'] else 'Not Eligible'} ({result['probability']:.2f}%)")
+        logger.info("Student TA eligibility check successful: %s (%.2f%%)",
+                    "Eligible" if result["employable"] else "Not Eligible", result["probability"])
         
         return response
         
     except ValueError as e:
-        logger.error(f"Validation error in student TA eligibility: {e}")
+        logger.error("Validation error in student TA eligibility: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error in student TA eligibility endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in student TA eligibility endpoint: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error during TA eligibility check")
+
+
+@router.post("/ta-check/batch", response_model=StudentTAEligibilityBatchResponse)
+async def check_student_ta_eligibility_batch(request: StudentTAEligibilityBatchRequest):
+    """
+    Check TA eligibility for many students (e.g. every applicant of a term) in one call
+    
+    All students are scored together with vectorized array operations;
+    each result is identical to the individual /ta-check response.
+    """
+    try:
+        students = [student.model_dump() for student in request.students]
+        results = await inference_executor.run(student_ta_eligibility_service.predict_many, students)
+        
+        with stage_timer("student_ta_batch", "serialization"):
+            response = StudentTAEligibilityBatchResponse(
+                count=len(results),
+                eligible_count=sum(result["employable"] for result in results),
+                results=[StudentTAEligibilityResponse(**result) for result in results]
+            )
+        
+        logger.info("Student TA eligibility batch successful: %d/%d eligible", response.eligible_count, response.count)
+        
+        return response
+        
+    except ValueError as e:
+        logger.error("Validation error in student TA eligibility batch: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Error in student TA eligibility batch endpoint: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error during TA eligibility check")
@@ -1,8 +1,69 @@
-from fastapi import APIRouter, HTTPException
+import csv
+import io
+import itertools
+import json
+import logging
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from app.schemas.success import SuccessPredictionRequest, SuccessPredictionResponse
-from app.services.success_service import get_success_service
+from app.services.success_service import (
+    CONCERN_AGE,
+    CONCERN_SCHOLARSHIP,
+    CONCERN_SCORE,
+    FACTOR_TEMPLATES,
+    get_success_service,
+)
+from app.services.factors import factor_flags, render_factors
+from app.services.prediction_cache import prediction_cache
+from app.services.model_registry import model_registry
+from app.services.batching import MicroBatcher
+from app.services.inference_executor import inference_executor
+from app.services.metrics import stage_timer
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Concurrent single-student requests are scored together in one model call
+_batcher = MicroBatcher("success", lambda students: get_success_service().predict_many(students), executor=inference_executor)
+
+BULK_FORMATS = ("csv", "ndjson")
+
+# Advice per concern flag, in the order it is given
+AT_RISK_ADVICE = [
+    (CONCERN_SCORE, (
+        "Priority: Academic strengthening - Your baccalaureate score is the strongest predictor of success",
+        "Target: Work towards final average ≥ 12/20 (requires strong consistent performance)",
+        "Enroll in intensive academic support and tutoring programs",
+    )),
+    (CONCERN_SCHOLARSHIP, ("Apply for financial aid and scholarships to reduce financial stress",)),
+    (CONCERN_AGE, ("Connect with peer support groups and non-traditional student resources",)),
+]
+
+# Likely-to-succeed advice per confidence level
+SUCCEED_ADVICE = {
+    "High": (
+        "Excellent profile! Your academic foundation predicts strong success",
+        "Consider leadership and mentoring opportunities to help at-risk peers",
+        "Explore advanced coursework and research projects",
+        "Aim for honors and academic excellence programs",
+    ),
+    "Medium": (
+        "Good profile with solid success indicators",
+        "Maintain consistent academic performance to stay above 12/20 threshold",
+        "Build practical skills through internships and projects",
+        "Stay engaged with coursework to maintain your trajectory",
+    ),
+    "Low": (
+        "Borderline prediction - consistent effort is critical",
+        "Monitor your academic performance closely each semester",
+        "Maintain regular contact with academic advisors",
+        "Focus on maintaining grades above the 12/20 success threshold",
+    ),
+}
 
 @router.post("/success", response_model=SuccessPredictionResponse)
 async def predict_success(request: SuccessPredictionRequest):
@@ -11,94 +72,205 @@ async def predict_success(request: SuccessPredictionRequest):
     Based on enrollment and demographic data.
     """
     try:
-        # Get the success prediction service
-        service = get_success_service()
-        
         # Convert request to dictionary
         student_data = request.model_dump()
         
-        # Debug logging
-        print(f"\n=== API Request Received ===")
-        print(f"Baccalaureate Score: {student_data.get('baccalaureate_score')} (type: {type(student_data.get('baccalaureate_score'))})")
-        print(f"Full request: {student_data}")
+        logger.debug("Success request received", extra={"request": student_data})
         
-        # Get prediction from ML model
-        prediction = service.predict(student_data)
+        # Get prediction from ML model (repeated profiles are served from the cache)
+        cache_key = prediction_cache.make_key("success", model_registry.active_path("success"), student_data)
+        prediction = prediction_cache.get(cache_key)
+        if prediction is None:
+            prediction = await _batcher.submit(student_data)
+            prediction_cache.set(cache_key, prediction)
         
-        print(f"Prediction result: {prediction['success_probability']}")
+        logger.debug("Success prediction result: %s", prediction["success_probability"])
         
         # Generate recommendations
-        recommendations = _generate_recommendations(
-            prediction["success_prediction"],
-            prediction["confidence"],
-            prediction["factors"]
-        )
+        with stage_timer("success", "recommendations"):
+            recommendations = _generate_recommendations(
+                prediction["success_prediction"],
+                prediction["confidence"],
+                prediction["factors"]
+            )
         
-        return SuccessPredictionResponse(
-            success_prediction=prediction["success_prediction"],
-            success_probability=prediction["success_probability"],
-            risk_probability=prediction["risk_probability"],
-            confidence=prediction["confidence"],
-            factors=prediction["factors"],
-            recommendations=recommendations
-        )
+        with stage_timer("success", "serialization"):
+            return SuccessPredictionResponse(
+                success_prediction=prediction["success_prediction"],
+                success_probability=prediction["success_probability"],
+                risk_probability=prediction["risk_probability"],
+                confidence=prediction["confidence"],
+                factors=render_factors(prediction["factors"], FACTOR_TEMPLATES),
+                recommendations=recommendations
+            )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
-def _generate_recommendations(prediction: str, confidence: str, factors: dict) -> list[str]:
+@router.post("/success/bulk")
+async def predict_success_bulk(
+    file: UploadFile = File(..., description="CSV (with header) or NDJSON file of student records"),
+    format: Optional[str] = Query(default=None, description="Input format: csv or ndjson (inferred from the file if omitted)"),
+    chunk_size: int = Query(default=1000, ge=1, le=10000, description="Number of records scored per model call"),
+):
+    """
+    Score an uploaded roster of students and stream the results back as NDJSON.
+    
+    Records are read lazily and scored in fixed-size chunks, so memory use
+    stays flat regardless of file size. Each output line carries the 0-based
+    `row` of its input record, followed by either the prediction fields or an
+    `error` for records that fail validation.
+    """
+    input_format = (format or _infer_bulk_format(file)).lower()
+    if input_format not in BULK_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{input_format}'. Must be one of: {list(BULK_FORMATS)}")
+    
+    try:
+        service = get_success_service()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    records = _read_csv_records(text) if input_format == "csv" else _read_ndjson_records(text)
+    
+    return StreamingResponse(
+        _stream_bulk_predictions(service, records, chunk_size),
+        media_type="application/x-ndjson"
+    )
+
+
+def _infer_bulk_format(file: UploadFile) -> str:
+    """Guess the upload format from its content type or file name (defaults to NDJSON)."""
+    content_type = (file.content_type or "").lower()
+    filename = (file.filename or "").lower()
+    if "csv" in content_type or filename.endswith(".csv"):
+        return "csv"
+    return "ndjson"
+
+
+def _read_csv_records(text: io.TextIOBase) -> Iterator[Dict[str, Any]]:
+    """Yield one record per CSV row; empty cells are left out so schema defaults apply."""
+    for row in csv.DictReader(text):
+        yield {key: value for key, value in row.items() if key and value not in ("", None)}
+
+
+def _read_ndjson_records(text: io.TextIOBase) -> Iterator[Any]:
+    """Yield one record per non-blank NDJSON line (or the parse error for that line)."""
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield e
+
+
+async def _stream_bulk_predictions(service, records: Iterator[Any], chunk_size: int) -> AsyncIterator[str]:
+    """Read, validate, score and serialize records chunk by chunk on the inference pool."""
+    numbered = enumerate(records)
+    while True:
+        lines = await inference_executor.run(_score_next_chunk, service, numbered, chunk_size)
+        if not lines:
+            break
+        yield lines
+
+
+def _score_next_chunk(service, numbered: Iterator[tuple], chunk_size: int) -> str:
+    """Pull the next chunk of (row, record) pairs and return its NDJSON lines ("" when exhausted)."""
+    chunk = list(itertools.islice(numbered, chunk_size))
+    return _score_bulk_chunk(service, chunk) if chunk else ""
+
+
+def _score_bulk_chunk(service, chunk: list) -> str:
+    """Score one chunk of (row, record) pairs and return its NDJSON lines."""
+    lines = {}
+    valid_rows = []
+    valid_students = []
+    
+    for row, record in chunk:
+        if isinstance(record, Exception):
+            lines[row] = {"row": row, "error": f"Invalid JSON: {record}"}
+            continue
+        try:
+            valid_students.append(SuccessPredictionRequest.model_validate(record).model_dump())
+            valid_rows.append(row)
+        except ValidationError as e:
+            lines[row] = {"row": row, "error": _format_validation_error(e)}
+    
+    if valid_students:
+        try:
+            predictions = service.predict_many(valid_students)
+        except Exception as e:
+            predictions = [None] * len(valid_students)
+            error = f"Prediction failed: {str(e)}"
+        
+        with stage_timer("success_bulk", "recommendations"):
+            for row, prediction in zip(valid_rows, predictions):
+                if prediction is None:
+                    lines[row] = {"row": row, "error": error}
+                    continue
+                lines[row] = {
+                    "row": row,
+                    **prediction,
+                    "factors": render_factors(prediction["factors"], FACTOR_TEMPLATES),
+                    "recommendations": _generate_recommendations(
+                        prediction["success_prediction"],
+                        prediction["confidence"],
+                        prediction["factors"]
+                    )
+                }
+    
+    with stage_timer("success_bulk", "serialization"):
+        return "".join(json.dumps(lines[row]) + "\n" for row, _ in chunk)
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    """Flatten a pydantic validation error into a single readable line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def _generate_recommendations(prediction: str, confidence: str, factors: tuple) -> tuple:
     """
     Generate personalized recommendations based on prediction.
     
     Note: The model uses final_average >= 12 as success threshold.
     Since final_average ≈ baccalaureate_score * 0.9, students need
     a bacc score of ~13.3+ to be predicted as high performers.
+    
+    The advice is selected from the concern flags of the structured factors;
+    students with the same prediction, confidence and concerns share one
+    (immutable) recommendation tuple.
     """
+    if prediction == "At Risk":
+        return _recommendation_list(prediction, confidence, factor_flags(factors, FACTOR_TEMPLATES))
+    # Likely-to-succeed advice does not depend on the concerns
+    return _recommendation_list(prediction, confidence, 0)
+
+
+@lru_cache(maxsize=None)
+def _recommendation_list(prediction: str, confidence: str, flags: int) -> tuple:
+    """Recommendations for one factor signature (a few dozen distinct tuples, memoized)"""
     recommendations = []
     
     if prediction == "At Risk":
         recommendations.append("Early intervention recommended")
-        
-        # Check specific concerns
-        has_score_concern = any("score" in concern.lower() for concern in factors["concerns"])
-        has_scholarship_concern = any("scholarship" in concern.lower() for concern in factors["concerns"])
-        has_age_concern = any("age" in concern.lower() for concern in factors["concerns"])
-        
-        if has_score_concern:
-            recommendations.append("Priority: Academic strengthening - Your baccalaureate score is the strongest predictor of success")
-            recommendations.append("Target: Work towards final average ≥ 12/20 (requires strong consistent performance)")
-            recommendations.append("Enroll in intensive academic support and tutoring programs")
-        
-        if has_scholarship_concern:
-            recommendations.append("Apply for financial aid and scholarships to reduce financial stress")
-        
-        if has_age_concern:
-            recommendations.append("Connect with peer support groups and non-traditional student resources")
-        
+        for flag, advice in AT_RISK_ADVICE:
+            if flags & flag:
+                recommendations.extend(advice)
         recommendations.append("Schedule regular meetings with academic advisor for progress monitoring")
         recommendations.append("Utilize all available tutoring and study resources")
         recommendations.append("Develop strong time management and study habits early")
         
     else:  # Likely to Succeed
-        if confidence == "High":
-            recommendations.append("Excellent profile! Your academic foundation predicts strong success")
-            recommendations.append("Consider leadership and mentoring opportunities to help at-risk peers")
-            recommendations.append("Explore advanced coursework and research projects")
-            recommendations.append("Aim for honors and academic excellence programs")
-        elif confidence == "Medium":
-            recommendations.append("Good profile with solid success indicators")
-            recommendations.append("Maintain consistent academic performance to stay above 12/20 threshold")
-            recommendations.append("Build practical skills through internships and projects")
-            recommendations.append("Stay engaged with coursework to maintain your trajectory")
-        else:  # Low confidence
-            recommendations.append("Borderline prediction - consistent effort is critical")
-            recommendations.append("Monitor your academic performance closely each semester")
-            recommendations.append("Maintain regular contact with academic advisors")
-            recommendations.append("Focus on maintaining grades above the 12/20 success threshold")
+        recommendations.extend(SUCCEED_ADVICE.get(confidence, SUCCEED_ADVICE["Low"]))
     
     # Add general recommendations
     recommendations.append("Build professional network and LinkedIn presence")
     recommendations.append("Participate in campus activities and clubs for holistic development")
     
-    return recommendations
+    return tuple(recommendations)
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
 from app.schemas.ta_eligibility import TAEligibilityResponse
 from app.services.ta_eligibility_service import ta_eligibility_service
+from app.services.inference_executor import inference_executor
+from app.services.metrics import stage_timer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,39 +12,44 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/eligibility", response_model=TAEligibilityResponse)
-async def get_ta_eligibility():
+async def get_ta_eligibility(
+    page: int = Query(default=1, ge=1, description="Page of eligible students (1-based)"),
+    page_size: int = Query(default=100, ge=1, le=1000, description="Eligible students per page (1-1000)"),
+    sort_by: Literal["eligibility_score", "average_score", "student_id", "name", "program"] = Query(
+        default="eligibility_score", description="Field to sort eligible students on"),
+    order: Literal["asc", "desc"] = Query(default="desc", description="Sort direction"),
+):
     """
-    Get TA (Teaching Assistant) eligibility predictions for student population
+    Get TA (Teaching Assistant) eligibility predictions for the student roster
     
-    Analyzes all students and predicts who is eligible for TA positions
-    based on academic performance, skills, and other criteria.
+    Scores every student of the roster file (STRATUS_TA_ROSTER_PATH) on
+    academic performance, skills, and other criteria. Scores are cached
+    until the roster file changes; eligible students are returned one
+    page at a time.
     
     Returns:
         - total_students: Total number of students analyzed
         - employable_students: Number of students predicted as eligible
         - employability_rate: Percentage of eligible students
         - message: Summary message
+        - eligible_students_list: One page of eligible students
     """
     try:
-        logger.info("TA eligibility request received")
+        logger.info("TA eligibility request received (page %d, %d per page, sorted by %s %s)", page, page_size, sort_by, order)
         
         # Get predictions
-        result = ta_eligibility_service.predict_employability()
+        result = await inference_executor.run(ta_eligibility_service.predict_employability, page, page_size, sort_by, order)
         
-        response = TAEligibilityResponse(
-            total_students=result["total_students"],
-            employable_students=result["employable_students"],
-            employability_rate=result["employability_rate"],
-            message=result["message"],
-            eligible_students_list=result["eligible_students_list"]
-        )
+        with stage_timer("ta_eligibility", "serialization"):
+            response = TAEligibilityResponse(**result)
         
-        logger.info(f"TA eligibility prediction successful: {result['employability_rate']:.2f}% eligible")
+        logger.info("TA eligibility prediction successful: %.2f%% eligible", result["employability_rate"])
         
         return response
         
+    except FileNotFoundError as e:
+        logger.error("TA roster unavailable: %s", e)
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        logger.error(f"Error in TA eligibility endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in TA eligibility endpoint: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error during TA eligibility prediction")
@@ -25,3 +25,13 @@ class DropoutPredictionResponse(BaseModel):
     confidence: str = Field(..., description="Confidence level (High, Medium, Low)")
     factors: Dict[str, List[str]] = Field(..., description="Contributing factors")
     recommendations: List[str] = Field(..., description="Personalized recommendations")
+
+class DropoutBatchRequest(BaseModel):
+    """Request model for scoring a whole cohort of students at once."""
+    students: List[DropoutPredictionRequest] = Field(..., min_length=1, max_length=10000, description="Students to score (1-10000)")
+
+class DropoutBatchResponse(BaseModel):
+    """Response model for batch dropout risk prediction."""
+    count: int = Field(..., description="Number of students scored")
+    factor_counts: Dict[str, int] = Field(..., description="Students with each factor code in the cohort (e.g. weak_technical)")
+    results: List[DropoutPredictionResponse] = Field(..., description="Per-student predictions, in request order")
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Dict, Any, Optional
 
 
 class EnrollmentForecastRequest(BaseModel):
@@ -28,3 +28,68 @@ class EnrollmentForecastResponse(BaseModel):
     average_enrollment: int
     trend_description: str
     model_info: Dict[str, Any]
+
+
+class EnrollmentSeriesHistory(BaseModel):
+    """Yearly enrollment history of one series (e.g. a campus/program pair)."""
+    key: str = Field(..., min_length=1, description="Unique series identifier, e.g. 'Tunis Main/Computer Science'")
+    campus: Optional[str] = Field(default=None, description="Campus the series belongs to")
+    program: Optional[str] = Field(default=None, description="Program the series belongs to")
+    years: List[int] = Field(..., min_length=2, description="Training years")
+    enrollments: List[float] = Field(..., min_length=2, description="Enrollment for each training year")
+    
+    @model_validator(mode="after")
+    def _check_history(self):
+        if len(self.years) != len(self.enrollments):
+            raise ValueError("years and enrollments must have the same length")
+        if len(set(self.years)) != len(self.years):
+            raise ValueError("years must be unique")
+        return self
+
+
+class EnrollmentSeriesFitRequest(BaseModel):
+    """Request model for fitting many enrollment series at once."""
+    series: List[EnrollmentSeriesHistory] = Field(..., min_length=1, max_length=5000, description="Series to fit (1-5000)")
+    degree: int = Field(default=2, ge=1, le=3, description="Polynomial degree of the trend (1-3)")
+
+
+class EnrollmentSeriesFit(BaseModel):
+    """Fit summary of one series."""
+    key: str
+    campus: Optional[str]
+    program: Optional[str]
+    degree: int
+    training_period: str
+    rmse: float  # In-sample root mean squared error
+
+
+class EnrollmentSeriesFitResponse(BaseModel):
+    """Response model for a multi-series fit."""
+    count: int = Field(..., description="Number of series fitted")
+    total_series: int = Field(..., description="Number of series stored after the fit")
+    series: List[EnrollmentSeriesFit]
+
+
+class EnrollmentBatchForecastRequest(BaseModel):
+    """Request model for forecasting stored series."""
+    years_ahead: int = Field(
+        default=5,
+        ge=1,
+        le=10,
+        description="Number of years to forecast (1-10)"
+    )
+    keys: Optional[List[str]] = Field(default=None, description="Series to forecast (all stored series if omitted)")
+
+
+class SeriesForecast(EnrollmentForecastResponse):
+    """Forecast of one series."""
+    key: str
+    campus: Optional[str]
+    program: Optional[str]
+
+
+class EnrollmentBatchForecastResponse(BaseModel):
+    """Response model for a multi-series forecast."""
+    count: int = Field(..., description="Number of series forecast")
+    years_ahead: int
+    series: List[SeriesForecast] = Field(..., description="Per-series forecasts, in request order")
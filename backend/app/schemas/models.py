@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class ModelStatus(BaseModel):
+    """Active and available versions of one model service."""
+    name: str
+    endpoints: List[str]
+    loaded: bool  # False until the first request (or warmup) loads the service
+    active_version: Optional[str] = None  # "base" for the unversioned artefact
+    artefact: Optional[str] = None
+    fingerprint: Optional[str] = None  # "<size>-<mtime_ns>" of the active artefact
+    loaded_at: Optional[str] = None  # ISO 8601, UTC
+    available_versions: List[str]
+    last_error: Optional[str] = None  # Why the last new version was rejected
+
+
+class ModelRegistryResponse(BaseModel):
+    """Response model for the model registry status."""
+    poll_interval_seconds: float
+    polling: bool
+    models: List[ModelStatus]
+    swapped: List[str] = Field(default_factory=list, description="Models swapped by this request (refresh only)")
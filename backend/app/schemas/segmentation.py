@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
+from typing import List
 
 class SegmentationRequest(BaseModel):
     """Request model for student segmentation"""
@@ -21,3 +22,24 @@ class SegmentationResponse(BaseModel):
     origin_governorate: str
     chosen_program: str
     cluster_characteristics: dict = Field(..., description="Characteristics of the assigned cluster")
+
+
+class SegmentationBatchRequest(BaseModel):
+    """Request model for segmenting a whole cohort"""
+    students: List[SegmentationRequest] = Field(..., min_length=1, max_length=10000, description="Students to segment (1-10000)")
+
+
+class ClusterSummary(BaseModel):
+    """Size and profile of one cluster within a cohort"""
+    cluster: int
+    cluster_name: str
+    count: int = Field(..., description="Students assigned to the cluster")
+    share: float = Field(..., description="Percentage of the cohort in the cluster")
+    average_baccalaureate_score: float = Field(..., description="Mean baccalaureate score of the cluster's students (0 if empty)")
+
+
+class SegmentationBatchResponse(BaseModel):
+    """Response model for cohort segmentation"""
+    count: int = Field(..., description="Number of students segmented")
+    clusters: List[ClusterSummary] = Field(..., description="Cohort-level summary per cluster")
+    results: List[SegmentationResponse] = Field(..., description="Per-student results, in request order")
@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
+from typing import List
 
 class StudentTAEligibilityRequest(BaseModel):
     """Request model for individual student TA eligibility check"""
@@ -25,3 +26,15 @@ class StudentTAEligibilityResponse(BaseModel):
     probability: float = Field(..., description="Probability of employability (0-100%)")
     message: str = Field(..., description="Result message")
     recommendations: list[str] = Field(..., description="Recommendations for improvement")
+
+
+class StudentTAEligibilityBatchRequest(BaseModel):
+    """Request model for checking many students' TA eligibility at once"""
+    students: List[StudentTAEligibilityRequest] = Field(..., min_length=1, max_length=10000, description="Students to check (1-10000)")
+
+
+class StudentTAEligibilityBatchResponse(BaseModel):
+    """Response model for batch TA eligibility check"""
+    count: int = Field(..., description="Number of students checked")
+    eligible_count: int = Field(..., description="Number of students eligible for TA positions")
+    results: List[StudentTAEligibilityResponse] = Field(..., description="Per-student results, in request order")
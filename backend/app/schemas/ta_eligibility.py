@@ -17,5 +17,10 @@ class TAEligibilityResponse(BaseModel):
     employable_students: int = Field(..., description="Number of students predicted as employable")
     employability_rate: float = Field(..., description="Percentage of employable students")
     message: str = Field(..., description="Summary message")
-    eligible_students_list: List[EligibleStudent] = Field(..., description="List of eligible students")
+    eligible_students_list: List[EligibleStudent] = Field(..., description="Eligible students on the requested page")
+    page: int = Field(..., description="Current page (1-based)")
+    page_size: int = Field(..., description="Eligible students per page")
+    total_pages: int = Field(..., description="Number of pages of eligible students")
+    sort_by: str = Field(..., description="Field the eligible students are sorted on")
+    order: str = Field(..., description="Sort direction (asc or desc)")
 
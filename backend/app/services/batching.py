@@ -0,0 +1,114 @@
+"""
+Micro-batching
+Coalesces concurrent single-item prediction requests into one batch call,
+so one model call scores many requests instead of one call per request.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional, Tuple
+
+from app import config
+from app.services.inference_executor import InferenceExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects items submitted within a short window and scores them together.
+    
+    A batch is flushed when `max_batch_size` items are pending or `max_wait_ms`
+    after the first item of the batch arrived, whichever comes first. Each
+    caller awaits only its own result. If the batch call fails, the items are
+    retried one by one so a single bad input only fails its own request.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        enabled: Optional[bool] = None,
+        executor: Optional[InferenceExecutor] = None
+    ):
+        """
+        Args:
+            name: Name used in logs
+            batch_fn: Function scoring a list of items, returning results in the same order
+            max_batch_size: Flush as soon as this many items are pending
+            max_wait_ms: Longest time the first item of a batch waits for others
+            enabled: When False, every item is scored immediately on its own
+            executor: Inference pool running batch_fn (called inline when None)
+        """
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size or config.BATCH_MAX_SIZE
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else config.BATCH_WINDOW_MS) / 1000
+        self.enabled = config.BATCHING_ENABLED if enabled is None else enabled
+        self.executor = executor
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+    
+    async def submit(self, item: Any) -> Any:
+        """Score one item, batched together with other items submitted concurrently."""
+        if not self.enabled:
+            return (await self._score([item]))[0]
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        
+        return await future
+    
+    def _flush(self) -> None:
+        """Hand the pending items over to a scoring task and start a new batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+    
+    async def _score(self, items: List[Any]) -> List[Any]:
+        """Run batch_fn on the inference pool (or inline without one)."""
+        if self.executor is None:
+            return self.batch_fn(items)
+        return await self.executor.run(self.batch_fn, items)
+    
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Score a batch and resolve every waiting caller."""
+        items = [item for item, _ in batch]
+        try:
+            results = await self._score(items)
+        except Exception as e:
+            if len(batch) == 1:
+                _set_exception(batch[0][1], e)
+                return
+            logger.warning("%s batch of %d failed (%s); retrying items individually", self.name, len(batch), e)
+            for item, future in batch:
+                try:
+                    _set_result(future, (await self._score([item]))[0])
+                except Exception as item_error:
+                    _set_exception(future, item_error)
+            return
+        
+        for (_, future), result in zip(batch, results):
+            _set_result(future, result)
+
+
+def _set_result(future: asyncio.Future, result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future: asyncio.Future, error: Exception) -> None:
+    if not future.done():
+        future.set_exception(error)
@@ -0,0 +1,120 @@
+"""
+Compiled Inference
+Flat NumPy evaluators for the fitted sklearn classifiers, avoiding sklearn's
+per-call input validation and thread dispatch, which dominate one-row
+predictions. Each compiled model reproduces the sklearn predict_proba
+output exactly.
+"""
+
+import logging
+from typing import Any, Optional
+
+import numpy as np
+from scipy.special import expit
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledForest:
+    """
+    A fitted tree classifier (or forest of them) flattened into parallel arrays.
+    
+    All trees are concatenated into one node table (feature, threshold, left,
+    right, leaf probabilities). Prediction walks every (row, tree) pair down
+    one level per step with vectorized indexing, so the whole ensemble is
+    evaluated in max_depth NumPy operations.
+    """
+    
+    def __init__(self, estimators: list, classes: np.ndarray):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            is_leaf = tree.children_left < 0
+            roots.append(offset)
+            features.append(np.where(is_leaf, -1, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, -1, tree.children_left + offset))
+            rights.append(np.where(is_leaf, -1, tree.children_right + offset))
+            
+            # Leaf class distributions normalized to probabilities, as DecisionTreeClassifier.predict_proba does
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+            
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+        
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts).astype(np.intp)
+        self.right = np.concatenate(rights).astype(np.intp)
+        self.value = np.concatenate(values)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.max_depth = max_depth
+        self.classes_ = classes
+    
+    def predict_proba(self, X) -> np.ndarray:
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_trees = X.shape[0], len(self.roots)
+        rows = np.arange(n_rows)[:, None]
+        node = np.broadcast_to(self.roots, (n_rows, n_trees)).copy()
+        
+        for _ in range(self.max_depth):
+            feature = self.feature[node]
+            internal = feature >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, np.where(internal, feature, 0)] <= self.threshold[node]
+            node = np.where(internal, np.where(go_left, self.left[node], self.right[node]), node)
+        
+        # Average the trees in estimator order, like the forest does
+        leaf_values = self.value[node]
+        proba = leaf_values[:, 0].copy()
+        for t in range(1, n_trees):
+            proba += leaf_values[:, t]
+        if n_trees > 1:
+            proba /= n_trees
+        return proba
+
+
+class CompiledLogistic:
+    """A fitted binary LogisticRegression reduced to its coefficients: sigmoid(X @ coef + intercept)."""
+    
+    def __init__(self, model: LogisticRegression):
+        self.coef = np.asarray(model.coef_, dtype=np.float64).T
+        self.intercept = np.asarray(model.intercept_, dtype=np.float64)
+        self.classes_ = model.classes_
+    
+    def predict_proba(self, X) -> np.ndarray:
+        positive = expit(np.asarray(X, dtype=np.float64) @ self.coef + self.intercept).ravel()
+        return np.vstack([1 - positive, positive]).T
+
+
+def compile_model(model: Any) -> Optional[Any]:
+    """
+    Build a compiled evaluator for a fitted classifier.
+    
+    Returns:
+        An object with predict_proba/classes_ matching the model, or None when
+        the model type is not supported (callers then keep using sklearn).
+    """
+    try:
+        if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)) and model.n_outputs_ == 1:
+            return CompiledForest(model.estimators_, model.classes_)
+        if isinstance(model, DecisionTreeClassifier) and model.n_outputs_ == 1:
+            return CompiledForest([model], model.classes_)
+        if isinstance(model, LogisticRegression) and len(model.classes_) == 2:
+            return CompiledLogistic(model)
+    except Exception as e:
+        logger.warning("Could not compile %s, using sklearn inference: %s", type(model).__name__, e)
+        return None
+    
+    logger.info("No compiled inference for %s, using sklearn inference", type(model).__name__)
+    return None
@@ -3,34 +3,134 @@ Student Dropout Risk Prediction Service
 Uses machine learning model to predict student dropout risk based on enrollment data.
 """
 
-import joblib
+import logging
+from enum import IntEnum
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from app import config
+from app.services.factors import Factor, FactorTemplate, count_factors
+from app.services.model_registry import model_registry
+from app.services.model_store import load_model_artifact
+from app.services.compiled_models import compile_model
+from app.services.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+# Recommendation flags raised by concern factors
+CONCERN_ACADEMIC = 1 << 0
+CONCERN_SKILLS = 1 << 1
+CONCERN_PROJECTS = 1 << 2
+CONCERN_INTERNSHIP = 1 << 3
+CONCERN_PORTFOLIO = 1 << 4
+CONCERN_LINKEDIN = 1 << 5
+
+
+class DropoutFactor(IntEnum):
+    """Factor codes produced by DropoutPredictionService._analyze_factors."""
+    EXCELLENT_AVERAGE = 1
+    GOOD_AVERAGE = 2
+    LOW_AVERAGE = 3
+    STRONG_BACCALAUREATE = 4
+    ADEQUATE_BACCALAUREATE = 5
+    LOW_BACCALAUREATE = 6
+    STRONG_TECHNICAL = 7
+    ADEQUATE_TECHNICAL = 8
+    WEAK_TECHNICAL = 9
+    STRONG_COMMUNICATION = 10
+    ADEQUATE_COMMUNICATION = 11
+    WEAK_COMMUNICATION = 12
+    STRONG_SOFT_SKILLS = 13
+    ADEQUATE_SOFT_SKILLS = 14
+    WEAK_SOFT_SKILLS = 15
+    GOOD_PROJECTS = 16
+    SOME_PROJECTS = 17
+    FEW_PROJECTS = 18
+    COMPLETED_INTERNSHIP = 19
+    SHORT_INTERNSHIP = 20
+    NO_INTERNSHIP = 21
+    HAS_PORTFOLIO = 22
+    NO_PORTFOLIO = 23
+    HAS_LINKEDIN = 24
+    NO_LINKEDIN = 25
+
+
+FACTOR_TEMPLATES = {
+    DropoutFactor.EXCELLENT_AVERAGE: FactorTemplate("positive", "Excellent academic performance ({value}/20)"),
+    DropoutFactor.GOOD_AVERAGE: FactorTemplate("positive", "Good academic performance ({value}/20)"),
+    DropoutFactor.LOW_AVERAGE: FactorTemplate("concerns", "Low previous years average ({value}/20) - High dropout risk", CONCERN_ACADEMIC),
+    DropoutFactor.STRONG_BACCALAUREATE: FactorTemplate("positive", "Strong baccalaureate score ({value}/20)"),
+    DropoutFactor.ADEQUATE_BACCALAUREATE: FactorTemplate("neutral", "Adequate baccalaureate score ({value}/20)"),
+    DropoutFactor.LOW_BACCALAUREATE: FactorTemplate("concerns", "Low baccalaureate score ({value}/20) - Risk factor", CONCERN_ACADEMIC),
+    DropoutFactor.STRONG_TECHNICAL: FactorTemplate("positive", "Strong technical skills ({value}/10)"),
+    DropoutFactor.ADEQUATE_TECHNICAL: FactorTemplate("neutral", "Adequate technical skills ({value}/10)"),
+    DropoutFactor.WEAK_TECHNICAL: FactorTemplate("concerns", "Weak technical skills ({value}/10) - Needs improvement", CONCERN_SKILLS),
+    DropoutFactor.STRONG_COMMUNICATION: FactorTemplate("positive", "Strong communication skills ({value}/10)"),
+    DropoutFactor.ADEQUATE_COMMUNICATION: FactorTemplate("neutral", "Adequate communication skills ({value}/10)"),
+    DropoutFactor.WEAK_COMMUNICATION: FactorTemplate("concerns", "Weak communication skills ({value}/10) - Risk factor", CONCERN_SKILLS),
+    DropoutFactor.STRONG_SOFT_SKILLS: FactorTemplate("positive", "Strong soft skills ({value}/10)"),
+    DropoutFactor.ADEQUATE_SOFT_SKILLS: FactorTemplate("neutral", "Adequate soft skills ({value}/10)"),
+    DropoutFactor.WEAK_SOFT_SKILLS: FactorTemplate("concerns", "Weak soft skills ({value}/10) - Risk factor", CONCERN_SKILLS),
+    DropoutFactor.GOOD_PROJECTS: FactorTemplate("positive", "Good project portfolio ({value} projects)"),
+    DropoutFactor.SOME_PROJECTS: FactorTemplate("neutral", "Some projects completed ({value})"),
+    DropoutFactor.FEW_PROJECTS: FactorTemplate("concerns", "Few projects completed ({value}) - Risk factor", CONCERN_PROJECTS),
+    DropoutFactor.COMPLETED_INTERNSHIP: FactorTemplate("positive", "Completed internship ({value} months)"),
+    DropoutFactor.SHORT_INTERNSHIP: FactorTemplate("neutral", "Short internship ({value} months)"),
+    DropoutFactor.NO_INTERNSHIP: FactorTemplate("concerns", "No internship completed - Risk factor", CONCERN_INTERNSHIP),
+    DropoutFactor.HAS_PORTFOLIO: FactorTemplate("positive", "Has professional portfolio"),
+    DropoutFactor.NO_PORTFOLIO: FactorTemplate("concerns", "No portfolio - Risk factor", CONCERN_PORTFOLIO),
+    DropoutFactor.HAS_LINKEDIN: FactorTemplate("positive", "Active LinkedIn profile"),
+    DropoutFactor.NO_LINKEDIN: FactorTemplate("concerns", "No LinkedIn profile - Risk factor", CONCERN_LINKEDIN),
+}
+
+# Columns of the factor code matrix, one per factor slot of _analyze_factors
+FACTOR_SLOTS = (
+    "previous_years_average",
+    "baccalaureate_score",
+    "technical_skills_score",
+    "communication_skills_score",
+    "soft_skills_score",
+    "projects_completed",
+    "internship_duration_months",
+    "portfolio_exists",
+    "linkedin_profile",
+)
+
+# Fields read by the factor analysis
+FACTOR_FIELDS = FACTOR_SLOTS + ("internship_completed",)
 
 
 class DropoutPredictionService:
     """Service for predicting student dropout risk using enrollment/demographic data."""
     
-    def __init__(self):
-        """Initialize the service and load the trained model."""
-        self.model_path = Path(__file__).parent.parent / "models" / "dropout(obj1).pkl"
+    # Model artefact in app/models
+    MODEL_FILE = "dropout(obj1).pkl"
+    
+    def __init__(self, model_path: Optional[Path] = None):
+        """
+        Initialize the service and load the trained model.
+        
+        Args:
+            model_path: Model artefact to load (defaults to MODEL_FILE in app/models)
+        """
+        self.model_path = Path(model_path) if model_path else config.MODELS_DIR / self.MODEL_FILE
         self.model_data = None
         self._load_model()
     
     def _load_model(self):
         """Load the trained model and preprocessors."""
         try:
-            self.model_data = joblib.load(self.model_path)
+            self.model_data = load_model_artifact(self.model_path)
             self.model = self.model_data['model']
             self.scaler = self.model_data['scaler']
             self.features = self.model_data['features']
             self.threshold = self.model_data.get('threshold', 0.5)
             self.meta = self.model_data.get('meta', {})
-            print(f"✅ Dropout prediction model loaded successfully")
-            print(f"   Model version: {self.meta.get('sklearn_version', 'unknown')}")
-            print(f"   Features: {len(self.features)}")
-            print(f"   ROC-AUC: {self.meta.get('roc_auc', 'unknown')}")
+            self.compiled_model = compile_model(self.model) if config.COMPILED_INFERENCE else None
+            logger.info("Dropout prediction model loaded (sklearn %s, %d features, ROC-AUC %s)",
+                        self.meta.get('sklearn_version', 'unknown'), len(self.features),
+                        self.meta.get('roc_auc', 'unknown'))
         except Exception as e:
             raise RuntimeError(f"Failed to load dropout model: {str(e)}")
     
@@ -44,19 +144,27 @@ class DropoutPredictionService:
         Returns:
             DataFrame with preprocessed features matching training format
         """
-        # Extract only the features used by the model
-        feature_data = {feat: student_data.get(feat, 0) for feat in self.features}
-        
-        # Create DataFrame from input
-        df = pd.DataFrame([feature_data])
+        return self.preprocess_batch([student_data])
+    
+    def preprocess_batch(self, students: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Preprocess a list of students into a single scaled feature matrix.
         
-        # Ensure correct data types (all numeric for this model)
-        for col in df.columns:
-            df[col] = df[col].astype(float)
+        Args:
+            students: List of dictionaries containing student enrollment information
+            
+        Returns:
+            DataFrame with one preprocessed row per student, in input order
+        """
+        # Extract only the features used by the model (all numeric for this model)
+        matrix = np.array(
+            [[student.get(feat, 0) for feat in self.features] for student in students],
+            dtype=float
+        )
         
-        # Scale the features
+        # Scale all rows in a single call
         df_scaled = pd.DataFrame(
-            self.scaler.transform(df),
+            self.scaler.transform(pd.DataFrame(matrix, columns=self.features)),
             columns=self.features
         )
         
@@ -88,15 +196,41 @@ class DropoutPredictionService:
                 - dropout_probability: float (0-1)
                 - retention_probability: float (0-1)
                 - confidence: str ("High", "Medium", "Low")
-                - factors: dict with contributing factors
+                - factors: tuple of Factor(code, value) (see FACTOR_TEMPLATES)
         """
-        # Preprocess the input
-        X = self.preprocess_input(student_data)
+        return self.predict_many([student_data])[0]
+    
+    def predict_many(self, students: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Predict dropout risk for many students at once.
         
-        # Get prediction and probability
-        prediction = self.model.predict(X)[0]
-        probability = self.model.predict_proba(X)[0]
+        Builds one feature matrix, scales it and scores it with a single
+        predict_proba call instead of one model call per student. The risk
+        level is read from the probability bands, so model.predict is never
+        needed. Single predictions go through the same path.
         
+        Args:
+            students: List of dictionaries with the same fields as predict()
+        
+        Returns:
+            List of result dictionaries (same shape as predict()), in input order
+        """
+        if not students:
+            return []
+        
+        with stage_timer("dropout", "preprocess"):
+            X = self.preprocess_batch(students)
+        with stage_timer("dropout", "model"):
+            probabilities = (self.compiled_model or self.model).predict_proba(X)
+        
+        with stage_timer("dropout", "factor_analysis"):
+            return [
+                self._build_result(student_data, probability)
+                for student_data, probability in zip(students, probabilities)
+            ]
+    
+    def _build_result(self, student_data: Dict[str, Any], probability) -> Dict[str, Any]:
+        """Turn one row of class probabilities into the prediction result."""
         # Dropout probability (class 1 indicates dropout risk)
         dropout_prob = probability[1] if len(probability) > 1 else probability[0]
         
@@ -128,104 +262,159 @@ class DropoutPredictionService:
             "factors": factors
         }
     
-    def _analyze_factors(self, student_data: Dict[str, Any], dropout_prob: float) -> Dict[str, Any]:
+    def factor_columns(self, students: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Columns of the fields read by the factor analysis (missing fields count as 0)."""
+        return {
+            field: np.array([student.get(field, 0) for student in students], dtype=np.float64)
+            for field in FACTOR_FIELDS
+        }
+    
+    def analyze_factors_batch(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Vectorized _analyze_factors over many students.
+        
+        Args:
+            columns: Mapping of every FACTOR_FIELDS field to an array with one value per student
+        
+        Returns:
+            DropoutFactor codes of shape (n_students, len(FACTOR_SLOTS)), one
+            column per slot, using the same thresholds as _analyze_factors
+        """
+        avg = np.asarray(columns["previous_years_average"], dtype=np.float64)
+        bacc = np.asarray(columns["baccalaureate_score"], dtype=np.float64)
+        tech = np.asarray(columns["technical_skills_score"], dtype=np.float64)
+        comm = np.asarray(columns["communication_skills_score"], dtype=np.float64)
+        soft = np.asarray(columns["soft_skills_score"], dtype=np.float64)
+        projects = np.asarray(columns["projects_completed"], dtype=np.float64)
+        internship = np.asarray(columns["internship_completed"]) == 1
+        duration = np.asarray(columns["internship_duration_months"], dtype=np.float64)
+        
+        codes = np.empty((len(avg), len(FACTOR_SLOTS)), dtype=np.int8)
+        codes[:, 0] = np.select([avg >= 14, avg >= 10], [DropoutFactor.EXCELLENT_AVERAGE, DropoutFactor.GOOD_AVERAGE],
+                                default=DropoutFactor.LOW_AVERAGE)
+        codes[:, 1] = np.select([bacc >= 14, bacc >= 11], [DropoutFactor.STRONG_BACCALAUREATE, DropoutFactor.ADEQUATE_BACCALAUREATE],
+                                default=DropoutFactor.LOW_BACCALAUREATE)
+        codes[:, 2] = np.select([tech >= 8, tech > 6], [DropoutFactor.STRONG_TECHNICAL, DropoutFactor.ADEQUATE_TECHNICAL],
+                                default=DropoutFactor.WEAK_TECHNICAL)
+        codes[:, 3] = np.select([comm >= 8, comm > 5], [DropoutFactor.STRONG_COMMUNICATION, DropoutFactor.ADEQUATE_COMMUNICATION],
+                                default=DropoutFactor.WEAK_COMMUNICATION)
+        codes[:, 4] = np.select([soft >= 8, soft > 6], [DropoutFactor.STRONG_SOFT_SKILLS, DropoutFactor.ADEQUATE_SOFT_SKILLS],
+                                default=DropoutFactor.WEAK_SOFT_SKILLS)
+        codes[:, 5] = np.select([projects >= 4, projects > 1], [DropoutFactor.GOOD_PROJECTS, DropoutFactor.SOME_PROJECTS],
+                                default=DropoutFactor.FEW_PROJECTS)
+        codes[:, 6] = np.select([internship & (duration >= 3), internship],
+                                [DropoutFactor.COMPLETED_INTERNSHIP, DropoutFactor.SHORT_INTERNSHIP],
+                                default=DropoutFactor.NO_INTERNSHIP)
+        codes[:, 7] = np.where(np.asarray(columns["portfolio_exists"]) == 1, DropoutFactor.HAS_PORTFOLIO, DropoutFactor.NO_PORTFOLIO)
+        codes[:, 8] = np.where(np.asarray(columns["linkedin_profile"]) == 1, DropoutFactor.HAS_LINKEDIN, DropoutFactor.NO_LINKEDIN)
+        return codes
+    
+    def factor_counts(self, students: List[Dict[str, Any]]) -> Dict[DropoutFactor, int]:
+        """
+        Number of students with each factor in a cohort (e.g. how many have
+        weak technical skills), computed from the code matrix without building
+        per-student factors or text.
+        """
+        return count_factors(self.analyze_factors_batch(self.factor_columns(students)), DropoutFactor)
+    
+    def _analyze_factors(self, student_data: Dict[str, Any], dropout_prob: float) -> tuple:
         """
         Analyze which factors contribute to dropout risk or retention.
         Based on the model's dropout criteria.
+        
+        Returns:
+            Tuple of Factor(code, value) in analysis order; the text is rendered
+            from FACTOR_TEMPLATES when the response is serialized
         """
-        factors = {
-            "positive": [],
-            "concerns": [],
-            "neutral": []
-        }
+        factors = []
         
         # Previous years average - KEY INDICATOR
         prev_avg = student_data.get("previous_years_average", 0)
         if prev_avg >= 14:
-            factors["positive"].append(f"Excellent academic performance ({prev_avg}/20)")
+            factors.append(Factor(DropoutFactor.EXCELLENT_AVERAGE, prev_avg))
         elif prev_avg >= 10:
-            factors["positive"].append(f"Good academic performance ({prev_avg}/20)")
+            factors.append(Factor(DropoutFactor.GOOD_AVERAGE, prev_avg))
         else:
-            factors["concerns"].append(f"Low previous years average ({prev_avg}/20) - High dropout risk")
+            factors.append(Factor(DropoutFactor.LOW_AVERAGE, prev_avg))
         
         # Baccalaureate score
         bacc_score = student_data.get("baccalaureate_score", 0)
         if bacc_score >= 14:
-            factors["positive"].append(f"Strong baccalaureate score ({bacc_score}/20)")
+            factors.append(Factor(DropoutFactor.STRONG_BACCALAUREATE, bacc_score))
         elif bacc_score >= 11:
-            factors["neutral"].append(f"Adequate baccalaureate score ({bacc_score}/20)")
+            factors.append(Factor(DropoutFactor.ADEQUATE_BACCALAUREATE, bacc_score))
         else:
-            factors["concerns"].append(f"Low baccalaureate score ({bacc_score}/20) - Risk factor")
+            factors.append(Factor(DropoutFactor.LOW_BACCALAUREATE, bacc_score))
         
         # Technical skills
         tech_skills = student_data.get("technical_skills_score", 0)
         if tech_skills >= 8:
-            factors["positive"].append(f"Strong technical skills ({tech_skills}/10)")
+            factors.append(Factor(DropoutFactor.STRONG_TECHNICAL, tech_skills))
         elif tech_skills > 6:
-            factors["neutral"].append(f"Adequate technical skills ({tech_skills}/10)")
+            factors.append(Factor(DropoutFactor.ADEQUATE_TECHNICAL, tech_skills))
         else:
-            factors["concerns"].append(f"Weak technical skills ({tech_skills}/10) - Needs improvement")
+            factors.append(Factor(DropoutFactor.WEAK_TECHNICAL, tech_skills))
         
         # Communication skills
         comm_skills = student_data.get("communication_skills_score", 0)
         if comm_skills >= 8:
-            factors["positive"].append(f"Strong communication skills ({comm_skills}/10)")
+            factors.append(Factor(DropoutFactor.STRONG_COMMUNICATION, comm_skills))
         elif comm_skills > 5:
-            factors["neutral"].append(f"Adequate communication skills ({comm_skills}/10)")
+            factors.append(Factor(DropoutFactor.ADEQUATE_COMMUNICATION, comm_skills))
         else:
-            factors["concerns"].append(f"Weak communication skills ({comm_skills}/10) - Risk factor")
+            factors.append(Factor(DropoutFactor.WEAK_COMMUNICATION, comm_skills))
         
         # Soft skills
         soft_skills = student_data.get("soft_skills_score", 0)
         if soft_skills >= 8:
-            factors["positive"].append(f"Strong soft skills ({soft_skills}/10)")
+            factors.append(Factor(DropoutFactor.STRONG_SOFT_SKILLS, soft_skills))
         elif soft_skills > 6:
-            factors["neutral"].append(f"Adequate soft skills ({soft_skills}/10)")
+            factors.append(Factor(DropoutFactor.ADEQUATE_SOFT_SKILLS, soft_skills))
         else:
-            factors["concerns"].append(f"Weak soft skills ({soft_skills}/10) - Risk factor")
+            factors.append(Factor(DropoutFactor.WEAK_SOFT_SKILLS, soft_skills))
         
         # Projects
         projects = student_data.get("projects_completed", 0)
         if projects >= 4:
-            factors["positive"].append(f"Good project portfolio ({projects} projects)")
+            factors.append(Factor(DropoutFactor.GOOD_PROJECTS, projects))
         elif projects > 1:
-            factors["neutral"].append(f"Some projects completed ({projects})")
+            factors.append(Factor(DropoutFactor.SOME_PROJECTS, projects))
         else:
-            factors["concerns"].append(f"Few projects completed ({projects}) - Risk factor")
+            factors.append(Factor(DropoutFactor.FEW_PROJECTS, projects))
         
         # Internship
         internship = student_data.get("internship_completed", 0)
         duration = student_data.get("internship_duration_months", 0)
         if internship == 1 and duration >= 3:
-            factors["positive"].append(f"Completed internship ({duration} months)")
+            factors.append(Factor(DropoutFactor.COMPLETED_INTERNSHIP, duration))
         elif internship == 1:
-            factors["neutral"].append(f"Short internship ({duration} months)")
+            factors.append(Factor(DropoutFactor.SHORT_INTERNSHIP, duration))
         else:
-            factors["concerns"].append("No internship completed - Risk factor")
+            factors.append(Factor(DropoutFactor.NO_INTERNSHIP))
         
         # Portfolio
         portfolio = student_data.get("portfolio_exists", 0)
         if portfolio == 1:
-            factors["positive"].append("Has professional portfolio")
+            factors.append(Factor(DropoutFactor.HAS_PORTFOLIO))
         else:
-            factors["concerns"].append("No portfolio - Risk factor")
+            factors.append(Factor(DropoutFactor.NO_PORTFOLIO))
         
         # LinkedIn
         linkedin = student_data.get("linkedin_profile", 0)
         if linkedin == 1:
-            factors["positive"].append("Active LinkedIn profile")
+            factors.append(Factor(DropoutFactor.HAS_LINKEDIN))
         else:
-            factors["concerns"].append("No LinkedIn profile - Risk factor")
+            factors.append(Factor(DropoutFactor.NO_LINKEDIN))
         
-        return factors
+        return tuple(factors)
 
 
-# Singleton instance
-_dropout_service_instance = None
+# Live instance owned by the model registry (newest model version, hot-swapped)
+model_registry.register(
+    "dropout", DropoutPredictionService.MODEL_FILE, DropoutPredictionService,
+    endpoints=["/api/predict/dropout", "/api/predict/dropout/batch"], cache_namespace="dropout"
+)
 
 def get_dropout_service() -> DropoutPredictionService:
-    """Get or create the singleton dropout prediction service instance."""
-    global _dropout_service_instance
-    if _dropout_service_instance is None:
-        _dropout_service_instance = DropoutPredictionService()
-    return _dropout_service_instance
+    """Get the live dropout prediction service (loaded on first use)."""
+    return model_registry.get("dropout")
@@ -1,45 +1,204 @@
 """Enrollment Forecast Service"""
 
-import joblib
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
 import numpy as np
 from pathlib import Path
-from typing import Dict, Any, List
+
+from app import config
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from app.services.model_registry import model_registry
+from app.services.model_store import load_model_artifact, model_fingerprint
+
+try:
+    import fcntl
+except ImportError:  # Windows: fits are only serialized within one process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Highest polynomial degree a series can be fitted with; coefficients of
+# lower-degree series are left-padded with zeros to this width
+MAX_SERIES_DEGREE = 3
+
+
+def _trend_matrix(predictions: np.ndarray) -> List[List[str]]:
+    """
+    Year-over-year trend labels for a matrix of predictions (one series per row).
+    
+    A year is "increasing"/"decreasing" when it differs from the previous one by
+    more than 2%; the first year of every series is "stable".
+    """
+    predictions = predictions.astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        diff_pct = (predictions[:, 1:] - predictions[:, :-1]) / predictions[:, :-1] * 100
+    labels = np.select([diff_pct > 2, diff_pct < -2], ["increasing", "decreasing"], default="stable")
+    first = np.full((predictions.shape[0], 1), "stable", dtype=labels.dtype)
+    return np.concatenate([first, labels], axis=1).tolist()
 
 
-_service_instance = None
+def _fit_series_group(years: np.ndarray, enrollments: np.ndarray, degree: int) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    Least-squares polynomial fit of several series sharing the same training years.
+    
+    Args:
+        years: Training years, shape (n_points,)
+        enrollments: One series per row, shape (n_series, n_points)
+        degree: Polynomial degree
+    
+    Returns:
+        (offset, coefficients of shape (n_series, MAX_SERIES_DEGREE + 1), in-sample RMSE per series).
+        Polynomials are in (year - offset); centering the years keeps the fit well conditioned.
+    """
+    offset = float(years.mean())
+    t = years - offset
+    # polyfit solves every column of y in one least-squares call
+    coefs = np.polyfit(t, enrollments.T, degree).T
+    fitted = coefs @ np.vander(t, degree + 1).T
+    rmse = np.sqrt(np.mean((fitted - enrollments) ** 2, axis=1))
+    padded = np.zeros((coefs.shape[0], MAX_SERIES_DEGREE + 1))
+    padded[:, MAX_SERIES_DEGREE - degree:] = coefs
+    return offset, padded, rmse
 
 
-def get_enrollment_service():
-    """Get or create enrollment service singleton."""
-    global _service_instance
-    if _service_instance is None:
-        _service_instance = EnrollmentForecastService()
-    return _service_instance
+class _SeriesTable:
+    """Fitted series packed into arrays (one row per series) for vectorized evaluation."""
+    
+    def __init__(self, keys: List[str], info: List[Dict[str, Any]], coefs: np.ndarray,
+                 offsets: np.ndarray, last_years: np.ndarray):
+        self.keys = keys
+        self.index = {key: row for row, key in enumerate(keys)}
+        self.info = info
+        self.coefs = coefs
+        self.offsets = offsets
+        self.last_years = last_years
+    
+    @classmethod
+    def empty(cls) -> "_SeriesTable":
+        return cls([], [], np.zeros((0, MAX_SERIES_DEGREE + 1)), np.zeros(0), np.zeros(0, dtype=np.int64))
+    
+    @classmethod
+    def load(cls, path: Path) -> "_SeriesTable":
+        """Read a table written by save() (plain arrays plus a JSON string, no pickles)."""
+        with np.load(path, allow_pickle=False) as data:
+            info = json.loads(str(data["info"]))
+            return cls([item["key"] for item in info], info, data["coefs"], data["offsets"], data["last_years"])
+    
+    def save(self, path: Path) -> None:
+        """Write the table atomically, so workers reloading it never see a partial file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, info=np.array(json.dumps(self.info)), coefs=self.coefs,
+                         offsets=self.offsets, last_years=self.last_years)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Exclusive lock on <path>.lock held across processes (fits from several workers merge in turn)."""
+    if fcntl is None:
+        yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
 
 
 class EnrollmentForecastService:
     """Service for forecasting student enrollment using time series model."""
     
-    def __init__(self):
-        """Initialize the service and load the trained model."""
-        self.model_path = Path(__file__).parent.parent / "models" / "student_enrollment_forecast_model(obj4).pkl"
+    # Longest horizon the API accepts (EnrollmentForecastRequest.years_ahead);
+    # forecasts up to it are precomputed when the model loads
+    MAX_YEARS_AHEAD = 10
+    
+    # Model artefact in app/models
+    MODEL_FILE = "student_enrollment_forecast_model(obj4).pkl"
+    
+    def __init__(self, model_path: Optional[Path] = None):
+        """
+        Initialize the service and load the trained model.
+        
+        Args:
+            model_path: Model artefact to load (defaults to MODEL_FILE in app/models)
+        """
+        self.model_path = Path(model_path) if model_path else config.MODELS_DIR / self.MODEL_FILE
         self.model_data = None
+        self.series_path = config.FORECAST_SERIES_PATH
+        self._series = _SeriesTable.empty()
+        self._series_fingerprint: Optional[str] = None
+        self._series_lock = threading.Lock()
         self._load_model()
     
     def _load_model(self):
         """Load the trained time series model."""
         try:
-            self.model_data = joblib.load(self.model_path)
+            self.model_data = load_model_artifact(self.model_path)
             self.model = self.model_data['model']
             self.model_type = self.model_data['model_type']
             self.train_years = self.model_data['train_years']
             self.metrics = self.model_data.get('metrics', {})
-            print(f"✅ Enrollment forecast model loaded: {self.model_type}")
+            self._precompute_forecasts()
+            logger.info("Enrollment forecast model loaded: %s", self.model_type)
         except Exception as e:
             raise RuntimeError(f"Failed to load enrollment model: {str(e)}")
     
     def forecast(self, years_ahead: int = 5) -> Dict[str, Any]:
-        """Generate enrollment forecast for specified years."""
+        """
+        Generate enrollment forecast for specified years.
+        
+        Horizons up to MAX_YEARS_AHEAD are served from the table precomputed at
+        load time (the returned dict is shared and must not be modified).
+        """
+        precomputed = self._forecast_table.get(years_ahead)
+        if precomputed is not None:
+            return precomputed
+        future_years, predictions = self._predict_enrollments(years_ahead)
+        return self._build_forecast(future_years, predictions, self._trend_labels(predictions))
+    
+    def forecast_etag(self, years_ahead: int) -> str:
+        """Entity tag of the forecast for years_ahead (changes only when the result does)."""
+        etag = self._etags.get(years_ahead)
+        if etag is None:
+            etag = self._compute_etag(self.forecast(years_ahead))
+        return etag
+    
+    def _precompute_forecasts(self):
+        """
+        Forecast the full supported horizon once and build the response for every
+        years_ahead from slices of it.
+        
+        Each year's trend only depends on the previous year, so the trend labels
+        of a shorter horizon are a prefix of the full table's labels.
+        """
+        future_years, predictions = self._predict_enrollments(self.MAX_YEARS_AHEAD)
+        trends = self._trend_labels(predictions)
+        
+        self._forecast_table = {}
+        self._etags = {}
+        for years_ahead in range(1, self.MAX_YEARS_AHEAD + 1):
+            forecast = self._build_forecast(
+                future_years[:years_ahead], predictions[:years_ahead], trends[:years_ahead]
+            )
+            self._forecast_table[years_ahead] = forecast
+            self._etags[years_ahead] = self._compute_etag(forecast)
+    
+    def _predict_enrollments(self, years_ahead: int) -> tuple:
+        """Predict (rounded, non-negative) enrollments for the years after the training period."""
         # Get the last training year
         last_year = max(self.train_years)
         
@@ -58,27 +217,26 @@ class EnrollmentForecastService:
         # Ensure non-negative predictions
         predictions = np.maximum(predictions, 0)
         
+        return future_years, predictions
+    
+    def _trend_labels(self, predictions: np.ndarray) -> List[str]:
+        """Year-over-year trend of each prediction (the first year is "stable")."""
+        return _trend_matrix(np.asarray(predictions).reshape(1, -1))[0]
+    
+    def _build_forecast(self, future_years: np.ndarray, predictions: np.ndarray, trends: List[str],
+                        model_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Assemble the forecast response for one horizon (model_info defaults to the global model's)."""
+        years_ahead = len(future_years)
+        
         # Build forecast list with trends
-        forecasts = []
-        for i, (year, enrollment) in enumerate(zip(future_years, predictions)):
-            # Determine trend
-            if i == 0:
-                trend = "stable"
-            else:
-                prev_enrollment = predictions[i-1]
-                diff_pct = ((enrollment - prev_enrollment) / prev_enrollment) * 100
-                if diff_pct > 2:
-                    trend = "increasing"
-                elif diff_pct < -2:
-                    trend = "decreasing"
-                else:
-                    trend = "stable"
-            
-            forecasts.append({
+        forecasts = [
+            {
                 "year": int(year),
                 "predicted_enrollment": int(enrollment),
                 "trend": trend
-            })
+            }
+            for year, enrollment, trend in zip(future_years, predictions, trends)
+        ]
         
         # Calculate overall statistics
         first_prediction = predictions[0]
@@ -103,9 +261,185 @@ class EnrollmentForecastService:
             "total_growth": round(total_growth, 2),
             "average_enrollment": average_enrollment,
             "trend_description": trend_desc,
-            "model_info": {
+            "model_info": model_info if model_info is not None else {
                 "model_type": self.model_type,
                 "training_period": f"{min(self.train_years)}-{max(self.train_years)}",
                 "metrics": self.metrics
             }
         }
+    
+    @staticmethod
+    def _compute_etag(forecast: Dict[str, Any]) -> str:
+        canonical = json.dumps(forecast, sort_keys=True, separators=(",", ":"), default=str)
+        return '"' + hashlib.sha256(canonical.encode()).hexdigest()[:32] + '"'
+
+    
+    def fit_series(self, series: Sequence[Dict[str, Any]], degree: int = 2) -> List[Dict[str, Any]]:
+        """
+        Fit and store a polynomial trend for each series.
+        
+        Series sharing the same training years are fitted together in one
+        least-squares call; the resulting groups are fitted in parallel on
+        STRATUS_FORECAST_FIT_WORKERS threads (NumPy releases the GIL). Refitting
+        an existing key replaces it. The merged series are saved to
+        STRATUS_FORECAST_SERIES_PATH, where the other workers pick them up.
+        
+        Args:
+            series: Dicts with key, years, enrollments and optional campus/program
+            degree: Polynomial degree (1..MAX_SERIES_DEGREE)
+        
+        Returns:
+            Fit summary per series, in input order
+        """
+        if not 1 <= degree <= MAX_SERIES_DEGREE:
+            raise ValueError(f"Invalid degree {degree}. Must be between 1 and {MAX_SERIES_DEGREE}")
+        keys = [item["key"] for item in series]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Series keys must be unique")
+        
+        # Group series by their (sorted) training years
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        histories = []
+        for position, item in enumerate(series):
+            if len(item["years"]) <= degree:
+                raise ValueError(f"Series '{item['key']}' needs at least {degree + 1} years to fit a degree-{degree} trend")
+            order = np.argsort(item["years"])
+            years = tuple(int(year) for year in np.asarray(item["years"])[order])
+            histories.append(np.asarray(item["enrollments"], dtype=np.float64)[order])
+            groups.setdefault(years, []).append(position)
+        
+        def fit_group(years: Tuple[int, ...]) -> Tuple[float, np.ndarray, np.ndarray]:
+            positions = groups[years]
+            return _fit_series_group(np.array(years, dtype=np.float64), np.stack([histories[p] for p in positions]), degree)
+        
+        group_years = list(groups)
+        workers = min(config.FORECAST_FIT_WORKERS, len(group_years))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="forecast-fit") as pool:
+                fits = list(pool.map(fit_group, group_years))
+        else:
+            fits = [fit_group(years) for years in group_years]
+        
+        coefs = np.zeros((len(series), MAX_SERIES_DEGREE + 1))
+        offsets = np.zeros(len(series))
+        last_years = np.zeros(len(series), dtype=np.int64)
+        summaries: List[Optional[Dict[str, Any]]] = [None] * len(series)
+        for years, (offset, group_coefs, rmse) in zip(group_years, fits):
+            for row, position in enumerate(groups[years]):
+                item = series[position]
+                coefs[position] = group_coefs[row]
+                offsets[position] = offset
+                last_years[position] = years[-1]
+                summaries[position] = {
+                    "key": item["key"],
+                    "campus": item.get("campus"),
+                    "program": item.get("program"),
+                    "degree": degree,
+                    "training_period": f"{years[0]}-{years[-1]}",
+                    "rmse": round(float(rmse[row]), 2),
+                }
+        
+        # Merge with the latest saved series (under the file lock, so fits from other
+        # workers are not lost), save, and publish the new table in one assignment,
+        # so concurrent forecasts always see a consistent snapshot
+        with self._series_lock, _file_lock(self.series_path):
+            current = self._reload_series_locked()
+            refitted = set(keys)
+            kept = [row for row, key in enumerate(current.keys) if key not in refitted]
+            table = _SeriesTable(
+                [current.keys[row] for row in kept] + keys,
+                [current.info[row] for row in kept] + summaries,
+                np.concatenate([current.coefs[kept], coefs]),
+                np.concatenate([current.offsets[kept], offsets]),
+                np.concatenate([current.last_years[kept], last_years]),
+            )
+            table.save(self.series_path)
+            self._series = table
+            self._series_fingerprint = model_fingerprint(self.series_path)
+        
+        logger.info("Fitted %d enrollment series in %d groups (%d stored)", len(series), len(group_years), len(table.keys))
+        return summaries
+    
+    def _current_series(self) -> _SeriesTable:
+        """The stored series, reloaded when the series file changed (a fit in another worker, or a restart)."""
+        with self._series_lock:
+            return self._reload_series_locked()
+    
+    def _reload_series_locked(self) -> _SeriesTable:
+        try:
+            fingerprint = model_fingerprint(self.series_path)
+        except OSError:
+            fingerprint = None
+        if fingerprint != self._series_fingerprint:
+            self._series = _SeriesTable.load(self.series_path) if fingerprint else _SeriesTable.empty()
+            self._series_fingerprint = fingerprint
+            logger.info("Loaded %d enrollment series from %s", len(self._series.keys), self.series_path)
+        return self._series
+    
+    def series_keys(self) -> List[str]:
+        """Keys of the stored series, in insertion order."""
+        return list(self._current_series().keys)
+    
+    def forecast_series(self, years_ahead: int = 5, keys: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Forecast many stored series at once.
+        
+        All polynomials are evaluated together with Horner's scheme on a
+        (series x years) matrix, so the cost is a handful of NumPy operations
+        regardless of the number of series.
+        
+        Args:
+            years_ahead: Number of years after each series' last training year
+            keys: Series to forecast (all stored series when None)
+        
+        Returns:
+            One forecast dict per series (same shape as forecast(), plus key,
+            campus and program), in the order of keys
+        
+        Raises:
+            KeyError: If a key has not been fitted
+        """
+        table = self._current_series()
+        if keys is None:
+            rows = np.arange(len(table.keys))
+        else:
+            missing = [key for key in keys if key not in table.index]
+            if missing:
+                raise KeyError(f"Unknown enrollment series: {missing}")
+            rows = np.array([table.index[key] for key in keys], dtype=np.int64)
+        
+        future_years = table.last_years[rows, None] + np.arange(1, years_ahead + 1)
+        t = future_years - table.offsets[rows, None]
+        coefs = table.coefs[rows]
+        values = np.repeat(coefs[:, :1], years_ahead, axis=1)
+        for k in range(1, MAX_SERIES_DEGREE + 1):
+            values = values * t + coefs[:, k:k + 1]
+        
+        # Same post-processing as the global model: whole, non-negative students
+        predictions = np.maximum(np.round(values).astype(int), 0)
+        trends = _trend_matrix(predictions)
+        
+        results = []
+        for i, row in enumerate(rows):
+            info = table.info[row]
+            forecast = self._build_forecast(future_years[i], predictions[i], trends[i], model_info={
+                "model_type": f"Polynomial Regression (degree={info['degree']})",
+                "training_period": info["training_period"],
+                "metrics": {"rmse_in_sample": info["rmse"]},
+            })
+            forecast.update(key=info["key"], campus=info["campus"], program=info["program"])
+            results.append(forecast)
+        return results
+
+
+# Live instance owned by the model registry (newest model version, hot-swapped).
+# Fitted series do not come from the artefact; a new instance reads them from
+# the series file.
+model_registry.register(
+    "enrollment", EnrollmentForecastService.MODEL_FILE, EnrollmentForecastService,
+    endpoints=["/api/admin/forecast", "/api/admin/forecast/series"]
+)
+
+def get_enrollment_service() -> EnrollmentForecastService:
+    """Get the live enrollment forecast service (loaded on first use)."""
+    return model_registry.get("enrollment")
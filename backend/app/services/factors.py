@@ -0,0 +1,61 @@
+"""
+Structured Prediction Factors
+Factor analysis emits (code, value) pairs instead of formatted sentences.
+Each service keeps a table from its factor codes to a category, a text
+template and the recommendation flags the factor raises; the text is only
+rendered when a response is serialized, and recommendations are selected
+from the combined flags instead of by searching the rendered concerns.
+
+Cohort reports analyze the same thresholds column-wise into a code matrix
+with one column per factor slot (0 where a slot yields no factor), so
+factors can be counted without building per-student factors or text.
+"""
+
+from enum import IntEnum
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Type
+
+import numpy as np
+
+# Response categories, in the order they appear in the factors dict
+CATEGORIES = ("positive", "concerns", "neutral")
+
+
+class FactorTemplate(NamedTuple):
+    """How one factor code is categorized, worded and acted upon."""
+    category: str   # One of CATEGORIES
+    text: str       # str.format template; {value} is the factor's parameter
+    flags: int = 0  # Recommendation flags raised by the factor
+
+
+class Factor(NamedTuple):
+    """One contributing factor: a service-specific code and its parameter."""
+    code: IntEnum
+    value: Any = None
+
+
+def render_factors(factors: Iterable[Factor], templates: Mapping[IntEnum, FactorTemplate]) -> Dict[str, List[str]]:
+    """
+    Render structured factors into the response's {category: [text, ...]} dict.
+
+    Factors keep their analysis order within each category; values are
+    formatted with str() exactly as the f-strings they replace.
+    """
+    rendered = {category: [] for category in CATEGORIES}
+    for code, value in factors:
+        template = templates[code]
+        rendered[template.category].append(template.text.format(value=value))
+    return rendered
+
+
+def factor_flags(factors: Iterable[Factor], templates: Mapping[IntEnum, FactorTemplate]) -> int:
+    """Combined recommendation flags of a set of factors (its factor signature)."""
+    flags = 0
+    for code, _ in factors:
+        flags |= templates[code].flags
+    return flags
+
+
+def count_factors(codes: np.ndarray, code_type: Type[IntEnum]) -> Dict[IntEnum, int]:
+    """Number of students with each factor code in a code matrix (unused codes count 0)."""
+    counts = np.bincount(np.asarray(codes, dtype=np.intp).ravel(), minlength=max(code_type) + 1)
+    return {code: int(counts[code]) for code in code_type}
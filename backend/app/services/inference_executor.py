@@ -0,0 +1,131 @@
+"""
+Inference Executor
+Runs blocking model inference on dedicated, bounded worker pools instead of
+the event loop, and tracks queue depth and wait times for each pool.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app import config
+from app.services.metrics import CallbackGauge, register
+from app.services.warmup import start_model_polling
+
+
+def _timed_call(fn: Callable, args: tuple) -> tuple:
+    """Run fn in the worker and report when it actually started (monotonic clock is system-wide)."""
+    started = time.monotonic()
+    return started, fn(*args)
+
+
+class InferenceExecutor:
+    """A bounded pool of inference workers (threads or processes) with queue metrics."""
+    
+    def __init__(self, name: str, max_workers: int, kind: str = "thread"):
+        """
+        Args:
+            name: Pool name reported in the stats
+            max_workers: Number of worker threads/processes
+            kind: "thread" or "process" (process pools need picklable, module-level functions)
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Invalid executor kind '{kind}'. Must be 'thread' or 'process'")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+    
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # Each worker holds its own model services, so it polls for new versions itself
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=start_model_polling)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"inference-{self.name}")
+        return self._executor
+    
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        """Run fn(*args) on the pool and await its result without blocking the event loop."""
+        submitted = time.monotonic()
+        with self._lock:
+            self._queued += 1
+        
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), _timed_call, fn, args)
+        
+        # For thread pools, a task counts as running as soon as a worker picks it up
+        started = None
+        try:
+            started, result = await future
+            return result
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            wait = (started if started is not None else time.monotonic()) - submitted
+            with self._lock:
+                self._queued -= 1
+                self._completed += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the pool's load: tasks waiting or running, and queue wait times."""
+        with self._lock:
+            completed = self._completed
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "in_flight": self._queued,
+                "queue_depth": max(self._queued - self.max_workers, 0),
+                "completed": completed,
+                "failed": self._failed,
+                "avg_wait_ms": round(self._total_wait / completed * 1000, 3) if completed else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3)
+            }
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Shared pool for all models
+inference_executor = InferenceExecutor("default", config.INFERENCE_THREADS)
+
+# The recommendation model can optionally run in its own process pool
+if config.RECOMMENDATION_EXECUTOR == "process":
+    recommendation_executor = InferenceExecutor("recommendation", config.RECOMMENDATION_PROCESSES, kind="process")
+else:
+    recommendation_executor = inference_executor
+
+
+def get_executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every distinct inference pool."""
+    executors = {inference_executor.name: inference_executor, recommendation_executor.name: recommendation_executor}
+    return {name: executor.stats() for name, executor in executors.items()}
+
+
+def shutdown_executors() -> None:
+    inference_executor.shutdown()
+    recommendation_executor.shutdown()
+
+
+# Pool load on /metrics, read at scrape time
+def _pool_gauge(stat: str):
+    return lambda: {(name,): stats[stat] for name, stats in get_executor_stats().items()}
+
+
+register(CallbackGauge("stratus_inference_in_flight", "Inference tasks queued or running per pool", ("pool",), _pool_gauge("in_flight")))
+register(CallbackGauge("stratus_inference_queue_depth", "Inference tasks waiting for a free worker per pool", ("pool",), _pool_gauge("queue_depth")))
@@ -0,0 +1,61 @@
+"""
+Fast KMeans Assignment
+Assigns clusters on raw (unscaled) feature rows with the StandardScaler folded
+into the centroids at load time, so a prediction is one small NumPy distance
+computation instead of DataFrame construction, a scaler transform and
+KMeans.predict's input validation.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+class FoldedKMeans:
+    """
+    Nearest-centroid assignment equivalent to kmeans.predict(scaler.transform(X)).
+
+    With z = (x - mean) / scale, the squared distance to a centroid c is
+    sum(((x - (mean + scale * c)) / scale) ** 2). The centroids are therefore
+    moved back to the raw feature space once (mean + scale * c) and each
+    feature is weighted by 1 / scale**2.
+    """
+
+    def __init__(self, kmeans, scaler: Optional[object] = None):
+        """
+        Args:
+            kmeans: Fitted sklearn KMeans (or anything with cluster_centers_)
+            scaler: Fitted StandardScaler applied before the KMeans, or None
+        """
+        centers = np.asarray(kmeans.cluster_centers_, dtype=np.float64)
+        n_features = centers.shape[1]
+
+        mean = getattr(scaler, "mean_", None)
+        scale = getattr(scaler, "scale_", None)
+        mean = np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+        scale = np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+
+        self.centroids = mean + scale * centers
+        self.weights = 1.0 / (scale * scale)
+        self.n_clusters = centers.shape[0]
+        self.n_features = n_features
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Assign each raw feature row to its nearest centroid.
+
+        Args:
+            X: Array of shape (n_samples, n_features) or a single row of shape (n_features,)
+
+        Returns:
+            Cluster labels, one per row (ties go to the lowest cluster index, as in KMeans)
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+
+        diff = X[:, None, :] - self.centroids[None, :, :]
+        distances = (diff * diff) @ self.weights
+        return distances.argmin(axis=1).astype(np.int32)
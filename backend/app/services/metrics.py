@@ -0,0 +1,178 @@
+"""
+Metrics
+Minimal in-process Prometheus-style metrics: counters, gauges and latency
+histograms with labels, rendered in the Prometheus text exposition format on
+/metrics. Updates are a dict lookup and a lock-protected increment, so they
+are cheap enough for the per-request stages.
+
+Metrics are per process: with multiple uvicorn workers (or the recommendation
+process pool) each process reports its own values.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds (100 µs .. 10 s)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"]
+
+    def _render_samples(self, samples: Dict[Tuple[str, ...], float]) -> List[str]:
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(samples.items())
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+    type_name = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            samples = dict(self._values)
+        return self._render_samples(samples)
+
+
+class Gauge(_Metric):
+    """Last observed value per label set."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            samples = dict(self._values)
+        return self._render_samples(samples)
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose values are read at scrape time from a callback returning {label tuple: value}."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str], callback: Callable[[], Dict[Tuple[str, ...], float]]):
+        super().__init__(name, description, labelnames)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        return self._render_samples(self.callback())
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket latency histogram per label set."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label set -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items())
+        lines = self._header()
+        for labels, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+# Registered metrics, in exposition order
+_registry: List[_Metric] = []
+
+
+def register(metric):
+    """Add a metric to the /metrics output and return it."""
+    _registry.append(metric)
+    return metric
+
+
+REQUESTS = register(Counter(
+    "stratus_requests_total", "HTTP requests by route, method and status code", ("endpoint", "method", "status")))
+REQUEST_LATENCY = register(Histogram(
+    "stratus_request_duration_seconds", "End-to-end HTTP request latency by route", ("endpoint", "method")))
+STAGE_LATENCY = register(Histogram(
+    "stratus_stage_duration_seconds", "Latency of each prediction stage by endpoint", ("endpoint", "stage")))
+CACHE_LOOKUPS = register(Counter(
+    "stratus_prediction_cache_lookups_total", "Prediction cache lookups by namespace and result", ("namespace", "result")))
+MODEL_LOAD_SECONDS = register(Gauge(
+    "stratus_model_load_seconds", "Time taken to load each model artefact", ("model",)))
+
+
+@contextmanager
+def stage_timer(endpoint: str, stage: str) -> Iterator[None]:
+    """Time a block and record it as one stage of an endpoint."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, endpoint, stage)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,346 @@
+"""
+Model Bundles
+Compact, pickle-free form of a model artefact, exported next to the pickle
+as a directory:
+
+    <stem>.bundle/
+        manifest.json   format version, source pickle fingerprint, the object
+                        graph (estimator classes and their fitted attributes)
+                        and a table of the arrays it references
+        arrays.bin      every NumPy array's raw data, 64-byte aligned
+
+Loading reads the manifest and memory-maps arrays.bin once; each array is a
+zero-copy read-only view of the file, so workers share the pages. Objects
+are encoded through the pickle reduce protocol (constructor, arguments and
+state), so fitted sklearn/XGBoost estimators need no per-class code. The
+only callables a bundle can name are the exact "module:qualname" entries of
+ALLOWED_GLOBALS (estimator classes, NumPy types and the copyreg/builtins
+helpers the reduce protocol emits, none of which evaluates code or looks up
+other names), so loading a bundle cannot run arbitrary code the way
+unpickling can. A model using a class not listed there fails to export and
+keeps loading from its pickle until the class is added. XGBoost boosters
+keep their raw serialized model as a uint8 array.
+"""
+
+import importlib
+import json
+import os
+import shutil
+import types
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from numpy.lib.format import descr_to_dtype, dtype_to_descr
+
+
+# Bumped when the manifest layout changes; older loaders refuse newer bundles
+BUNDLE_FORMAT = 1
+
+BUNDLE_SUFFIX = ".bundle"
+MANIFEST_FILE = "manifest.json"
+ARRAYS_FILE = "arrays.bin"
+
+# Alignment of each array in arrays.bin (a cache line, enough for any dtype)
+ARRAY_ALIGNMENT = 64
+
+# Every global a bundle may reference, as "module:qualname" (exact names only:
+# nothing is looked up beyond the listed attribute of the listed module)
+ALLOWED_GLOBALS = frozenset({
+    # Estimators and transformers of the shipped models (and the tree
+    # ensembles compiled_models supports)
+    "sklearn.cluster._kmeans:KMeans",
+    "sklearn.compose._column_transformer:ColumnTransformer",
+    "sklearn.compose._column_transformer:_RemainderColsList",
+    "sklearn.ensemble._forest:ExtraTreesClassifier",
+    "sklearn.ensemble._forest:RandomForestClassifier",
+    "sklearn.impute._base:SimpleImputer",
+    "sklearn.linear_model._base:LinearRegression",
+    "sklearn.linear_model._logistic:LogisticRegression",
+    "sklearn.pipeline:Pipeline",
+    "sklearn.preprocessing._data:StandardScaler",
+    "sklearn.preprocessing._encoders:OneHotEncoder",
+    "sklearn.preprocessing._label:LabelEncoder",
+    "sklearn.preprocessing._polynomial:PolynomialFeatures",
+    "sklearn.tree._classes:DecisionTreeClassifier",
+    "sklearn.tree._classes:ExtraTreeClassifier",
+    "sklearn.tree._tree:Tree",
+    "xgboost.core:Booster",
+    "xgboost.sklearn:XGBClassifier",
+    # NumPy arrays, dtypes and scalar types (e.g. an encoder's dtype parameter)
+    "numpy:ndarray",
+    "numpy:dtype",
+    "numpy._core.multiarray:_reconstruct",
+    "numpy:bool",
+    "numpy:float32",
+    "numpy:float64",
+    "numpy:int32",
+    "numpy:int64",
+    # Object construction of the reduce protocol (the class argument must itself be listed)
+    "copyreg:__newobj__",
+    "copyreg:__newobj_ex__",
+    "copyreg:_reconstructor",
+    # Plain containers and types
+    "builtins:bool",
+    "builtins:complex",
+    "builtins:float",
+    "builtins:frozenset",
+    "builtins:int",
+    "builtins:object",
+    "builtins:set",
+    "builtins:slice",
+    "builtins:str",
+})
+
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+class BundleError(ValueError):
+    """The bundle is malformed, from a newer format or references a global outside ALLOWED_GLOBALS."""
+
+
+def bundle_path(model_path: Path) -> Path:
+    """Bundle directory belonging to a pickled artefact ("dropout(obj1).pkl" -> "dropout(obj1).bundle")."""
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.stem + BUNDLE_SUFFIX)
+
+
+def _global_name(obj: Any) -> str:
+    module = getattr(obj, "__module__", None)
+    qualname = getattr(obj, "__qualname__", None) or getattr(obj, "__name__", None)
+    if not module or not qualname or "<" in qualname:
+        raise BundleError(f"Cannot reference {obj!r} by name")
+    name = f"{module}:{qualname}"
+    if name not in ALLOWED_GLOBALS:
+        raise BundleError(f"{name} is not in ALLOWED_GLOBALS (add it there if it is safe to construct)")
+    return name
+
+
+def _resolve_global(name: str) -> Any:
+    if name not in ALLOWED_GLOBALS:
+        raise BundleError(f"Bundle references {name}, which is not in ALLOWED_GLOBALS")
+    module, _, qualname = name.partition(":")
+    return getattr(importlib.import_module(module), qualname)
+
+
+class _Encoder:
+    """Turns an object graph into JSON-compatible nodes plus a list of arrays."""
+    
+    def __init__(self):
+        self.arrays: List[np.ndarray] = []
+        self._active = set()
+    
+    def _array(self, array: np.ndarray) -> int:
+        self.arrays.append(np.asarray(array, order="C"))  # ascontiguousarray would turn 0-d arrays into 1-d
+        return len(self.arrays) - 1
+    
+    def encode(self, obj: Any) -> Any:
+        kind = type(obj)
+        if kind in _PRIMITIVES:
+            return obj
+        if kind is list:
+            return [self.encode(item) for item in obj]
+        
+        # Containers may only be visited once on the current path (no cycles)
+        if id(obj) in self._active:
+            raise BundleError(f"Cyclic reference through {kind.__name__}")
+        self._active.add(id(obj))
+        try:
+            return self._encode_object(obj, kind)
+        finally:
+            self._active.discard(id(obj))
+    
+    def _encode_object(self, obj: Any, kind: type) -> Dict[str, Any]:
+        if kind is tuple:
+            return {"$tuple": [self.encode(item) for item in obj]}
+        if kind is dict:
+            if all(type(key) is str for key in obj):
+                return {"$dict": {key: self.encode(value) for key, value in obj.items()}}
+            return {"$items": [[self.encode(key), self.encode(value)] for key, value in obj.items()]}
+        if kind in (bytes, bytearray):
+            return {"$bytes": self._array(np.frombuffer(obj, dtype=np.uint8)), "mutable": kind is bytearray}
+        if kind is np.ndarray:
+            if obj.dtype.hasobject:
+                return {"$objects": self.encode(list(obj.ravel())), "shape": list(obj.shape)}
+            return {"$array": self._array(obj)}
+        if isinstance(obj, np.generic):
+            return {"$scalar": self._array(np.asarray(obj))}
+        if isinstance(obj, np.dtype):
+            return {"$dtype": dtype_to_descr(obj)}
+        if isinstance(obj, (type, types.FunctionType, types.BuiltinFunctionType)):
+            return {"$global": _global_name(obj)}
+        
+        reduced = obj.__reduce_ex__(2)
+        if isinstance(reduced, str):
+            return {"$global": _global_name(obj)}  # Module-level singleton
+        func, args, state, list_items, dict_items = (tuple(reduced) + (None,) * 5)[:5]
+        node = {"$reduce": _global_name(func), "args": self.encode(tuple(args))}
+        if state is not None:
+            node["state"] = self.encode(state)
+        if list_items is not None:
+            node["list_items"] = self.encode(list(list_items))
+        if dict_items is not None:
+            node["dict_items"] = self.encode(dict(dict_items))
+        return node
+
+
+class _Decoder:
+    """Rebuilds an object graph from manifest nodes and the mapped arrays."""
+    
+    def __init__(self, arrays: List[np.ndarray]):
+        self.arrays = arrays
+    
+    def decode(self, node: Any) -> Any:
+        if type(node) is list:
+            return [self.decode(item) for item in node]
+        if type(node) is not dict:
+            return node
+        
+        if "$dict" in node:
+            return {key: self.decode(value) for key, value in node["$dict"].items()}
+        if "$tuple" in node:
+            return tuple(self.decode(item) for item in node["$tuple"])
+        if "$array" in node:
+            return self.arrays[node["$array"]]
+        if "$reduce" in node:
+            return self._reduce(node)
+        if "$items" in node:
+            return {self.decode(key): self.decode(value) for key, value in node["$items"]}
+        if "$objects" in node:
+            array = np.empty(len(node["$objects"]), dtype=object)
+            array[:] = self.decode(node["$objects"])
+            return array.reshape(node["shape"])
+        if "$scalar" in node:
+            return self.arrays[node["$scalar"]][()]
+        if "$bytes" in node:
+            data = self.arrays[node["$bytes"]]
+            return bytearray(data) if node["mutable"] else data.tobytes()
+        if "$dtype" in node:
+            return descr_to_dtype(_descr(node["$dtype"]))
+        if "$global" in node:
+            return _resolve_global(node["$global"])
+        raise BundleError(f"Unknown bundle node {sorted(node)}")
+    
+    def _reduce(self, node: Dict[str, Any]) -> Any:
+        # Same steps as pickle's REDUCE/NEWOBJ and BUILD opcodes
+        func = _resolve_global(node["$reduce"])
+        obj = func(*self.decode(node["args"]))
+        if "list_items" in node:
+            obj.extend(self.decode(node["list_items"]))
+        if "dict_items" in node:
+            for key, value in self.decode(node["dict_items"]).items():
+                obj[key] = value
+        if "state" in node:
+            state = self.decode(node["state"])
+            setstate = getattr(obj, "__setstate__", None)
+            if setstate is not None:
+                setstate(state)
+            else:
+                slot_state = None
+                if isinstance(state, tuple) and len(state) == 2:
+                    state, slot_state = state
+                if state:
+                    obj.__dict__.update(state)
+                if slot_state:
+                    for name, value in slot_state.items():
+                        setattr(obj, name, value)
+        return obj
+
+
+def export_bundle(artifact: Any, destination: Path, source: Optional[Dict[str, Any]] = None) -> Path:
+    """
+    Write an artefact as a bundle directory (replacing any previous one atomically).
+    
+    Args:
+        artifact: The loaded artefact (e.g. the dict pickled by a training notebook)
+        destination: Bundle directory to create
+        source: Provenance recorded in the manifest (e.g. the pickle's name and fingerprint)
+    
+    Raises:
+        BundleError: If the artefact references something that cannot be bundled
+    """
+    destination = Path(destination)
+    encoder = _Encoder()
+    root = encoder.encode(artifact)
+    
+    tmp = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    try:
+        table = []
+        with open(tmp / ARRAYS_FILE, "wb") as f:
+            offset = 0
+            for array in encoder.arrays:
+                padding = -offset % ARRAY_ALIGNMENT
+                f.write(b"\0" * padding)
+                offset += padding
+                table.append({"dtype": dtype_to_descr(array.dtype), "shape": list(array.shape), "offset": offset})
+                data = array.tobytes()
+                f.write(data)
+                offset += len(data)
+        
+        manifest = {"format": BUNDLE_FORMAT, "source": source or {}, "arrays": table, "root": root}
+        with open(tmp / MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, separators=(",", ":"))
+        
+        # Swap the directories; a concurrent reader sees the old or the new bundle
+        old = destination.with_name(f".{destination.name}.{os.getpid()}.old")
+        if destination.exists():
+            os.replace(destination, old)
+        os.replace(tmp, destination)
+        shutil.rmtree(old, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return destination
+
+
+def read_manifest(path: Path) -> Dict[str, Any]:
+    """The bundle's manifest, checked against the supported format."""
+    with open(Path(path) / MANIFEST_FILE) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise BundleError(f"Unsupported bundle format {manifest.get('format')} in {path} (expected {BUNDLE_FORMAT})")
+    return manifest
+
+
+def load_bundle(path: Path, manifest: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Rebuild the artefact stored in a bundle directory.
+    
+    Args:
+        path: Bundle directory
+        manifest: Its already parsed manifest (read from path otherwise)
+    """
+    path = Path(path)
+    if manifest is None:
+        manifest = read_manifest(path)
+    
+    table = manifest["arrays"]
+    arrays = []
+    if table:
+        # Plain ndarray views of the mapping (np.memmap views carry per-slice overhead)
+        data = np.asarray(np.memmap(path / ARRAYS_FILE, dtype=np.uint8, mode="r"))
+        dtypes = {}
+        for entry in table:
+            key = json.dumps(entry["dtype"])
+            dtype = dtypes.get(key)
+            if dtype is None:
+                dtype = dtypes[key] = descr_to_dtype(_descr(entry["dtype"]))
+            shape = entry["shape"]
+            count = 1
+            for size in shape:
+                count *= size
+            start = entry["offset"]
+            arrays.append(data[start:start + count * dtype.itemsize].view(dtype).reshape(shape))
+    return _Decoder(arrays).decode(manifest["root"])
+
+
+def _descr(descr: Any) -> Any:
+    """Restore the (name, format[, shape]) tuples of a structured dtype descr, which JSON turns into lists."""
+    if not isinstance(descr, list):
+        return descr
+    fields = []
+    for field in descr:
+        name = tuple(field[0]) if isinstance(field[0], list) else field[0]
+        fields.append((name, _descr(field[1])) + tuple(tuple(part) for part in field[2:]))
+    return fields
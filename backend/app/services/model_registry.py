@@ -0,0 +1,298 @@
+"""
+Model Registry
+Owns the live instance of every model service and replaces it when a new
+model version is published, without restarting the workers.
+
+Versions are discovered in MODELS_DIR next to the original artefact, named
+<stem>@<version><suffix> (e.g. "dropout(obj1)@2.pkl" or
+"dropout(obj1)@2026-11-02.pkl"); the unversioned file is the "base" version
+and the highest version in natural order is the active one. A background
+thread polls the directory with stat() (size and modification time, so no
+file watcher or external service is needed). When the newest version or
+its content changes and has stayed unchanged for one poll (so half-copied
+files are skipped), it is loaded and probed with a synthetic prediction on
+that thread, and the service reference is swapped in a single assignment.
+Requests that already hold the previous service finish on it; a version
+that fails to load or validate is reported and never replaces a working one.
+"""
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app import config
+from app.services.metrics import Counter, register
+from app.services.model_store import model_fingerprint
+from app.services.prediction_cache import prediction_cache
+
+logger = logging.getLogger(__name__)
+
+# Separator between an artefact's stem and its version in versioned file names
+VERSION_SEPARATOR = "@"
+
+# Version name of the unversioned artefact
+BASE_VERSION = "base"
+
+MODEL_SWAPS = register(Counter(
+    "stratus_model_swaps_total", "New model versions swapped in or rejected, by model and outcome", ("model", "outcome")))
+
+
+class ModelVersion(NamedTuple):
+    """One artefact of a model: its version name and file."""
+    version: str
+    path: Path
+
+
+def _version_key(version: str) -> tuple:
+    """Natural sort key ("2" < "10", "v9" < "v10"); the base version sorts first."""
+    if version == BASE_VERSION:
+        return (0,)
+    parts = re.split(r"(\d+)", version)
+    return (1,) + tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in parts if part)
+
+
+def discover_versions(models_dir: Path, model_file: str) -> List[ModelVersion]:
+    """All artefacts of a model in models_dir, oldest version first."""
+    base = Path(models_dir) / model_file
+    prefix = f"{base.stem}{VERSION_SEPARATOR}"
+    versions = [ModelVersion(BASE_VERSION, base)] if base.is_file() else []
+    try:
+        entries = list(base.parent.iterdir())
+    except OSError:
+        entries = []
+    for path in entries:
+        name = path.name
+        if name.startswith(prefix) and name.endswith(base.suffix) and path.is_file():
+            version = name[len(prefix):len(name) - len(base.suffix)]
+            if version:
+                versions.append(ModelVersion(version, path))
+    return sorted(versions, key=lambda v: _version_key(v.version))
+
+
+class _ModelSlot:
+    """Registration and live state of one model service."""
+    
+    def __init__(self, name: str, model_file: str, factory: Callable[[Path], Any], endpoints: Sequence[str],
+                 cache_namespace: Optional[str], carry_over: Optional[Callable[[Any, Any], None]]):
+        self.name = name
+        self.model_file = model_file
+        self.factory = factory
+        self.endpoints = list(endpoints)
+        self.cache_namespace = cache_namespace
+        self.carry_over = carry_over
+        self.probe: Optional[Callable[[Any], Any]] = None
+        
+        self.service = None
+        self.version: Optional[ModelVersion] = None
+        self.fingerprint: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        
+        # (path, fingerprint) seen on the previous poll, and the last rejected one
+        self.pending: Optional[Tuple[Path, str]] = None
+        self.rejected: Optional[Tuple[Path, str]] = None
+        self.last_error: Optional[str] = None
+        
+        # Serializes loads of this model (first use, polling and manual refreshes)
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """Versioned model services, loaded on first use and hot-swapped by a polling thread."""
+    
+    def __init__(self, models_dir: Path, poll_interval: float):
+        """
+        Args:
+            models_dir: Directory holding the model artefacts
+            poll_interval: Seconds between checks for new versions (0 disables polling)
+        """
+        self.models_dir = Path(models_dir)
+        self.poll_interval = poll_interval
+        self._slots: Dict[str, _ModelSlot] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    def register(self, name: str, model_file: str, factory: Callable[[Path], Any], endpoints: Sequence[str] = (),
+                 cache_namespace: Optional[str] = None, carry_over: Optional[Callable[[Any, Any], None]] = None) -> None:
+        """
+        Register a model service.
+        
+        Args:
+            name: Model name, e.g. "dropout"
+            model_file: Unversioned artefact name in the models directory
+            factory: Builds a service from an artefact path (raises if the artefact is invalid)
+            endpoints: Routes served by the model, reported by status()
+            cache_namespace: Prediction cache namespace to purge when the model is swapped
+            carry_over: Called as carry_over(old_service, new_service) just before a swap,
+                to hand over state that does not come from the artefact
+        """
+        self._slots[name] = _ModelSlot(name, model_file, factory, endpoints, cache_namespace, carry_over)
+    
+    def set_probe(self, name: str, probe: Callable[[Any], Any]) -> None:
+        """Check a new version must pass (e.g. a synthetic prediction) before it is swapped in."""
+        self._slots[name].probe = probe
+    
+    def get(self, name: str) -> Any:
+        """The live service of a model, loading the newest valid version on first use."""
+        slot = self._slots[name]
+        service = slot.service
+        if service is None:
+            with slot.lock:
+                if slot.service is None:
+                    self._load_initial(slot)
+                service = slot.service
+        return service
+    
+    def active_path(self, name: str) -> Path:
+        """Artefact the live service was loaded from (or would be loaded from on first use)."""
+        slot = self._slots[name]
+        version = slot.version
+        if version is not None:
+            return version.path
+        versions = discover_versions(self.models_dir, slot.model_file)
+        return versions[-1].path if versions else self.models_dir / slot.model_file
+    
+    def _load_initial(self, slot: _ModelSlot) -> None:
+        """Load the newest version that loads, falling back to older ones."""
+        versions = discover_versions(self.models_dir, slot.model_file)
+        if not versions:
+            raise FileNotFoundError(f"No artefact for model '{slot.name}' in {self.models_dir} ({slot.model_file})")
+        
+        error = None
+        for version in reversed(versions):
+            fingerprint = None
+            try:
+                fingerprint = model_fingerprint(version.path)
+                service = slot.factory(version.path)
+            except Exception as e:
+                logger.error("Could not load %s model version %s: %s", slot.name, version.version, e)
+                if slot.rejected is None and fingerprint is not None:
+                    slot.rejected = (version.path, fingerprint)  # The newest broken version is not retried by polling
+                slot.last_error, error = str(e), e
+                continue
+            self._install(slot, version, fingerprint, service)
+            return
+        raise error
+    
+    def _install(self, slot: _ModelSlot, version: ModelVersion, fingerprint: str, service: Any) -> None:
+        slot.service = service
+        slot.version = version
+        slot.fingerprint = fingerprint
+        slot.loaded_at = time.time()
+        logger.info("Model %s: version %s active (%s)", slot.name, version.version, version.path.name)
+    
+    def check_for_updates(self, settle: bool = False) -> List[str]:
+        """
+        Swap in new versions of every loaded model.
+        
+        Args:
+            settle: Only load a candidate once it is unchanged since the previous
+                check (used by the polling thread to skip files still being written)
+        
+        Returns:
+            Names of the models that were swapped
+        """
+        swapped = []
+        for slot in list(self._slots.values()):
+            try:
+                if self._check(slot, settle):
+                    swapped.append(slot.name)
+            except Exception as e:
+                logger.exception("Model registry check failed for %s: %s", slot.name, e)
+        return swapped
+    
+    def _check(self, slot: _ModelSlot, settle: bool) -> bool:
+        if slot.service is None:
+            return False  # Not used yet: the first get() loads the newest version
+        
+        versions = discover_versions(self.models_dir, slot.model_file)
+        if not versions:
+            return False  # Keep serving the loaded version
+        version = versions[-1]
+        try:
+            candidate = (version.path, model_fingerprint(version.path))
+        except OSError:
+            return False
+        
+        if candidate == (slot.version.path, slot.fingerprint) or candidate == slot.rejected:
+            slot.pending = None
+            return False
+        if settle and candidate != slot.pending:
+            slot.pending = candidate  # Load it on the next poll if it has not changed by then
+            return False
+        slot.pending = None
+        
+        with slot.lock:
+            if candidate == (slot.version.path, slot.fingerprint):
+                return False  # Swapped by a concurrent check
+            old_service = slot.service
+            start = time.perf_counter()
+            try:
+                service = slot.factory(version.path)
+                if slot.probe is not None:
+                    slot.probe(service)
+            except Exception as e:
+                slot.rejected, slot.last_error = candidate, str(e)
+                MODEL_SWAPS.inc(slot.name, "rejected")
+                logger.error("Rejected %s model version %s (%s): %s", slot.name, version.version, version.path.name, e)
+                return False
+            
+            if slot.carry_over is not None:
+                slot.carry_over(old_service, service)
+            previous = slot.version.version
+            self._install(slot, version, candidate[1], service)
+            slot.last_error = None
+        
+        if slot.cache_namespace:
+            prediction_cache.invalidate(slot.cache_namespace)
+        MODEL_SWAPS.inc(slot.name, "swapped")
+        logger.info("Swapped %s model %s -> %s (loaded and validated in %.2fs)",
+                    slot.name, previous, version.version, time.perf_counter() - start)
+        return True
+    
+    def start_polling(self) -> None:
+        """Start the background polling thread (no-op when disabled or already running)."""
+        if self.poll_interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="model-registry", daemon=True)
+        self._thread.start()
+    
+    def stop_polling(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+    
+    @property
+    def polling(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            self.check_for_updates(settle=True)
+    
+    def status(self) -> List[Dict[str, Any]]:
+        """Active and available versions of every registered model."""
+        models = []
+        for slot in self._slots.values():
+            version = slot.version
+            models.append({
+                "name": slot.name,
+                "endpoints": slot.endpoints,
+                "loaded": slot.service is not None,
+                "active_version": version.version if version else None,
+                "artefact": version.path.name if version else None,
+                "fingerprint": slot.fingerprint,
+                "loaded_at": datetime.fromtimestamp(slot.loaded_at, timezone.utc).isoformat() if slot.loaded_at else None,
+                "available_versions": [v.version for v in discover_versions(self.models_dir, slot.model_file)],
+                "last_error": slot.last_error,
+            })
+        return models
+
+
+# Shared registry of the model services
+model_registry = ModelRegistry(config.MODELS_DIR, config.MODEL_POLL_INTERVAL)
@@ -0,0 +1,187 @@
+"""
+Model Store
+Single entry point for loading model artefacts: from their compact bundle
+when one matches the pickle, otherwise from the pickle, with an optional
+shared memory-mapped cache for multi-worker deployments.
+
+Bundles are exported next to the pickles with:
+    python -m app.services.model_store export [model.pkl ...]
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+import joblib
+
+from app import config
+from app.services.metrics import MODEL_LOAD_SECONDS
+from app.services.model_bundle import BundleError, bundle_path, export_bundle, load_bundle, read_manifest
+
+logger = logging.getLogger(__name__)
+
+
+def model_fingerprint(path: Path) -> str:
+    """Identify the current content of a model file by its size and modification time."""
+    stat = Path(path).stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _source_info(path: Path) -> dict:
+    """Identity of a pickle as recorded in its bundle's manifest."""
+    stat = path.stat()
+    return {
+        "file": path.name,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": hashlib.sha256(path.read_bytes()).hexdigest(),
+    }
+
+
+def _bundle_matches(path: Path, source: dict) -> bool:
+    """
+    Whether a bundle was exported from the current content of the pickle.
+    
+    Size and modification time are compared first; the content hash is only
+    computed when the modification time differs (e.g. after a git checkout
+    or a copy), so an unchanged deployment never reads the pickle.
+    """
+    stat = path.stat()
+    if stat.st_size != source.get("size"):
+        return False
+    if stat.st_mtime_ns == source.get("mtime_ns"):
+        return True
+    return hashlib.sha256(path.read_bytes()).hexdigest() == source.get("sha256")
+
+
+def export_model_bundle(path: Path) -> Path:
+    """
+    Export a pickled artefact to its bundle directory (<stem>.bundle next to it).
+    
+    Returns:
+        The bundle directory
+    
+    Raises:
+        BundleError: If the artefact contains objects that cannot be bundled
+    """
+    path = Path(path)
+    source = _source_info(path)
+    destination = export_bundle(joblib.load(path), bundle_path(path), source=source)
+    logger.info("Exported %s to %s", path.name, destination)
+    return destination
+
+
+def load_model_artifact(path: Path) -> Any:
+    """
+    Load a model artefact (the dict pickled by the training notebooks).
+    
+    A bundle exported from the same pickle is loaded instead when present
+    (STRATUS_MODEL_BUNDLES, on by default): its arrays are views of one
+    memory-mapped file and no pickle code runs. A bundle that does not match
+    the pickle (the model was replaced without re-exporting) or cannot be
+    read is ignored with a warning.
+    
+    Without STRATUS_MODEL_CACHE_DIR pickles are loaded with joblib.load. With it, the
+    pickle is exported once to an uncompressed joblib file in the cache
+    directory (keyed by the source file's fingerprint) and every worker loads
+    that file with mmap_mode="r", so the arrays inside the models map the same
+    read-only pages instead of each worker holding its own copy.
+    """
+    path = Path(path)
+    start = time.perf_counter()
+    artifact = _load_bundle(path) if config.MODEL_BUNDLES else None
+    if artifact is None:
+        artifact = _load(path)
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - start, path.stem)
+    return artifact
+
+
+def _load_bundle(path: Path) -> Optional[Any]:
+    """The artefact from the pickle's bundle, or None when there is no usable bundle."""
+    bundle = bundle_path(path)
+    if not bundle.is_dir():
+        return None
+    try:
+        manifest = read_manifest(bundle)
+        if not _bundle_matches(path, manifest.get("source", {})):
+            logger.warning("Ignoring stale bundle %s: %s has changed since it was exported", bundle.name, path.name)
+            return None
+        return load_bundle(bundle, manifest)
+    except (BundleError, OSError, ValueError, KeyError, ImportError, AttributeError) as e:
+        logger.warning("Could not load bundle %s, loading %s instead: %s", bundle.name, path.name, e)
+        return None
+
+
+def _load(path: Path) -> Any:
+    if not config.MODEL_CACHE_DIR:
+        return joblib.load(path)
+    
+    cache_dir = Path(config.MODEL_CACHE_DIR)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_path = cache_dir / f"{path.stem}-{model_fingerprint(path)}.joblib"
+    
+    if not cache_path.exists():
+        _export_to_cache(path, cache_path)
+    
+    return joblib.load(cache_path, mmap_mode="r")
+
+
+def _export_to_cache(path: Path, cache_path: Path) -> None:
+    """Write the mmap-able copy atomically so concurrent workers never see a partial file."""
+    artifact = joblib.load(path)
+    tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, cache_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    logger.info("Exported %s to shared model cache: %s", path.name, cache_path)
+    
+    # Drop copies of older versions of the same model (workers that still map
+    # them keep their pages until they exit)
+    for stale in cache_path.parent.glob(f"{path.stem}-*.joblib"):
+        if stale != cache_path:
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export model pickles to compact bundles")
+    parser.add_argument("command", choices=["export", "check"],
+                        help="export: write <stem>.bundle next to each pickle; check: report pickles without a matching bundle")
+    parser.add_argument("models", nargs="*", type=Path, help=f"Pickles to process (default: every *.pkl in {config.MODELS_DIR})")
+    args = parser.parse_args(argv)
+    
+    models = args.models or sorted(config.MODELS_DIR.glob("*.pkl"))
+    failed = 0
+    for path in models:
+        bundle = bundle_path(path)
+        if args.command == "export":
+            try:
+                export_model_bundle(path)
+                size = sum(f.stat().st_size for f in bundle.iterdir())
+                print(f"{path.name}: {path.stat().st_size / 1024:.0f} KiB -> {bundle.name} ({size / 1024:.0f} KiB)")
+            except (BundleError, OSError) as e:
+                print(f"{path.name}: not exported ({e})")
+                failed += 1
+        else:
+            try:
+                ok = bundle.is_dir() and _bundle_matches(path, read_manifest(bundle).get("source", {}))
+            except (BundleError, OSError, ValueError):
+                ok = False
+            print(f"{path.name}: {'up to date' if ok else 'missing or stale bundle'}")
+            failed += not ok
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
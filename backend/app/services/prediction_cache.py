@@ -0,0 +1,164 @@
+"""
+Prediction Cache
+Bounded in-process cache of prediction results, keyed on a canonical hash of
+the validated request plus the fingerprint of the model file that produced it
+(or the explicit version of a rule-based endpoint's logic).
+Entries are evicted least-recently-used when the cache is full or once their
+TTL has passed, and are dropped as soon as the model file changes.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app import config
+from app.services.model_store import model_fingerprint
+from app.services.metrics import CACHE_LOOKUPS, CallbackGauge, register
+
+# How long a model file's fingerprint is trusted before it is stat()ed again
+FINGERPRINT_CHECK_INTERVAL = 1.0
+
+
+class PredictionCache:
+    """Thread-safe LRU + TTL cache for prediction results, partitioned by namespace (endpoint)."""
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        """
+        Args:
+            max_size: Maximum number of cached results (0 disables caching)
+            ttl_seconds: Lifetime of an entry in seconds (0 means no expiry)
+        """
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[str, float, Any]]" = OrderedDict()
+        self._fingerprints: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+    
+    def make_key(self, namespace: str, model_path, payload: Dict[str, Any], version: Optional[str] = None) -> str:
+        """
+        Build the cache key for a request.
+        
+        Args:
+            namespace: Endpoint/service name, e.g. "dropout"
+            model_path: Model file whose content the result depends on (None when version is given)
+            payload: Validated request data (model_dump() of the request)
+            version: Explicit version of the logic that produced the result, used
+                instead of a model file fingerprint (rule-based endpoints)
+        """
+        fingerprint = version if version is not None else self._current_fingerprint(namespace, model_path)
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(f"{namespace}|{fingerprint}|{canonical}".encode()).hexdigest()
+        return f"{namespace}:{digest}"
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            value = self._lookup_locked(key)
+        CACHE_LOOKUPS.inc(key.split(":", 1)[0], "miss" if value is None else "hit")
+        return value
+    
+    def _lookup_locked(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        _, expires_at, value = entry
+        if expires_at and expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: str, value: Any) -> None:
+        """Store a result, evicting the least recently used entries when full."""
+        if not self.enabled:
+            return
+        namespace = key.split(":", 1)[0]
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        with self._lock:
+            self._entries[key] = (namespace, expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        """Drop every entry of a namespace (or the whole cache) and re-check its model file on the next request."""
+        with self._lock:
+            self._invalidate_locked(namespace)
+            if namespace is None:
+                self._fingerprints.clear()
+            else:
+                self._fingerprints.pop(namespace, None)
+    
+    def _invalidate_locked(self, namespace: Optional[str]) -> None:
+        if namespace is None:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            return
+        stale = [key for key, (entry_namespace, _, _) in self._entries.items() if entry_namespace == namespace]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+    
+    def _current_fingerprint(self, namespace: str, model_path) -> str:
+        """Fingerprint of the model file, re-checked at most once per interval; purges the namespace on change."""
+        now = time.monotonic()
+        with self._lock:
+            known = self._fingerprints.get(namespace)
+            if known and now - known[1] < FINGERPRINT_CHECK_INTERVAL:
+                return known[0]
+        
+        try:
+            fingerprint = model_fingerprint(model_path)
+        except OSError:
+            fingerprint = "missing"
+        
+        with self._lock:
+            if known and known[0] != fingerprint:
+                self._invalidate_locked(namespace)
+            self._fingerprints[namespace] = (fingerprint, now)
+        return fingerprint
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+
+# Shared instance used by the prediction endpoints
+prediction_cache = PredictionCache(config.PREDICTION_CACHE_SIZE, config.PREDICTION_CACHE_TTL)
+
+# Hit/miss counts per namespace are exported from get(); the size is read at scrape time
+register(CallbackGauge(
+    "stratus_prediction_cache_entries", "Results currently held in the prediction cache", (),
+    lambda: {(): prediction_cache.stats()["size"]}))
@@ -3,26 +3,47 @@ Program Recommendation Service
 Uses ML model with clustering to recommend academic programs based on student profile.
 """
 
-import joblib
+import logging
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from app import config
+from app.services.model_registry import model_registry
+from app.services.model_store import load_model_artifact
+from app.services.metrics import Counter, register, stage_timer
+from app.services.kmeans_fast import FoldedKMeans
+
+logger = logging.getLogger(__name__)
+
+# How often each rule decides the recommendation. Only "preparatory" and
+# "business_soft_skills" are decided without the cluster; "ml_fallback" is the
+# only outcome that runs the preprocessing pipeline and classifier.
+RULE_DECISIONS = register(Counter(
+    "stratus_recommendation_decisions_total", "Program recommendations by deciding rule", ("rule",)))
 
 
 class ProgramRecommendationService:
     """Service for recommending programs using ML model and rule-based logic."""
     
-    def __init__(self):
-        """Initialize the service and load the trained model."""
-        self.model_path = Path(__file__).parent.parent / "models" / "program_recommendation_model(obj3).pkl"
+    # Model artefact in app/models
+    MODEL_FILE = "program_recommendation_model(obj3).pkl"
+    
+    def __init__(self, model_path: Optional[Path] = None):
+        """
+        Initialize the service and load the trained model.
+        
+        Args:
+            model_path: Model artefact to load (defaults to MODEL_FILE in app/models)
+        """
+        self.model_path = Path(model_path) if model_path else config.MODELS_DIR / self.MODEL_FILE
         self.model_data = None
         self._load_model()
     
     def _load_model(self):
         """Load the trained model, preprocessor, and cluster model."""
         try:
-            self.model_data = joblib.load(self.model_path)
+            self.model_data = load_model_artifact(self.model_path)
             self.model = self.model_data['classifier']
             self.preprocess = self.model_data['preprocess_pipeline']
             self.kmeans = self.model_data['kmeans_model']
@@ -30,69 +51,110 @@ class ProgramRecommendationService:
             self.numeric_features = self.model_data['numeric_features_with_cluster']
             self.categorical_features = self.model_data['categorical_features']
             self.label_encoder = self.model_data.get('label_encoder', None)
-            print(f"✅ Program recommendation model loaded successfully")
+            # Scaler folded into the centroids: cluster assignment on raw feature rows
+            # (columns are passed positionally, so their order must match the fit)
+            fitted_features = list(getattr(self.scaler_cluster, 'feature_names_in_', self.CLUSTER_FEATURES))
+            if fitted_features != self.CLUSTER_FEATURES:
+                raise ValueError(f"Cluster scaler was fitted on {fitted_features}, expected {self.CLUSTER_FEATURES}")
+            self.cluster_assigner = FoldedKMeans(self.kmeans, self.scaler_cluster)
+            logger.info("Program recommendation model loaded")
         except Exception as e:
             raise RuntimeError(f"Failed to load recommendation model: {str(e)}")
     
-    def _compute_engineered_features(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Compute engineered features from raw student data."""
-        data = student_data.copy()
+    # Features the cluster scaler and KMeans were fitted on, in order
+    CLUSTER_FEATURES = [
+        "academic_strength",
+        "technical_strength",
+        "soft_skill_strength",
+        "career_score",
+        "global_strength",
+        "final_average"
+    ]
+    
+    # Outcome of each rule: (program, explanation, confidence)
+    RULE_OUTCOMES = {
+        "preparatory": ("Preparatory", "Faible technique + faible pratique + fort académique → Préparatoire", "High"),
+        "business_soft_skills": ("Business", "Soft skills élevés / cluster orienté carrière → Business", "High"),
+        "business_cluster": ("Business", "Soft skills élevés / cluster orienté carrière → Business", "Medium"),
+        "stem_technical": ("STEM", "Profil technique ou cluster technique → STEM", "High"),
+        "stem_cluster": ("STEM", "Profil technique ou cluster technique → STEM", "Medium"),
+    }
+    
+    def _compute_engineered_features(self, students: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Compute the engineered features for a batch as NumPy columns.
+        
+        The formulas (and their evaluation order) are the notebook's, so each
+        value is bit-identical to computing it field by field for one student.
+        """
+        def column(name: str) -> np.ndarray:
+            return np.array([student[name] for student in students])
         
         # Soft skill strength
-        data["soft_skill_strength"] = (
-            data["soft_skills_score"] + data["communication_skills_score"]
-        )
+        soft_skill_strength = column("soft_skills_score") + column("communication_skills_score")
         
         # Technical strength
-        data["technical_strength"] = (
-            data["technical_skills_score"] + data["projects_completed"]
-        )
+        technical_strength = column("technical_skills_score") + column("projects_completed")
         
         # Career score
-        data["career_score"] = (
-            data["internship_completed"] * 2 +
-            data["internship_duration_months"] * 0.3 +
-            data["portfolio_exists"] * 2 +
-            data["linkedin_profile"]
+        career_score = (
+            column("internship_completed") * 2 +
+            column("internship_duration_months") * 0.3 +
+            column("portfolio_exists") * 2 +
+            column("linkedin_profile")
         )
         
         # Academic strength
-        data["academic_strength"] = (
-            data["baccalaureate_score"] * 0.4 +
-            data["previous_years_average"] * 0.6
-        )
+        academic_strength = column("baccalaureate_score") * 0.4 + column("previous_years_average") * 0.6
         
         # Global strength
-        data["global_strength"] = (
-            data["academic_strength"] +
-            data["technical_strength"] +
-            data["soft_skill_strength"]
-        )
+        global_strength = academic_strength + technical_strength + soft_skill_strength
+        
+        return {
+            "soft_skill_strength": soft_skill_strength,
+            "technical_strength": technical_strength,
+            "career_score": career_score,
+            "academic_strength": academic_strength,
+            "global_strength": global_strength
+        }
+    
+    def _predict_clusters(self, students: List[Dict[str, Any]], features: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Predict the cluster of every student.
         
-        return data
+        Same labels as kmeans.predict(scaler_cluster.transform(X)), computed as
+        a distance to the centroids with the scaler folded in (see FoldedKMeans).
+        """
+        columns = dict(features, final_average=np.array([student["final_average"] for student in students]))
+        X = np.column_stack([columns[name] for name in self.CLUSTER_FEATURES])
+        return self.cluster_assigner.predict(X)
     
-    def _predict_cluster(self, student_data: Dict[str, Any]) -> int:
-        """Predict student cluster based on profile."""
-        # Features used for clustering
-        cluster_features = [
-            "academic_strength",
-            "technical_strength",
-            "soft_skill_strength",
-            "career_score",
-            "global_strength",
-            "final_average"
-        ]
+    def _predict_fallback(self, rows: List[Dict[str, Any]], clusters: np.ndarray) -> np.ndarray:
+        """Run the ML classifier for the students no rule applies to, in one call."""
+        # Prepare input for ML model
+        input_df = pd.DataFrame(rows)
+        input_df["cluster"] = clusters
         
-        # Create dataframe with engineered features
-        df_temp = pd.DataFrame([student_data])
-        X = df_temp[cluster_features]
+        # Ensure correct column order
+        input_df = input_df[self.numeric_features + self.categorical_features]
         
-        # Scale using the cluster scaler
-        X_scaled = self.scaler_cluster.transform(X)
+        # Transform using preprocessor and predict
+        predictions = self.model.predict(self.preprocess.transform(input_df))
         
-        # Predict cluster
-        cluster = self.kmeans.predict(X_scaled)[0]
-        return int(cluster)
+        # If model uses label encoding, decode
+        if self.label_encoder:
+            return self.label_encoder.inverse_transform(predictions)
+        return predictions
+    
+    def _count_decisions(self, decisions: Dict[str, np.ndarray], fallback: np.ndarray) -> None:
+        """Count which rule decided each student (the ML fallback included)."""
+        for rule, mask in decisions.items():
+            count = int(mask.sum())
+            if count:
+                RULE_DECISIONS.inc(rule, amount=count)
+        count = int(fallback.sum())
+        if count:
+            RULE_DECISIONS.inc("ml_fallback", amount=count)
     
     def predict(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -100,79 +162,92 @@ class ProgramRecommendationService:
         
         Uses rule-based logic combined with clustering for intelligent recommendations.
         """
-        # Compute engineered features
-        student_data = self._compute_engineered_features(student_data)
+        return self.predict_many([student_data])[0]
+    
+    def predict_many(self, students: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Recommend programs for many students, returning results in input order.
         
-        # Predict cluster
-        cluster = self._predict_cluster(student_data)
+        The engineered features are computed as NumPy columns, clusters are
+        assigned against the folded centroids, the rules are applied as
+        boolean masks over the whole batch, and only the students
+        no rule applies to go through the preprocessing pipeline and the
+        classifier (in a single call). Results are identical to evaluating
+        the rules student by student.
         
-        # Rule-based recommendation logic (from notebook)
+        The cluster is part of the response, so it is assigned for every
+        student (a few microseconds per batch); the deciding rule of each
+        student is counted in stratus_recommendation_decisions_total.
+        """
+        if not students:
+            return []
         
-        # RULE 1: PREPARATORY
-        if (
-            student_data["technical_strength"] < 5 and
-            student_data["projects_completed"] < 2 and
-            student_data["soft_skill_strength"] < 12 and
-            student_data["academic_strength"] > 13
-        ):
-            recommended = "Preparatory"
-            explanation = "Faible technique + faible pratique + fort académique → Préparatoire"
-            confidence = "High"
+        # Compute engineered features
+        with stage_timer("recommendation", "preprocess"):
+            features = self._compute_engineered_features(students)
+            feature_values = {name: values.tolist() for name, values in features.items()}
+            rows = [
+                {**student, **{name: values[i] for name, values in feature_values.items()}}
+                for i, student in enumerate(students)
+            ]
         
-        # RULE 2: BUSINESS
-        elif student_data["soft_skill_strength"] > 15 or cluster == 2:
-            recommended = "Business"
-            explanation = "Soft skills élevés / cluster orienté carrière → Business"
-            confidence = "High" if student_data["soft_skill_strength"] > 15 else "Medium"
+        # Predict clusters
+        with stage_timer("recommendation", "cluster"):
+            clusters = self._predict_clusters(students, features)
         
-        # RULE 3: STEM
-        elif student_data["technical_strength"] > 10 or cluster == 1:
-            recommended = "STEM"
-            explanation = "Profil technique ou cluster technique → STEM"
-            confidence = "High" if student_data["technical_strength"] > 10 else "Medium"
+        soft = features["soft_skill_strength"]
+        technical = features["technical_strength"]
+        academic = features["academic_strength"]
+        projects = np.array([student["projects_completed"] for student in students])
         
+        # Rule pipeline (from notebook): the first matching rule wins, and each rule
+        # only sees the students the earlier rules left undecided
+        rule_conditions = [
+            # RULE 1: PREPARATORY
+            ("preparatory", (technical < 5) & (projects < 2) & (soft < 12) & (academic > 13)),
+            # RULE 2: BUSINESS
+            ("business_soft_skills", soft > 15),
+            ("business_cluster", clusters == 2),
+            # RULE 3: STEM
+            ("stem_technical", technical > 10),
+            ("stem_cluster", clusters == 1),
+        ]
+        undecided = np.ones(len(students), dtype=bool)
+        decisions = {}
+        for rule, condition in rule_conditions:
+            decisions[rule] = undecided & condition
+            undecided &= ~condition
         # FALLBACK: ML MODEL
-        else:
-            # Prepare input for ML model
-            input_df = pd.DataFrame([student_data])
-            input_df["cluster"] = cluster
-            
-            # Ensure correct column order
-            input_df = input_df[self.numeric_features + self.categorical_features]
-            
-            # Transform using preprocessor
-            X_transformed = self.preprocess.transform(input_df)
-            
-            # Predict
-            pred = self.model.predict(X_transformed)[0]
-            
-            # If model uses label encoding, decode
-            if self.label_encoder:
-                recommended = self.label_encoder.inverse_transform([pred])[0]
-            else:
-                recommended = pred
-            
-            explanation = "Prediction du modèle ML (fallback)"
-            confidence = "Medium"
-        
-        # Analyze student profile
-        profile_analysis = self._analyze_profile(student_data)
+        fallback = undecided
+        self._count_decisions(decisions, fallback)
         
-        # Get program details
-        program_details = self._get_program_details(recommended)
+        masks = list(decisions.values())
+        outcomes = [self.RULE_OUTCOMES[rule] for rule in decisions]
+        recommended = np.select(masks, [outcome[0] for outcome in outcomes], "").astype(object)
+        explanation = np.select(masks, [outcome[1] for outcome in outcomes], "Prediction du modèle ML (fallback)")
+        confidence = np.select(masks, [outcome[2] for outcome in outcomes], "Medium")
         
-        # Get alternative programs
-        alternatives = self._get_alternatives(recommended, student_data)
+        if fallback.any():
+            with stage_timer("recommendation", "model"):
+                fallback_rows = np.flatnonzero(fallback)
+                recommended[fallback_rows] = self._predict_fallback(
+                    [rows[i] for i in fallback_rows], clusters[fallback_rows]
+                )
         
-        return {
-            "recommended_program": recommended,
-            "cluster": cluster,
-            "explanation": explanation,
-            "confidence": confidence,
-            "program_details": program_details,
-            "student_profile": profile_analysis,
-            "alternative_programs": alternatives
-        }
+        results = []
+        with stage_timer("recommendation", "factor_analysis"):
+            for i, student_data in enumerate(rows):
+                program = recommended[i]
+                results.append({
+                    "recommended_program": program,
+                    "cluster": int(clusters[i]),
+                    "explanation": str(explanation[i]),
+                    "confidence": str(confidence[i]),
+                    "program_details": self._get_program_details(program),
+                    "student_profile": self._analyze_profile(student_data),
+                    "alternative_programs": self._get_alternatives(program, student_data)
+                })
+        return results
     
     def _analyze_profile(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze student profile strengths and areas for improvement."""
@@ -257,12 +332,17 @@ class ProgramRecommendationService:
         return alternatives if alternatives else ["Focus on your recommended program"]
 
 
-# Singleton instance
-_recommendation_service_instance = None
+# Live instance owned by the model registry (newest model version, hot-swapped)
+model_registry.register(
+    "recommendation", ProgramRecommendationService.MODEL_FILE, ProgramRecommendationService,
+    endpoints=["/api/predict/recommend"], cache_namespace="recommendation"
+)
 
 def get_recommendation_service() -> ProgramRecommendationService:
-    """Get or create the singleton recommendation service instance."""
-    global _recommendation_service_instance
-    if _recommendation_service_instance is None:
-        _recommendation_service_instance = ProgramRecommendationService()
-    return _recommendation_service_instance
+    """Get the live recommendation service (loaded on first use)."""
+    return model_registry.get("recommendation")
+
+
+def recommend_many(students: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Recommend programs for a batch of students with the live service (picklable entry point for process pools)."""
+    return get_recommendation_service().predict_many(students)
@@ -1,12 +1,31 @@
-import pickle
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import logging
 
+from app import config
+from app.services.kmeans_fast import FoldedKMeans
+from app.services.metrics import stage_timer
+from app.services.model_store import load_model_artifact
+
 logger = logging.getLogger(__name__)
 
 class SegmentationService:
+    # Model artefact in app/models
+    MODEL_FILE = "student_clustering_model(obj2).pkl"
+    
+    # Features the scaler and KMeans were fitted on, in order
+    FEATURES = [
+        "scholarship_status_Full Scholarship",
+        "scholarship_status_Partial Scholarship",
+        "scholarship_status_Self-Funded",
+        "baccalaureate_score",
+        "origin_governorate_encoded",
+        "chosen_program_encoded"
+    ]
+    
+    SCHOLARSHIP_STATUSES = ["Full Scholarship", "Partial Scholarship", "Self-Funded"]
+    
     _instance = None
     _initialized = False
     
@@ -23,21 +42,7 @@ class SegmentationService:
     def _load_models(self):
         """Load the clustering model components"""
         try:
-            model_path = Path(__file__).parent.parent / "models" / "student_clustering_model(obj2).pkl"
-            
-            # Since the pickle file appears to be corrupted, we'll create the model structure
-            # based on the notebook code. In production, you should re-save the model properly.
-            logger.warning(f"Model file at {model_path} may be corrupted. Using fallback model structure.")
-            
-            # For now, create dummy components that match the expected structure
-            # TODO: Re-save the model from the notebook using pickle.dump()
-            from sklearn.cluster import KMeans
-            from sklearn.preprocessing import StandardScaler, LabelEncoder
-            
-            self.kmeans_model = None  # Will be loaded when model is fixed
-            self.scaler = None
-            self.governorate_encoder = None
-            self.program_encoder = None
+            self.model_path = Path(__file__).parent.parent / "models" / self.MODEL_FILE
             
             # Cluster interpretations from the notebook
             self.cluster_interpretations = {
@@ -65,24 +70,134 @@ class SegmentationService:
                 }
             }
             
-            logger.info("Segmentation model components initialized (fallback mode)")
+            # One-hot rows per scholarship status
+            self.scholarship_index = {status: i for i, status in enumerate(self.SCHOLARSHIP_STATUSES)}
+            self.scholarship_rows = np.eye(len(self.SCHOLARSHIP_STATUSES))
+            
+            self.kmeans_model = None
+            self.scaler = None
+            self.governorate_encoder = None
+            self.program_encoder = None
+            self.cluster_assigner = None
+            
+            training_csv = config.SEGMENTATION_TRAINING_CSV
+            if training_csv:
+                self._fit_from_csv(Path(training_csv))
+                source = f"rebuilt from {training_csv}"
+            else:
+                try:
+                    model_data = load_model_artifact(self.model_path)
+                except Exception as e:
+                    # Without a model or training data, keep serving with the notebook's rules
+                    logger.warning("Could not load %s (%s). Using fallback cluster rules.", self.model_path, e)
+                    return
+                self.kmeans_model = model_data['kmeans_model']
+                self.scaler = model_data['scaler']
+                self.governorate_encoder = model_data['label_encoder_governorate']
+                self.program_encoder = model_data['label_encoder_program']
+                if list(model_data.get('features', self.FEATURES)) != self.FEATURES:
+                    raise ValueError(f"Clustering model was fitted on {model_data['features']}, expected {self.FEATURES}")
+                source = self.model_path.name
             
+            self._build_lookups()
+            # Scaler folded into the centroids: one distance computation per batch
+            self.cluster_assigner = FoldedKMeans(self.kmeans_model, self.scaler)
+            
+            logger.info("Segmentation model loaded (%s, %d clusters)", source, self.cluster_assigner.n_clusters)
+        
         except Exception as e:
-            logger.error(f"Error loading segmentation model: {e}")
+            logger.error("Error loading segmentation model: %s", e)
             raise
     
-    def _encode_scholarship(self, status: str) -> dict:
-        """One-hot encode scholarship status"""
-        return {
-            "scholarship_status_Full Scholarship": 1 if status == "Full Scholarship" else 0,
-            "scholarship_status_Partial Scholarship": 1 if status == "Partial Scholarship" else 0,
-            "scholarship_status_Self-Funded": 1 if status == "Self-Funded" else 0
-        }
+    def _fit_from_csv(self, path: Path):
+        """
+        Rebuild the encoders, scaler and KMeans from a training CSV with
+        scholarship_status, baccalaureate_score, origin_governorate and
+        chosen_program columns, as in the training notebook.
+        """
+        from sklearn.cluster import KMeans
+        from sklearn.preprocessing import LabelEncoder, StandardScaler
+        
+        df = pd.read_csv(path)
+        missing = [col for col in ("scholarship_status", "baccalaureate_score", "origin_governorate", "chosen_program")
+                   if col not in df.columns]
+        if missing:
+            raise ValueError(f"Segmentation training data {path} is missing columns: {missing}")
+        df = df.dropna(subset=["scholarship_status", "baccalaureate_score", "origin_governorate", "chosen_program"])
+        
+        self.governorate_encoder = LabelEncoder().fit(df["origin_governorate"].astype(str))
+        self.program_encoder = LabelEncoder().fit(df["chosen_program"].astype(str))
+        X = pd.DataFrame({
+            self.FEATURES[0]: (df["scholarship_status"] == "Full Scholarship").astype(int),
+            self.FEATURES[1]: (df["scholarship_status"] == "Partial Scholarship").astype(int),
+            self.FEATURES[2]: (df["scholarship_status"] == "Self-Funded").astype(int),
+            self.FEATURES[3]: df["baccalaureate_score"].astype(float),
+            self.FEATURES[4]: self.governorate_encoder.transform(df["origin_governorate"].astype(str)),
+            self.FEATURES[5]: self.program_encoder.transform(df["chosen_program"].astype(str)),
+        })
+        self.scaler = StandardScaler().fit(X)
+        self.kmeans_model = KMeans(n_clusters=len(self.cluster_interpretations), n_init=10, random_state=42)
+        self.kmeans_model.fit(self.scaler.transform(X))
+        self._align_cluster_ids()
+    
+    def _align_cluster_ids(self):
+        """
+        Renumber refitted clusters so they match the notebook's interpretations:
+        the most Full Scholarship-heavy centroid is 2, the most Self-Funded one
+        of the rest is 1 and the remaining one is 0.
+        """
+        centers = self.kmeans_model.cluster_centers_
+        high = int(np.argmax(centers[:, 0]))
+        rest = [k for k in range(len(centers)) if k != high]
+        low = rest[int(np.argmax(centers[rest, 2]))]
+        middle = next(k for k in rest if k != low)
+        self.kmeans_model.cluster_centers_ = centers[[middle, low, high]]
+    
+    def _build_lookups(self):
+        """
+        Precompute the encoded value of every known category.
+        
+        Each lookup array has one extra trailing slot for unknown categories,
+        holding the scaler mean of that feature (a standardized value of 0,
+        the centre of the training data). A governorate encoder whose classes are the program
+        names (as in the shipped pickle) cannot encode governorates, so every
+        governorate is then treated as unknown.
+        """
+        mean = np.asarray(self.scaler.mean_, dtype=np.float64)
+        
+        governorates = [str(name) for name in self.governorate_encoder.classes_]
+        programs = [str(name) for name in self.program_encoder.classes_]
+        if governorates == programs:
+            logger.warning("Governorate encoder holds program names; governorates are encoded as unknown "
+                           "(set STRATUS_SEGMENTATION_TRAINING_CSV to rebuild the encoders)")
+            governorates = []
+        
+        self.governorate_index = {name: i for i, name in enumerate(governorates)}
+        self.governorate_values = np.append(np.arange(len(governorates), dtype=np.float64), mean[4])
+        self.program_index = {name: i for i, name in enumerate(programs)}
+        self.program_values = np.append(np.arange(len(programs), dtype=np.float64), mean[5])
+    
+    def _encode_batch(self, students: list[dict]) -> np.ndarray:
+        """Raw (unscaled) feature matrix in FEATURES order, one row per student"""
+        n = len(students)
+        unknown_governorate = len(self.governorate_values) - 1
+        unknown_program = len(self.program_values) - 1
+        
+        scholarship = np.array([self.scholarship_index[s["scholarship_status"]] for s in students], dtype=np.intp)
+        governorate = np.array([self.governorate_index.get(s["origin_governorate"], unknown_governorate) for s in students], dtype=np.intp)
+        program = np.array([self.program_index.get(s["chosen_program"], unknown_program) for s in students], dtype=np.intp)
+        
+        X = np.empty((n, len(self.FEATURES)))
+        X[:, 0:3] = self.scholarship_rows[scholarship]
+        X[:, 3] = [s["baccalaureate_score"] for s in students]
+        X[:, 4] = self.governorate_values[governorate]
+        X[:, 5] = self.program_values[program]
+        return X
     
     def _predict_cluster_fallback(self, bac_score: float, scholarship_status: str) -> int:
         """
         Fallback prediction logic based on observed patterns from notebook
-        This is a temporary solution until the model file is fixed
+        Only used when neither the model file nor training data can be loaded
         """
         # Rule-based cluster assignment based on baccalaureate score and scholarship
         if bac_score >= 15 and scholarship_status == "Full Scholarship":
@@ -92,6 +207,51 @@ class SegmentationService:
         else:
             return 0  # Middle Tier
     
+    def _validate(self, students: list[dict]):
+        for position, student in enumerate(students):
+            if student["scholarship_status"] not in self.scholarship_index:
+                prefix = f"Student {position}: " if len(students) > 1 else ""
+                raise ValueError(f"{prefix}Invalid scholarship_status. Must be one of: {self.SCHOLARSHIP_STATUSES}")
+    
+    def segment_many(self, students: list[dict]) -> list[dict]:
+        """
+        Segment many students at once
+        
+        Args:
+            students: Dictionaries with baccalaureate_score, scholarship_status,
+                origin_governorate and chosen_program
+        
+        Returns:
+            One dict with cluster, cluster_name and cluster_characteristics per
+            student, in input order
+        """
+        try:
+            self._validate(students)
+            
+            if self.cluster_assigner is not None:
+                with stage_timer("segmentation", "preprocess"):
+                    X = self._encode_batch(students)
+                with stage_timer("segmentation", "cluster"):
+                    clusters = self.cluster_assigner.predict(X).tolist()
+            else:
+                clusters = [
+                    self._predict_cluster_fallback(s["baccalaureate_score"], s["scholarship_status"])
+                    for s in students
+                ]
+            
+            return [
+                {
+                    "cluster": cluster,
+                    "cluster_name": self.cluster_interpretations[cluster],
+                    "cluster_characteristics": self.cluster_characteristics[cluster]
+                }
+                for cluster in clusters
+            ]
+        
+        except Exception as e:
+            logger.error("Error in student segmentation: %s", e)
+            raise
+    
     def segment_student(
         self,
         baccalaureate_score: float,
@@ -105,27 +265,16 @@ class SegmentationService:
         Returns:
             dict with cluster, cluster_name, and cluster_characteristics
         """
-        try:
-            # Validate scholarship status
-            valid_statuses = ["Full Scholarship", "Partial Scholarship", "Self-Funded"]
-            if scholarship_status not in valid_statuses:
-                raise ValueError(f"Invalid scholarship_status. Must be one of: {valid_statuses}")
-            
-            # TODO: Once model is fixed, use actual model prediction
-            # For now, use fallback rule-based logic
-            cluster = self._predict_cluster_fallback(baccalaureate_score, scholarship_status)
-            
-            logger.info(f"Student segmented into cluster {cluster}: {self.cluster_interpretations[cluster]}")
-            
-            return {
-                "cluster": cluster,
-                "cluster_name": self.cluster_interpretations[cluster],
-                "cluster_characteristics": self.cluster_characteristics[cluster]
-            }
-            
-        except Exception as e:
-            logger.error(f"Error in student segmentation: {e}")
-            raise
+        result = self.segment_many([{
+            "baccalaureate_score": baccalaureate_score,
+            "scholarship_status": scholarship_status,
+            "origin_governorate": origin_governorate,
+            "chosen_program": chosen_program
+        }])[0]
+        
+        logger.debug("Student segmented into cluster %s: %s", result["cluster"], result["cluster_name"])
+        
+        return result
 
 
 # Singleton instance
@@ -1,12 +1,65 @@
 import pickle
 from pathlib import Path
 import logging
+from functools import lru_cache
+
 import numpy as np
-import pandas as pd
+
+from app.services.metrics import stage_timer
 
 logger = logging.getLogger(__name__)
 
+# Version of the rule-based scoring below, part of the prediction cache key
+# (there is no usable model file to fingerprint); bump it whenever the
+# thresholds, weights or recommendation rules change
+RULES_VERSION = "rules-1"
+
+# Recommendation conditions as bit flags, so the recommendations of a whole
+# batch can be derived from one integer per student
+REC_ACADEMIC_LOW = 1 << 0
+REC_ACADEMIC_MID = 1 << 1
+REC_COMMUNICATION = 1 << 2
+REC_TECHNICAL = 1 << 3
+REC_NO_INTERNSHIP = 1 << 4
+REC_SHORT_INTERNSHIP = 1 << 5
+REC_PROJECTS = 1 << 6
+REC_PORTFOLIO = 1 << 7
+REC_LINKEDIN = 1 << 8
+REC_TEACHING = 1 << 9
+REC_ELIGIBLE = 1 << 10
+
+# Improvement tips in the order they are listed
+RECOMMENDATION_TEXTS = [
+    (REC_ACADEMIC_LOW, "Focus on improving your academic average to at least 14/20"),
+    (REC_ACADEMIC_MID, "Aim for an average of 16/20 or higher to strengthen your application"),
+    (REC_COMMUNICATION, "Develop your communication skills through presentations and public speaking"),
+    (REC_TECHNICAL, "Enhance your technical skills through additional coursework or certifications"),
+    (REC_NO_INTERNSHIP, "Complete an internship to gain practical experience"),
+    (REC_SHORT_INTERNSHIP, "Consider a longer internship (3+ months) for better experience"),
+    (REC_PROJECTS, "Work on more projects to demonstrate your practical skills"),
+    (REC_PORTFOLIO, "Create a portfolio to showcase your work"),
+    (REC_LINKEDIN, "Build a professional LinkedIn profile"),
+    (REC_TEACHING, "Consider volunteering as a peer tutor to develop teaching experience"),
+]
+
+
+@lru_cache(maxsize=None)
+def _recommendation_list(flags: int) -> tuple:
+    recommendations = [text for flag, text in RECOMMENDATION_TEXTS if flags & flag]
+    if flags & REC_ELIGIBLE:
+        recommendations.insert(0, "You meet the requirements! Prepare a strong application highlighting your strengths")
+        recommendations.append("Get a recommendation letter from a professor who knows your work well")
+    return tuple(recommendations[:6])  # Limit to 6 recommendations
+
+
+def _recommendations_for_flags(flags: int) -> list[str]:
+    """Recommendations for a combination of flags (at most 2**11 distinct lists, memoized)"""
+    return list(_recommendation_list(int(flags)))
+
 class StudentTAEligibilityService:
+    # Model artefact in app/models
+    MODEL_FILE = "employability_model(obj6).pkl"
+    
     _instance = None
     _initialized = False
     
@@ -23,15 +76,15 @@ class StudentTAEligibilityService:
     def _load_model(self):
         """Load the employability prediction model"""
         try:
-            model_path = Path(__file__).parent.parent / "models" / "employability_model(obj6).pkl"
+            model_path = Path(__file__).parent.parent / "models" / self.MODEL_FILE
             
             # Model file appears corrupted, using fallback logic
-            logger.warning(f"Model file at {model_path} may be corrupted. Using fallback prediction logic.")
+            logger.warning("Model file at %s may be corrupted. Using fallback prediction logic.", model_path)
             
             self.model = None
             self.scaler = None
             
-            # English level options for one-hot encoding
+            # English level options (one-hot encoded for the model once it is fixed)
             self.english_levels = ["A1", "A2", "B1", "B2", "C1", "C2"]
             
             # All feature columns (base features + one-hot encoded english levels)
@@ -47,30 +100,9 @@ class StudentTAEligibilityService:
             logger.info("Student TA eligibility service initialized (fallback mode)")
             
         except Exception as e:
-            logger.error(f"Error loading student TA eligibility model: {e}")
+            logger.error("Error loading student TA eligibility model: %s", e)
             raise
     
-    def _prepare_features(self, student_data: dict) -> pd.DataFrame:
-        """Prepare features with one-hot encoding for english_level"""
-        # Convert to DataFrame
-        df = pd.DataFrame([student_data])
-        
-        # One-hot encode english_level
-        for col in self.english_cols:
-            df[col] = 0
-        
-        english_col_name = f"english_level_{student_data['english_level']}"
-        if english_col_name in self.english_cols:
-            df[english_col_name] = 1
-        
-        # Drop the original english_level column
-        df = df.drop(columns=['english_level'])
-        
-        # Reindex to match model's expected column order
-        df = df.reindex(columns=self.all_columns, fill_value=0)
-        
-        return df
-    
     def _calculate_fallback_prediction(self, student_data: dict) -> tuple[bool, float]:
         """
         Fallback prediction logic based on key criteria
@@ -123,6 +155,47 @@ class StudentTAEligibilityService:
         
         return employable, probability
     
+    def calculate_eligibility_scores(self, columns: dict) -> np.ndarray:
+        """
+        Vectorized _calculate_fallback_prediction over many students.
+        
+        Args:
+            columns: Mapping of every base feature to an array with one value per student
+            
+        Returns:
+            Employability probability (0-100) per student; a student is employable
+            when it is >= 70. Points are added in the same order as the scalar
+            version, so the results are bit-for-bit identical.
+        """
+        avg = np.asarray(columns['previous_years_average'], dtype=np.float64)
+        internship = np.asarray(columns['internship_completed']) == 1
+        projects = np.asarray(columns['projects_completed'])
+        
+        # Academic performance (30 points)
+        score = np.select([avg >= 16, avg >= 14, avg >= 12], [30.0, 20.0, 10.0], default=0.0)
+        
+        # Skills assessment (30 points total)
+        avg_skills = (
+            np.asarray(columns['communication_skills_score'], dtype=np.float64)
+            + np.asarray(columns['technical_skills_score'], dtype=np.float64)
+            + np.asarray(columns['soft_skills_score'], dtype=np.float64)
+        ) / 3
+        score = score + (avg_skills / 10) * 30
+        
+        # Practical experience (25 points)
+        score = score + np.where(internship, 10.0, 0.0)
+        score = score + np.where(internship & (np.asarray(columns['internship_duration_months']) >= 3), 5.0, 0.0)
+        score = score + np.select([projects >= 3, projects >= 1], [10.0, 5.0], default=0.0)
+        
+        # Professional profile (10 points)
+        score = score + np.where(np.asarray(columns['portfolio_exists']) == 1, 5.0, 0.0)
+        score = score + np.where(np.asarray(columns['linkedin_profile']) == 1, 5.0, 0.0)
+        
+        # Teaching interest (5 points)
+        score = score + (np.asarray(columns['teaching_interest'], dtype=np.float64) / 10) * 5
+        
+        return (score / 100.0) * 100
+    
     def predict_student_eligibility(self, student_data: dict) -> dict:
         """
         Predict TA eligibility for an individual student
@@ -134,79 +207,135 @@ class StudentTAEligibilityService:
             Dictionary with employable status, probability, message, and recommendations
         """
         try:
-            # Prepare features
-            df_prepared = self._prepare_features(student_data)
-            
-            # TODO: When model is fixed, use actual model prediction
-            # For now, use fallback logic
+            # Rule-based scoring (weighted criteria, see RULES_VERSION); the shipped
+            # model file cannot be loaded, so no model prediction is involved
             employable, probability = self._calculate_fallback_prediction(student_data)
             
-            # Generate message
-            if employable:
-                message = f"YES - You are eligible for TA positions with {probability:.2f}% confidence"
-            else:
-                message = f"NO - You are not currently eligible. Employability probability: {probability:.2f}%"
+            logger.debug("Student TA eligibility: %s (%.2f%%)", "Eligible" if employable else "Not Eligible", probability)
+            
+            return self._build_result(student_data, employable, probability)
+            
+        except Exception as e:
+            logger.error("Error in student TA eligibility prediction: %s", e)
+            raise
+    
+    def predict_many(self, students: list[dict]) -> list[dict]:
+        """
+        Predict TA eligibility for many students at once
+        
+        The features are gathered into one array per column and scored with
+        calculate_eligibility_scores; results are identical to calling
+        predict_student_eligibility on each student.
+        
+        Args:
+            students: List of dictionaries with student features
+            
+        Returns:
+            List of result dictionaries, in input order
+        """
+        try:
+            with stage_timer("student_ta_batch", "preprocess"):
+                columns = {col: np.array([student[col] for student in students]) for col in self.base_features}
+            
+            with stage_timer("student_ta_batch", "model"):
+                probabilities = self.calculate_eligibility_scores(columns)
+                employable = probabilities >= 70  # 70% threshold for employability
             
-            # Generate recommendations
-            recommendations = self._generate_recommendations(student_data, employable, probability)
+            with stage_timer("student_ta_batch", "recommendations"):
+                flags = self._recommendation_flags(columns, employable)
+                results = [
+                    self._format_result(bool(is_employable), probability, _recommendations_for_flags(student_flags))
+                    for is_employable, probability, student_flags in zip(employable.tolist(), probabilities.tolist(), flags.tolist())
+                ]
             
-            logger.info(f"Student TA eligibility: {'Eligible' if employable else 'Not Eligible'} ({probability:.2f}%)")
+            logger.debug("Student TA eligibility batch: %d/%d eligible", int(employable.sum()), len(students))
             
-            return {
-                "employable": employable,
-                "probability": round(probability, 2),
-                "message": message,
-                "recommendations": recommendations
-            }
+            return results
             
         except Exception as e:
-            logger.error(f"Error in student TA eligibility prediction: {e}")
+            logger.error("Error in student TA eligibility batch prediction: %s", e)
             raise
     
+    def _build_result(self, student_data: dict, employable: bool, probability: float) -> dict:
+        """Message and recommendations for one scored student"""
+        # Generate recommendations
+        recommendations = self._generate_recommendations(student_data, employable, probability)
+        
+        return self._format_result(employable, probability, recommendations)
+    
+    def _format_result(self, employable: bool, probability: float, recommendations: list[str]) -> dict:
+        # Generate message
+        if employable:
+            message = f"YES - You are eligible for TA positions with {probability:.2f}% confidence"
+        else:
+            message = f"NO - You are not currently eligible. Employability probability: {probability:.2f}%"
+        
+        return {
+            "employable": employable,
+            "probability": round(probability, 2),
+            "message": message,
+            "recommendations": recommendations
+        }
+    
     def _generate_recommendations(self, student_data: dict, employable: bool, probability: float) -> list[str]:
         """Generate personalized recommendations based on student profile"""
-        recommendations = []
+        flags = 0
         
         # Academic recommendations
         if student_data['previous_years_average'] < 14:
-            recommendations.append("Focus on improving your academic average to at least 14/20")
+            flags |= REC_ACADEMIC_LOW
         elif student_data['previous_years_average'] < 16:
-            recommendations.append("Aim for an average of 16/20 or higher to strengthen your application")
+            flags |= REC_ACADEMIC_MID
         
         # Skills recommendations
         if student_data['communication_skills_score'] < 7:
-            recommendations.append("Develop your communication skills through presentations and public speaking")
+            flags |= REC_COMMUNICATION
         
         if student_data['technical_skills_score'] < 7:
-            recommendations.append("Enhance your technical skills through additional coursework or certifications")
+            flags |= REC_TECHNICAL
         
         # Experience recommendations
         if student_data['internship_completed'] == 0:
-            recommendations.append("Complete an internship to gain practical experience")
+            flags |= REC_NO_INTERNSHIP
         elif student_data['internship_duration_months'] < 3:
-            recommendations.append("Consider a longer internship (3+ months) for better experience")
+            flags |= REC_SHORT_INTERNSHIP
         
         if student_data['projects_completed'] < 3:
-            recommendations.append("Work on more projects to demonstrate your practical skills")
+            flags |= REC_PROJECTS
         
         # Professional profile
         if student_data['portfolio_exists'] == 0:
-            recommendations.append("Create a portfolio to showcase your work")
+            flags |= REC_PORTFOLIO
         
         if student_data['linkedin_profile'] == 0:
-            recommendations.append("Build a professional LinkedIn profile")
+            flags |= REC_LINKEDIN
         
         # Teaching interest
         if student_data['teaching_interest'] < 7:
-            recommendations.append("Consider volunteering as a peer tutor to develop teaching experience")
+            flags |= REC_TEACHING
         
         # If eligible, provide success tips
         if employable:
-            recommendations.insert(0, "You meet the requirements! Prepare a strong application highlighting your strengths")
-            recommendations.append("Get a recommendation letter from a professor who knows your work well")
+            flags |= REC_ELIGIBLE
         
-        return recommendations[:6]  # Limit to 6 recommendations
-
+        return _recommendations_for_flags(flags)
+    
+    def _recommendation_flags(self, columns: dict, employable: np.ndarray) -> np.ndarray:
+        """Vectorized _generate_recommendations: the recommendation bit flags of every student"""
+        avg = np.asarray(columns['previous_years_average'])
+        internship = np.asarray(columns['internship_completed']) == 0
+        
+        flags = np.where(avg < 14, REC_ACADEMIC_LOW, np.where(avg < 16, REC_ACADEMIC_MID, 0))
+        flags |= np.where(np.asarray(columns['communication_skills_score']) < 7, REC_COMMUNICATION, 0)
+        flags |= np.where(np.asarray(columns['technical_skills_score']) < 7, REC_TECHNICAL, 0)
+        flags |= np.where(internship, REC_NO_INTERNSHIP,
+                          np.where(np.asarray(columns['internship_duration_months']) < 3, REC_SHORT_INTERNSHIP, 0))
+        flags |= np.where(np.asarray(columns['projects_completed']) < 3, REC_PROJECTS, 0)
+        flags |= np.where(np.asarray(columns['portfolio_exists']) == 0, REC_PORTFOLIO, 0)
+        flags |= np.where(np.asarray(columns['linkedin_profile']) == 0, REC_LINKEDIN, 0)
+        flags |= np.where(np.asarray(columns['teaching_interest']) < 7, REC_TEACHING, 0)
+        flags |= np.where(employable, REC_ELIGIBLE, 0)
+        return flags
 
 # Singleton instance
 student_ta_eligibility_service = StudentTAEligibilityService()
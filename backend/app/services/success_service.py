@@ -3,34 +3,160 @@ Student Success Prediction Service
 Uses Random Forest model to predict student success based on enrollment data.
 """
 
-import joblib
+import logging
+import warnings
+from enum import IntEnum
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from app import config
+from app.services.factors import Factor, FactorTemplate, count_factors
+from app.services.model_registry import model_registry
+from app.services.model_store import load_model_artifact
+from app.services.compiled_models import compile_model
+from app.services.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+# Recommendation flags raised by concern factors
+CONCERN_SCORE = 1 << 0
+CONCERN_SCHOLARSHIP = 1 << 1
+CONCERN_AGE = 1 << 2
+
+
+class SuccessFactor(IntEnum):
+    """Factor codes produced by SuccessPredictionService._analyze_factors."""
+    EXCELLENT_BACCALAUREATE = 1
+    VERY_GOOD_BACCALAUREATE = 2
+    GOOD_BACCALAUREATE = 3
+    BELOW_THRESHOLD_BACCALAUREATE = 4
+    LOW_BACCALAUREATE = 5
+    VERY_LOW_BACCALAUREATE = 6
+    FULL_SCHOLARSHIP = 7
+    PARTIAL_SCHOLARSHIP = 8
+    SELF_FUNDED = 9
+    STRONG_BACKGROUND = 10
+    TYPICAL_AGE = 11
+    NON_TRADITIONAL_AGE = 12
+    CAMPUS = 13
+
+
+FACTOR_TEMPLATES = {
+    SuccessFactor.EXCELLENT_BACCALAUREATE: FactorTemplate("positive", "Excellent baccalaureate score ({value}/20) - Strong predictor of success"),
+    SuccessFactor.VERY_GOOD_BACCALAUREATE: FactorTemplate("positive", "Very good baccalaureate score ({value}/20) - Above success threshold"),
+    SuccessFactor.GOOD_BACCALAUREATE: FactorTemplate("positive", "Good baccalaureate score ({value}/20) - Meets success threshold"),
+    SuccessFactor.BELOW_THRESHOLD_BACCALAUREATE: FactorTemplate("concerns", "Baccalaureate score ({value}/20) - Below typical success threshold (13.3+)", CONCERN_SCORE),
+    SuccessFactor.LOW_BACCALAUREATE: FactorTemplate("concerns", "Low baccalaureate score ({value}/20) - Significant risk factor", CONCERN_SCORE),
+    SuccessFactor.VERY_LOW_BACCALAUREATE: FactorTemplate("concerns", "Very low baccalaureate score ({value}/20) - High risk", CONCERN_SCORE),
+    SuccessFactor.FULL_SCHOLARSHIP: FactorTemplate("positive", "Full scholarship support"),
+    SuccessFactor.PARTIAL_SCHOLARSHIP: FactorTemplate("neutral", "Partial scholarship"),
+    SuccessFactor.SELF_FUNDED: FactorTemplate("concerns", "Self-funded (no scholarship)", CONCERN_SCHOLARSHIP),
+    SuccessFactor.STRONG_BACKGROUND: FactorTemplate("positive", "Strong academic background ({value})"),
+    SuccessFactor.TYPICAL_AGE: FactorTemplate("positive", "Typical enrollment age"),
+    SuccessFactor.NON_TRADITIONAL_AGE: FactorTemplate("concerns", "Non-traditional student age", CONCERN_AGE),
+    SuccessFactor.CAMPUS: FactorTemplate("neutral", "Campus: {value}"),
+}
+
+# Columns of the factor code matrix, one per factor slot of _analyze_factors
+FACTOR_SLOTS = (
+    "baccalaureate_score",
+    "scholarship_status",
+    "baccalaureate_type",
+    "age",
+    "campus",
+)
+
+# Baccalaureate types counted as a strong academic background
+STRONG_BACCALAUREATE_TYPES = ["Sciences", "Math"]
 
 
 class SuccessPredictionService:
     """Service for predicting student success using enrollment/demographic data."""
     
-    def __init__(self):
-        """Initialize the service and load the trained model."""
-        self.model_path = Path(__file__).parent.parent / "models" / "student_success_model.pkl"
+    # Model artefact in app/models
+    MODEL_FILE = "student_success_model.pkl"
+    
+    # Request fields that were one-hot encoded (get_dummies) at training time
+    CATEGORICAL_FIELDS = (
+        "origin_governorate",
+        "baccalaureate_type",
+        "scholarship_status",
+        "campus",
+        "registration_status",
+    )
+    
+    def __init__(self, model_path: Optional[Path] = None):
+        """
+        Initialize the service and load the trained model.
+        
+        Args:
+            model_path: Model artefact to load (defaults to MODEL_FILE in app/models)
+        """
+        self.model_path = Path(model_path) if model_path else config.MODELS_DIR / self.MODEL_FILE
         self.model_data = None
         self._load_model()
     
     def _load_model(self):
         """Load the trained model and preprocessors."""
         try:
-            self.model_data = joblib.load(self.model_path)
+            self.model_data = load_model_artifact(self.model_path)
             self.model = self.model_data['model']
             self.scaler = self.model_data['scaler']
             self.train_columns = self.model_data['train_columns']
             self.numeric_cols = self.model_data['numeric_cols']
-            print(f"Success prediction model loaded: Random Forest")
+            self.threshold = self.model_data.get('threshold', None)
+            self.compiled_model = compile_model(self.model) if config.COMPILED_INFERENCE else None
+            self._build_encoder()
+            logger.info("Success prediction model loaded: Random Forest")
         except Exception as e:
             raise RuntimeError(f"Failed to load success model: {str(e)}")
     
-    def preprocess_input(self, student_data: Dict[str, Any]) -> pd.DataFrame:
+    def _build_encoder(self):
+        """
+        Precompile the input encoding from train_columns.
+        
+        Every training column is mapped to its index once, so a request can be
+        written straight into a preallocated NumPy row:
+            - raw fields (gender, age, ...) map field -> column index
+            - one-hot columns ("campus_Monastir") map (field, value) -> column index
+        Reference categories dropped at training time have no column and stay 0.
+        """
+        self.n_features = len(self.train_columns)
+        self._field_index = {}
+        self._category_index = {}
+        
+        for idx, col in enumerate(self.train_columns):
+            field = next((f for f in self.CATEGORICAL_FIELDS if col.startswith(f"{f}_")), None)
+            if field is None:
+                self._field_index[col] = idx
+            else:
+                self._category_index[(field, col[len(field) + 1:])] = idx
+        
+        # Numeric columns are standardized in place with the fitted scaler's parameters
+        numeric_features = [col for col in self.numeric_cols if col in self._field_index]
+        self._numeric_indices = np.array([self._field_index[col] for col in numeric_features], dtype=int)
+        self._numeric_features = numeric_features
+        mean = getattr(self.scaler, "mean_", None)
+        scale = getattr(self.scaler, "scale_", None)
+        if len(numeric_features) and (mean is not None or scale is not None):
+            self._numeric_mean = mean if mean is not None else 0.0
+            self._numeric_scale = scale if scale is not None else 1.0
+        else:
+            self._numeric_mean = self._numeric_scale = None
+    
+    def _encode_row(self, row: np.ndarray, student_data: Dict[str, Any]) -> None:
+        """Write one student's raw and one-hot features into a zeroed row."""
+        for field, value in student_data.items():
+            idx = self._field_index.get(field)
+            if idx is not None:
+                row[idx] = value
+                continue
+            idx = self._category_index.get((field, str(value)))
+            if idx is not None:
+                row[idx] = 1.0
+    
+    def preprocess_input(self, student_data: Dict[str, Any]) -> np.ndarray:
         """
         Preprocess student input data to match the training format.
         
@@ -38,33 +164,35 @@ class SuccessPredictionService:
             student_data: Dictionary containing student enrollment information
             
         Returns:
-            DataFrame with preprocessed features matching training format
+            Array of shape (1, n_features) in train_columns order
         """
-        # Create DataFrame from input
-        df = pd.DataFrame([student_data])
-        
-        # Handle numeric columns
-        for col in self.numeric_cols:
-            if col in df.columns:
-                df[col] = df[col].astype(float)
-        
-        # One-hot encode categorical variables
-        df_encoded = pd.get_dummies(df, drop_first=True)
-        
-        # Ensure all training columns exist (add missing with 0)
-        for col in self.train_columns:
-            if col not in df_encoded.columns:
-                df_encoded[col] = 0
+        return self.preprocess_batch([student_data])
+    
+    def preprocess_batch(self, students: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Preprocess a list of students into a single feature matrix.
         
-        # Keep only training columns in the correct order
-        df_encoded = df_encoded[self.train_columns]
+        Args:
+            students: List of dictionaries containing student enrollment information
+            
+        Returns:
+            Array of shape (len(students), n_features) in train_columns order
+        """
+        X = np.zeros((len(students), self.n_features), dtype=float)
+        for row, student_data in zip(X, students):
+            self._encode_row(row, student_data)
         
         # Scale numeric features
-        numeric_indices = [self.train_columns.index(col) for col in self.numeric_cols if col in self.train_columns]
-        if numeric_indices:
-            df_encoded.iloc[:, numeric_indices] = self.scaler.transform(df_encoded.iloc[:, numeric_indices])
+        if len(self._numeric_indices):
+            numeric = X[:, self._numeric_indices]
+            if self._numeric_mean is not None:
+                numeric -= self._numeric_mean
+                numeric /= self._numeric_scale
+            else:
+                numeric = self.scaler.transform(pd.DataFrame(numeric, columns=self._numeric_features))
+            X[:, self._numeric_indices] = numeric
         
-        return df_encoded
+        return X
     
     def predict(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -87,15 +215,65 @@ class SuccessPredictionService:
                 - success_prediction: str ("Likely to Succeed" or "At Risk")
                 - success_probability: float (0-1)
                 - confidence: str ("High", "Medium", "Low")
-                - factors: dict with contributing factors
+                - factors: tuple of Factor(code, value) (see FACTOR_TEMPLATES)
+        """
+        result = self.predict_many([student_data])[0]
+        
+        logger.debug("Probabilities: [risk=%.3f, success=%.3f], confidence: %s",
+                     result["risk_probability"], result["success_probability"], result["confidence"])
+        
+        return result
+    
+    def predict_many(self, students: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        # Preprocess the input
-        X = self.preprocess_input(student_data)
+        Predict success for many students at once.
+        
+        Args:
+            students: List of dictionaries with the same fields as predict()
         
-        # Get prediction and probability
-        prediction = self.model.predict(X)[0]
-        probability = self.model.predict_proba(X)[0]
+        Returns:
+            List of result dictionaries (same shape as predict()), in input order
+        """
+        if not students:
+            return []
+        
+        with stage_timer("success", "preprocess"):
+            X = self.preprocess_batch(students)
+        with stage_timer("success", "model"):
+            predictions, probabilities = self._score(X)
+        
+        with stage_timer("success", "factor_analysis"):
+            return [
+                self._build_result(student_data, prediction, probability)
+                for student_data, prediction, probability in zip(students, predictions, probabilities)
+            ]
+    
+    def _score(self, X: np.ndarray) -> tuple:
+        """
+        Score a feature matrix with a single predict_proba pass.
         
+        The class label is derived from the probabilities instead of a second
+        model.predict call (which would traverse every tree again): the
+        positive class when the stored threshold is reached if the model
+        has one, otherwise the most probable class, exactly as predict() does.
+        
+        Returns:
+            (labels, probabilities) with one entry/row per input row
+        """
+        with warnings.catch_warnings():
+            # X is laid out in train_columns order, so the "fitted with feature
+            # names" check has nothing useful to report for this model
+            warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+            probabilities = (self.compiled_model or self.model).predict_proba(X)
+        classes = self.model.classes_
+        if self.threshold is not None and len(classes) == 2:
+            labels = np.where(probabilities[:, 1] >= self.threshold, classes[1], classes[0])
+        else:
+            labels = classes[np.argmax(probabilities, axis=1)]
+        return labels, probabilities
+    
+    def _build_result(self, student_data: Dict[str, Any], prediction, probability) -> Dict[str, Any]:
+        """Turn one predicted label and its class probabilities into the prediction result."""
         # Success probability (class 1)
         success_prob = probability[1] if len(probability) > 1 else probability[0]
         
@@ -104,11 +282,6 @@ class SuccessPredictionService:
         
         # Determine confidence level
         max_prob = max(probability)
-        
-        # Debug output
-        print(f"Probabilities: [risk={probability[0]:.3f}, success={probability[1]:.3f}]")
-        print(f"Max probability: {max_prob:.3f}")
-        
         if max_prob >= 0.8:
             confidence = "High"
         elif max_prob >= 0.6:
@@ -116,8 +289,6 @@ class SuccessPredictionService:
         else:
             confidence = "Low"
         
-        print(f"Confidence: {confidence}")
-        
         # Analyze contributing factors
         factors = self._analyze_factors(student_data, success_prob)
         
@@ -129,70 +300,123 @@ class SuccessPredictionService:
             "factors": factors
         }
     
-    def _analyze_factors(self, student_data: Dict[str, Any], success_prob: float) -> Dict[str, Any]:
+    def factor_columns(self, students: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Columns of the fields read by the factor analysis (missing fields count as 0 or "")."""
+        return {
+            "baccalaureate_score": np.array([s.get("baccalaureate_score", 0) for s in students], dtype=np.float64),
+            "scholarship_status": np.array([s.get("scholarship_status", "") for s in students], dtype=object),
+            "baccalaureate_type": np.array([s.get("baccalaureate_type", "") for s in students], dtype=object),
+            "age": np.array([s.get("age", 0) for s in students], dtype=np.float64),
+            "campus": np.array([s.get("campus", "") for s in students], dtype=object),
+        }
+    
+    def analyze_factors_batch(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Vectorized _analyze_factors over many students.
+        
+        Args:
+            columns: Mapping of every FACTOR_SLOTS field to an array with one value per student
+        
+        Returns:
+            SuccessFactor codes of shape (n_students, len(FACTOR_SLOTS)), one
+            column per slot (0 where the slot yields no factor), using the same
+            thresholds as _analyze_factors
+        """
+        bacc = np.asarray(columns["baccalaureate_score"], dtype=np.float64)
+        scholarship = np.asarray(columns["scholarship_status"], dtype=object)
+        age = np.asarray(columns["age"], dtype=np.float64)
+        campus = np.asarray(columns["campus"], dtype=object)
+        
+        codes = np.zeros((len(bacc), len(FACTOR_SLOTS)), dtype=np.int8)
+        codes[:, 0] = np.select(
+            [bacc >= 16, bacc >= 14, bacc >= 13.3, bacc >= 12, bacc >= 10],
+            [SuccessFactor.EXCELLENT_BACCALAUREATE, SuccessFactor.VERY_GOOD_BACCALAUREATE,
+             SuccessFactor.GOOD_BACCALAUREATE, SuccessFactor.BELOW_THRESHOLD_BACCALAUREATE,
+             SuccessFactor.LOW_BACCALAUREATE],
+            default=SuccessFactor.VERY_LOW_BACCALAUREATE
+        )
+        codes[:, 1] = np.select(
+            [scholarship == "Full Scholarship", scholarship == "Partial Scholarship"],
+            [SuccessFactor.FULL_SCHOLARSHIP, SuccessFactor.PARTIAL_SCHOLARSHIP],
+            default=SuccessFactor.SELF_FUNDED
+        )
+        codes[:, 2] = np.where(np.isin(columns["baccalaureate_type"], STRONG_BACCALAUREATE_TYPES), SuccessFactor.STRONG_BACKGROUND, 0)
+        codes[:, 3] = np.select([age <= 20, age > 25], [SuccessFactor.TYPICAL_AGE, SuccessFactor.NON_TRADITIONAL_AGE], default=0)
+        codes[:, 4] = np.where(campus.astype(bool), SuccessFactor.CAMPUS, 0)
+        return codes
+    
+    def factor_counts(self, students: List[Dict[str, Any]]) -> Dict[SuccessFactor, int]:
+        """
+        Number of students with each factor in a cohort (e.g. how many are
+        self-funded), computed from the code matrix without building
+        per-student factors or text.
+        """
+        return count_factors(self.analyze_factors_batch(self.factor_columns(students)), SuccessFactor)
+    
+    def _analyze_factors(self, student_data: Dict[str, Any], success_prob: float) -> tuple:
         """
         Analyze which factors contribute to success/risk.
         
         Note: The model predicts High_Performer based on final_average >= 12.
         In the training data, final_average ≈ baccalaureate_score * 0.9 + noise.
         This means a bacc score of ~13.3+ is needed for high performance.
+        
+        Returns:
+            Tuple of Factor(code, value) in analysis order; the text is rendered
+            from FACTOR_TEMPLATES when the response is serialized
         """
-        factors = {
-            "positive": [],
-            "concerns": [],
-            "neutral": []
-        }
+        factors = []
         
         # Academic strength - adjusted thresholds based on model training
         bacc_score = student_data.get("baccalaureate_score", 0)
         if bacc_score >= 16:
-            factors["positive"].append(f"Excellent baccalaureate score ({bacc_score}/20) - Strong predictor of success")
+            factors.append(Factor(SuccessFactor.EXCELLENT_BACCALAUREATE, bacc_score))
         elif bacc_score >= 14:
-            factors["positive"].append(f"Very good baccalaureate score ({bacc_score}/20) - Above success threshold")
+            factors.append(Factor(SuccessFactor.VERY_GOOD_BACCALAUREATE, bacc_score))
         elif bacc_score >= 13.3:
-            factors["positive"].append(f"Good baccalaureate score ({bacc_score}/20) - Meets success threshold")
+            factors.append(Factor(SuccessFactor.GOOD_BACCALAUREATE, bacc_score))
         elif bacc_score >= 12:
-            factors["concerns"].append(f"Baccalaureate score ({bacc_score}/20) - Below typical success threshold (13.3+)")
+            factors.append(Factor(SuccessFactor.BELOW_THRESHOLD_BACCALAUREATE, bacc_score))
         elif bacc_score >= 10:
-            factors["concerns"].append(f"Low baccalaureate score ({bacc_score}/20) - Significant risk factor")
+            factors.append(Factor(SuccessFactor.LOW_BACCALAUREATE, bacc_score))
         else:
-            factors["concerns"].append(f"Very low baccalaureate score ({bacc_score}/20) - High risk")
+            factors.append(Factor(SuccessFactor.VERY_LOW_BACCALAUREATE, bacc_score))
         
         # Scholarship status
         scholarship = student_data.get("scholarship_status", "")
         if scholarship == "Full Scholarship":
-            factors["positive"].append("Full scholarship support")
+            factors.append(Factor(SuccessFactor.FULL_SCHOLARSHIP))
         elif scholarship == "Partial Scholarship":
-            factors["neutral"].append("Partial scholarship")
+            factors.append(Factor(SuccessFactor.PARTIAL_SCHOLARSHIP))
         else:
-            factors["concerns"].append("Self-funded (no scholarship)")
+            factors.append(Factor(SuccessFactor.SELF_FUNDED))
         
         # Baccalaureate type
         bacc_type = student_data.get("baccalaureate_type", "")
-        if bacc_type in ["Sciences", "Math"]:
-            factors["positive"].append(f"Strong academic background ({bacc_type})")
+        if bacc_type in STRONG_BACCALAUREATE_TYPES:
+            factors.append(Factor(SuccessFactor.STRONG_BACKGROUND, bacc_type))
         
         # Age factor
         age = student_data.get("age", 0)
         if age <= 20:
-            factors["positive"].append("Typical enrollment age")
+            factors.append(Factor(SuccessFactor.TYPICAL_AGE))
         elif age > 25:
-            factors["concerns"].append("Non-traditional student age")
+            factors.append(Factor(SuccessFactor.NON_TRADITIONAL_AGE))
         
         # Campus
         campus = student_data.get("campus", "")
         if campus:
-            factors["neutral"].append(f"Campus: {campus}")
+            factors.append(Factor(SuccessFactor.CAMPUS, campus))
         
-        return factors
+        return tuple(factors)
 
 
-# Singleton instance
-_success_service_instance = None
+# Live instance owned by the model registry (newest model version, hot-swapped)
+model_registry.register(
+    "success", SuccessPredictionService.MODEL_FILE, SuccessPredictionService,
+    endpoints=["/api/predict/success", "/api/predict/success/bulk"], cache_namespace="success"
+)
 
 def get_success_service() -> SuccessPredictionService:
-    """Get or create the singleton success prediction service instance."""
-    global _success_service_instance
-    if _success_service_instance is None:
-        _success_service_instance = SuccessPredictionService()
-    return _success_service_instance
+    """Get the live success prediction service (loaded on first use)."""
+    return model_registry.get("success")
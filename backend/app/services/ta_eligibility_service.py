@@ -1,14 +1,46 @@
-import pickle
+import threading
 from pathlib import Path
 import logging
 import numpy as np
+import pandas as pd
+
+from app import config
+from app.services.metrics import CACHE_LOOKUPS, stage_timer
+from app.services.model_store import model_fingerprint
+from app.services.student_ta_eligibility_service import student_ta_eligibility_service
 
 logger = logging.getLogger(__name__)
 
+# Fields the eligible-student list can be sorted on
+SORT_FIELDS = ("eligibility_score", "average_score", "student_id", "name", "program")
+
+
+class _ScoredRoster:
+    """Eligible students of one roster file version, with memoized sort orders."""
+    
+    def __init__(self, fingerprint: str, total_students: int, eligible: pd.DataFrame):
+        self.fingerprint = fingerprint
+        self.total_students = total_students
+        self.eligible = eligible
+        self._orders = {}
+    
+    def order(self, sort_by: str, descending: bool) -> np.ndarray:
+        """Row positions of the eligible students sorted on a field (stable, cached)."""
+        key = (sort_by, descending)
+        order = self._orders.get(key)
+        if order is None:
+            sorted_index = self.eligible[sort_by].sort_values(ascending=not descending, kind="stable").index
+            order = self._orders[key] = self.eligible.index.get_indexer(sorted_index)
+        return order
+
+
 class TAEligibilityService:
     _instance = None
     _initialized = False
     
+    # Roster columns besides the scoring features (name is optional)
+    ID_COLUMNS = ["student_id", "program"]
+    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(TAEligibilityService, cls).__new__(cls)
@@ -25,69 +57,130 @@ class TAEligibilityService:
             model_path = Path(__file__).parent.parent / "models" / "employability_model(obj6).pkl"
             
             # Model file appears corrupted, using fallback logic
-            logger.warning(f"Model file at {model_path} may be corrupted. Using fallback prediction logic.")
+            logger.warning("Model file at %s may be corrupted. Using fallback prediction logic.", model_path)
             
             self.model = None
             
-            # Fallback: typical employability rate is around 10-15% for TA positions
-            # based on academic performance and other criteria
-            self.baseline_employability_rate = 0.10  # 10%
-            
-            logger.info("TA eligibility service initialized (fallback mode)")
+            # Students are scored with the individual TA check's fallback rules
+            self.scorer = student_ta_eligibility_service
+            self.roster_path = Path(config.TA_ROSTER_PATH)
+            self._roster = None
+            self._roster_lock = threading.Lock()
             
+            logger.info("TA eligibility service initialized (fallback mode, roster: %s)", self.roster_path)
+        
         except Exception as e:
-            logger.error(f"Error loading TA eligibility model: {e}")
+            logger.error("Error loading TA eligibility model: %s", e)
             raise
     
-    def predict_employability(self) -> dict:
+    def _read_roster(self) -> pd.DataFrame:
+        """Read the roster file (CSV or Parquet, by extension)."""
+        if self.roster_path.suffix.lower() in (".parquet", ".pq"):
+            try:
+                return pd.read_parquet(self.roster_path)
+            except ImportError as e:
+                raise RuntimeError(f"Reading a Parquet roster requires pyarrow or fastparquet: {e}")
+        return pd.read_csv(self.roster_path, dtype={"student_id": str, "name": str, "program": str})
+    
+    def _score_roster(self, fingerprint: str) -> _ScoredRoster:
+        """Score every student of the roster in one vectorized pass and keep the eligible ones."""
+        roster = self._read_roster()
+        
+        missing = [col for col in self.ID_COLUMNS + self.scorer.base_features if col not in roster.columns]
+        if missing:
+            raise ValueError(f"TA roster {self.roster_path} is missing columns: {missing}")
+        
+        # Blank or malformed values score no points for that criterion
+        columns = {
+            col: pd.to_numeric(roster[col], errors="coerce").fillna(0).to_numpy()
+            for col in self.scorer.base_features
+        }
+        probability = self.scorer.calculate_eligibility_scores(columns)
+        eligible_mask = probability >= 70  # Same threshold as the individual TA check
+        
+        student_ids = roster["student_id"].astype(str)
+        names = roster["name"].fillna(student_ids).astype(str) if "name" in roster.columns else student_ids
+        eligible = pd.DataFrame({
+            "student_id": student_ids[eligible_mask].to_numpy(),
+            "name": names[eligible_mask].to_numpy(),
+            "average_score": np.round(columns["previous_years_average"][eligible_mask].astype(np.float64), 2),
+            "program": roster["program"].astype(str)[eligible_mask].to_numpy(),
+            "eligibility_score": np.round(probability[eligible_mask], 2),
+        })
+        
+        logger.info("Scored TA roster %s: %d/%d eligible", self.roster_path, len(eligible), len(roster))
+        return _ScoredRoster(fingerprint, len(roster), eligible)
+    
+    def _current_roster(self) -> _ScoredRoster:
+        """Scored roster for the current file, rescored only when the file has changed."""
+        if not self.roster_path.exists():
+            raise FileNotFoundError(f"TA roster not found at {self.roster_path} (set STRATUS_TA_ROSTER_PATH)")
+        fingerprint = model_fingerprint(self.roster_path)
+        
+        roster = self._roster
+        if roster is not None and roster.fingerprint == fingerprint:
+            CACHE_LOOKUPS.inc("ta_roster", "hit")
+            return roster
+        
+        with self._roster_lock:
+            # Another request may have rescored the file while we waited
+            roster = self._roster
+            if roster is None or roster.fingerprint != fingerprint:
+                CACHE_LOOKUPS.inc("ta_roster", "miss")
+                with stage_timer("ta_eligibility", "roster_scoring"):
+                    roster = self._roster = self._score_roster(fingerprint)
+            else:
+                CACHE_LOOKUPS.inc("ta_roster", "hit")
+        return roster
+    
+    def predict_employability(self, page: int = 1, page_size: int = 100,
+                              sort_by: str = "eligibility_score", order: str = "desc") -> dict:
         """
-        Predict TA eligibility for the student population
+        Predict TA eligibility for the student roster
         
-        In production, this would:
-        1. Load student data from database
-        2. Apply model predictions
-        3. Filter eligible students
+        The whole roster is scored once per version of the roster file; each
+        call only sorts (memoized per field/direction) and slices one page
+        of the eligible students.
         
-        For now, using simulated data based on typical patterns
+        Args:
+            page: 1-based page number
+            page_size: Eligible students per page
+            sort_by: One of SORT_FIELDS
+            order: "asc" or "desc"
         """
         try:
-            # Simulated total student population
-            # In production, this would query the actual database
-            total_students = 5619
-            
-            # Fallback prediction: approximately 10% employability rate
-            # In production, this would use the actual ML model
-            employable_students = int(total_students * self.baseline_employability_rate)
+            if sort_by not in SORT_FIELDS:
+                raise ValueError(f"Invalid sort_by '{sort_by}'. Must be one of: {list(SORT_FIELDS)}")
+            if order not in ("asc", "desc"):
+                raise ValueError(f"Invalid order '{order}'. Must be 'asc' or 'desc'")
             
-            employability_rate = (employable_students / total_students) * 100
+            roster = self._current_roster()
+            total_students = roster.total_students
+            employable_students = len(roster.eligible)
             
-            # Generate simulated list of eligible students
-            # In production, this would be actual student data from database
-            eligible_students_list = []
-            programs = ["Cybersecurity", "Software Engineering", "Data Science", "AI & Machine Learning", 
-                       "Computer Networks", "Information Systems"]
+            employability_rate = (employable_students / total_students) * 100 if total_students else 0.0
             
-            for i in range(employable_students):
-                eligible_students_list.append({
-                    "student_id": f"STU{2024000 + i + 1:05d}",
-                    "name": f"Student {i + 1}",
-                    "average_score": round(14.5 + (np.random.random() * 5.5), 2),  # 14.5-20
-                    "program": programs[i % len(programs)],
-                    "eligibility_score": round(70 + (np.random.random() * 30), 2)  # 70-100
-                })
+            start = (page - 1) * page_size
+            rows = roster.order(sort_by, order == "desc")[start:start + page_size]
+            eligible_students_list = roster.eligible.iloc[rows].to_dict("records")
             
-            logger.info(f"TA eligibility prediction: {employable_students}/{total_students} ({employability_rate:.2f}%)")
+            logger.info("TA eligibility prediction: %d/%d (%.2f%%)", employable_students, total_students, employability_rate)
             
             return {
                 "total_students": total_students,
                 "employable_students": employable_students,
                 "employability_rate": round(employability_rate, 2),
                 "message": f"Predicted {employable_students} out of {total_students} students are eligible for TA positions",
-                "eligible_students_list": eligible_students_list
+                "eligible_students_list": eligible_students_list,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": -(-employable_students // page_size),
+                "sort_by": sort_by,
+                "order": order
             }
-            
+        
         except Exception as e:
-            logger.error(f"Error in TA eligibility prediction: {e}")
+            logger.error("Error in TA eligibility prediction: %s", e)
             raise
 
 
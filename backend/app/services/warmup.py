@@ -0,0 +1,131 @@
+"""
+Model Warmup
+Loads every model service concurrently at startup and runs one synthetic
+prediction through each, so the first real request after a deploy or worker
+restart does not pay the model load cost. The same predictions validate new
+model versions before the model registry swaps them in.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+# Imported for their model registrations
+import app.services.success_service  # noqa: F401
+import app.services.dropout_service  # noqa: F401
+import app.services.recommendation_service  # noqa: F401
+import app.services.enrollment_service  # noqa: F401
+from app.services.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+
+# Synthetic profiles matching the request schemas of each endpoint
+SUCCESS_WARMUP_STUDENT = {
+    "gender": 1,
+    "age": 19,
+    "origin_governorate": "Tunis",
+    "baccalaureate_score": 14.0,
+    "baccalaureate_type": "Math",
+    "enrollment_year": 2024,
+    "scholarship_status": "Partial Scholarship",
+    "campus": "Tunis Main",
+    "registration_status": "ACTIVE"
+}
+
+DROPOUT_WARMUP_STUDENT = {
+    "gender": 0,
+    "origin_governorate": "Nabeul",
+    "baccalaureate_score": 12.0,
+    "baccalaureate_type": "Sciences Exp",
+    "previous_years_average": 11.0,
+    "communication_skills_score": 7,
+    "technical_skills_score": 8,
+    "soft_skills_score": 7,
+    "projects_completed": 3,
+    "internship_completed": 1,
+    "internship_duration_months": 2,
+    "portfolio_exists": 1,
+    "linkedin_profile": 1
+}
+
+RECOMMENDATION_WARMUP_STUDENT = {
+    "baccalaureate_score": 13.0,
+    "previous_years_average": 12.0,
+    "communication_skills_score": 6,
+    "technical_skills_score": 5,
+    "soft_skills_score": 6,
+    "internship_completed": 0,
+    "internship_duration_months": 0,
+    "projects_completed": 2,
+    "portfolio_exists": 0,
+    "linkedin_profile": 1,
+    "teaching_interest": 4,
+    "final_average": 12.5,
+    "has_scholarship": 0,
+    "origin_governorate": "Tunis",
+    "baccalaureate_type": "Math",
+    "scholarship_status": "Self-Funded",
+    "campus": "Tunis Main",
+    "registration_status": "ACTIVE",
+    "english_level": "B2"
+}
+
+# name -> callable that runs one synthetic prediction on a service instance
+PROBES: Dict[str, Callable[[Any], Any]] = {
+    "success": lambda service: service.predict(SUCCESS_WARMUP_STUDENT),
+    "dropout": lambda service: service.predict(DROPOUT_WARMUP_STUDENT),
+    "recommendation": lambda service: service.predict(RECOMMENDATION_WARMUP_STUDENT),
+    "enrollment": lambda service: service.forecast(5),
+}
+
+# A new model version must serve its probe before it replaces the live one
+for _name, _probe in PROBES.items():
+    model_registry.set_probe(_name, _probe)
+
+
+def start_model_polling() -> None:
+    """
+    Start polling for new model versions in the current process.
+    
+    Process pool initializer: it lives here so that a worker resolving it
+    imports this module and registers the probes, and versions swapped in
+    by the worker are validated like in the main process.
+    """
+    model_registry.start_polling()
+
+# name -> callable that loads the live service (on first call) and runs its probe
+WARMUPS: Dict[str, Callable[[], Any]] = {
+    name: (lambda name=name, probe=probe: probe(model_registry.get(name))) for name, probe in PROBES.items()
+}
+
+
+def _run_warmup(name: str, warmup: Callable[[], Any]) -> Dict[str, Any]:
+    """Run one warmup and report its outcome instead of raising."""
+    start = time.perf_counter()
+    try:
+        warmup()
+        status = {"status": "ready"}
+    except Exception as e:
+        logger.error("Warmup failed for %s model: %s", name, e)
+        status = {"status": "failed", "error": str(e)}
+    status["seconds"] = round(time.perf_counter() - start, 3)
+    return status
+
+
+def warm_up_models() -> Dict[str, Dict[str, Any]]:
+    """
+    Load all models in parallel and run a synthetic prediction through each.
+    
+    Returns:
+        Dictionary mapping model name to {"status": "ready"|"failed", "seconds", ["error"]}
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(WARMUPS), thread_name_prefix="warmup") as pool:
+        futures = {name: pool.submit(_run_warmup, name, warmup) for name, warmup in WARMUPS.items()}
+        results = {name: future.result() for name, future in futures.items()}
+    
+    ready = sum(1 for status in results.values() if status["status"] == "ready")
+    logger.info("Model warmup finished: %d/%d ready in %.2fs", ready, len(results), time.perf_counter() - start)
+    return results
@@ -0,0 +1,149 @@
+"""
+Model load benchmark: pickles (joblib.load) against compact bundles.
+
+Exports every model pickle to a bundle in a temporary directory (app/models
+is not touched), then times both formats:
+
+- first load: the first load of the model in a fresh interpreter, with the
+  ML libraries already imported (what a starting worker pays per model on
+  top of the imports, which are the same for both formats and timed
+  separately)
+- warm load: repeated loads in one process
+
+Run from the backend directory:
+    python benchmarks/model_load.py
+    python benchmarks/model_load.py --runs 10 --iterations 50 --output load.json
+    python benchmarks/model_load.py app/models/student_success_model.pkl
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+BACKEND_DIR = Path(__file__).parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Imported before the timed load in every fresh interpreter (the estimator modules
+# the shipped models use, so the first load measures the format, not imports)
+PRELUDE = ("import joblib, numpy, xgboost, sklearn.cluster, sklearn.compose, sklearn.ensemble, sklearn.impute, "
+           "sklearn.linear_model, sklearn.pipeline, sklearn.preprocessing\n"
+           "from app.services.model_bundle import load_bundle")
+
+FIRST_LOAD_SNIPPETS = {
+    "pickle": "joblib.load({path!r})",
+    "bundle": "load_bundle({path!r})",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare model load times of pickles and bundles")
+    parser.add_argument("models", nargs="*", type=Path, help="Pickles to benchmark (default: every *.pkl in app/models)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per model and format (default 5)")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed in-process loads per model and format (default 20)")
+    parser.add_argument("--output", default=None, help="Where to write the JSON results (default benchmarks/results/load-<timestamp>.json)")
+    return parser.parse_args()
+
+
+def _run_python(code: str) -> float:
+    """Run code in a fresh interpreter and return the float it prints."""
+    result = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def first_load_ms(fmt: str, path: Path, runs: int) -> float:
+    """Median time of the first load in a fresh interpreter (ML libraries already imported)."""
+    load = FIRST_LOAD_SNIPPETS[fmt].format(path=str(path))
+    code = f"{PRELUDE}\nimport time\nstart = time.perf_counter()\n{load}\nprint((time.perf_counter() - start) * 1000)"
+    return statistics.median(_run_python(code) for _ in range(runs))
+
+
+def import_ms(runs: int) -> float:
+    """Median time to import the ML libraries in a fresh interpreter (common to both formats)."""
+    code = f"import time\nstart = time.perf_counter()\n{PRELUDE}\nprint((time.perf_counter() - start) * 1000)"
+    return statistics.median(_run_python(code) for _ in range(runs))
+
+
+def warm_load_ms(load, iterations: int) -> float:
+    """Median of repeated loads in this process."""
+    load()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        load()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def disk_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.iterdir()) if path.is_dir() else path.stat().st_size
+
+
+def main() -> int:
+    args = parse_args()
+
+    import joblib
+    from app import config
+    from app.services.model_bundle import export_bundle, load_bundle
+
+    models: List[Path] = [path.resolve() for path in (args.models or sorted(config.MODELS_DIR.glob("*.pkl")))]
+
+    print("=" * 96)
+    print("MODEL LOAD BENCHMARK (pickle vs bundle)")
+    print("=" * 96)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="stratus-bundles-") as tmp:
+        for path in models:
+            print(f"  measuring {path.name} ...", flush=True)
+            bundle = export_bundle(joblib.load(path), Path(tmp) / f"{path.stem}.bundle")
+            results[path.name] = {
+                "pickle_bytes": disk_size(path),
+                "bundle_bytes": disk_size(bundle),
+                "first_load_ms": {fmt: round(first_load_ms(fmt, target, args.runs), 3)
+                                  for fmt, target in (("pickle", path), ("bundle", bundle))},
+                "warm_load_ms": {
+                    "pickle": round(warm_load_ms(lambda: joblib.load(path), args.iterations), 3),
+                    "bundle": round(warm_load_ms(lambda: load_bundle(bundle), args.iterations), 3),
+                },
+            }
+        imports = round(import_ms(args.runs), 1)
+
+    print(f"\n{'model':<44} {'KiB pkl/bundle':>15} {'first load ms':>19} {'warm load ms':>17} {'speedup':>8}")
+    print(f"{'':<44} {'':>15} {'pickle':>9} {'bundle':>9} {'pickle':>8} {'bundle':>8}")
+    print("-" * 96)
+    totals = {"pickle": 0.0, "bundle": 0.0}
+    for name, stats in results.items():
+        first, warm = stats["first_load_ms"], stats["warm_load_ms"]
+        totals["pickle"] += first["pickle"]
+        totals["bundle"] += first["bundle"]
+        sizes = f"{stats['pickle_bytes'] / 1024:.0f}/{stats['bundle_bytes'] / 1024:.0f}"
+        speedup = first["pickle"] / first["bundle"] if first["bundle"] else float("inf")
+        print(f"{name:<44} {sizes:>15} {first['pickle']:>9.2f} {first['bundle']:>9.2f} "
+              f"{warm['pickle']:>8.2f} {warm['bundle']:>8.2f} {speedup:>7.2f}x")
+    print("-" * 96)
+    print(f"{'all models (first load)':<44} {'':>15} {totals['pickle']:>9.2f} {totals['bundle']:>9.2f}")
+    print(f"\nImporting the ML libraries takes {imports:.0f} ms in a fresh interpreter (same for both formats)")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "environment": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0],
+                        "runs": args.runs, "iterations": args.iterations, "imports_ms": imports},
+        "results": results,
+    }, indent=2))
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
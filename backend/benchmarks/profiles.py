@@ -0,0 +1,123 @@
+"""
+Synthetic student profiles for the benchmarks.
+
+Profiles are generated field by field from the pydantic request schemas:
+numeric fields are drawn inside their ge/le bounds (scores cluster around
+the middle of the range, like real grade distributions) and string fields
+are drawn from the categories the models were trained on. Every profile is
+validated against its schema, so the benchmarks exercise the same inputs
+the API accepts.
+"""
+
+import csv
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel
+
+from app.schemas.dropout import DropoutPredictionRequest
+from app.schemas.recommendation import ProgramRecommendationRequest
+from app.schemas.segmentation import SegmentationRequest
+from app.schemas.student_ta_eligibility import StudentTAEligibilityRequest
+from app.schemas.success import SuccessPredictionRequest
+
+# Values seen in the training data for the free-text fields
+CATEGORY_VALUES = {
+    "origin_governorate": ["Tunis", "Ariana", "Ben Arous", "Nabeul", "Sousse", "Sfax", "Monastir", "Bizerte", "Gafsa", "Kairouan"],
+    "baccalaureate_type": ["Math", "Sciences Exp", "Tech", "Letters", "Economics"],
+    "scholarship_status": ["Full Scholarship", "Partial Scholarship", "Self-Funded"],
+    "campus": ["Tunis Main", "Monastir"],
+    "registration_status": ["ACTIVE", "ACTIVE", "ACTIVE", "DUPLICATE_ENTRY"],
+    "english_level": ["A2", "B1", "B2", "C1"],
+    "chosen_program": ["Computer Science", "Cybersecurity", "Software Engineering", "Civil Engineering",
+                       "Business Management", "Digital Marketing", "Preparatory Classes"],
+}
+
+# Upper bounds for count-like fields the schemas leave open (ge=0 only)
+OPEN_RANGE_MAX = {
+    "projects_completed": 10,
+    "internship_duration_months": 12,
+    "age": 30,
+}
+
+# Request schema per benchmarked service
+SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "success": SuccessPredictionRequest,
+    "dropout": DropoutPredictionRequest,
+    "recommendation": ProgramRecommendationRequest,
+    "segmentation": SegmentationRequest,
+    "student_ta": StudentTAEligibilityRequest,
+}
+
+
+def _bounds(field) -> tuple:
+    """Read the ge/le constraints of a pydantic field."""
+    low = high = None
+    for constraint in field.metadata:
+        if hasattr(constraint, "ge"):
+            low = constraint.ge
+        if hasattr(constraint, "le"):
+            high = constraint.le
+    return low, high
+
+
+def _draw(name: str, field, rng: random.Random) -> Any:
+    if name in CATEGORY_VALUES:
+        return rng.choice(CATEGORY_VALUES[name])
+
+    low, high = _bounds(field)
+    low = 0 if low is None else low
+    high = OPEN_RANGE_MAX.get(name, low + 10) if high is None else high
+    if name in OPEN_RANGE_MAX:
+        high = min(high, OPEN_RANGE_MAX[name])
+
+    if field.annotation is float:
+        # Grades: roughly normal around the middle of the range
+        value = rng.gauss((low + high) / 2, (high - low) / 6)
+        return round(min(max(value, low), high), 2)
+    if field.annotation is int:
+        if high - low <= 1:
+            return rng.randint(low, high)
+        value = rng.gauss((low + high) / 2, (high - low) / 4)
+        return int(round(min(max(value, low), high)))
+    raise ValueError(f"No generator for field '{name}' ({field.annotation})")
+
+
+def make_profile(schema: Type[BaseModel], rng: random.Random) -> Dict[str, Any]:
+    """Generate one valid request payload for a schema."""
+    profile = {name: _draw(name, field, rng) for name, field in schema.model_fields.items()}
+
+    # Keep dependent fields consistent
+    if "internship_completed" in profile and not profile["internship_completed"]:
+        profile["internship_duration_months"] = 0
+    if "has_scholarship" in profile:
+        profile["has_scholarship"] = int(profile["scholarship_status"] != "Self-Funded")
+
+    return schema.model_validate(profile).model_dump()
+
+
+def make_profiles(service: str, count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Generate count valid request payloads for a service (reproducible for a given seed)."""
+    rng = random.Random(f"{service}-{seed}")
+    schema = SCHEMAS[service]
+    return [make_profile(schema, rng) for _ in range(count)]
+
+
+def write_roster(path: Path, count: int, seed: int = 42) -> Path:
+    """Write a synthetic TA roster CSV (student_ta profiles plus id, name and program columns)."""
+    rng = random.Random(f"roster-{seed}")
+    rows = []
+    for i, profile in enumerate(make_profiles("student_ta", count, seed)):
+        rows.append({
+            "student_id": f"STU{2024000 + i + 1:07d}",
+            "name": f"Student {i + 1}",
+            "program": rng.choice(CATEGORY_VALUES["chosen_program"]),
+            **profile,
+        })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
@@ -0,0 +1,316 @@
+"""
+Benchmark suite for the prediction endpoints.
+
+Drives every service's single and batch paths both in-process (calling the
+services directly) and through the ASGI app (FastAPI TestClient), using
+synthetic profiles generated from the request schemas. Reports throughput
+and p50/p95/p99 latencies and writes the results as JSON so runs can be
+compared between versions.
+
+Run from the backend directory:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --iterations 500 --batch-size 256 --output before.json
+    python benchmarks/run_benchmarks.py --filter dropout --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Cases that score the whole TA roster per call run fewer iterations
+ROSTER_ITERATION_DIVISOR = 10
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the Stratus ML prediction endpoints")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per single-request case (default 200)")
+    parser.add_argument("--batch-size", type=int, default=128, help="Students per call in batch cases (default 128)")
+    parser.add_argument("--batches", type=int, default=20, help="Timed calls per batch case (default 20)")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed calls before each case (default 10)")
+    parser.add_argument("--mode", choices=("all", "inprocess", "http"), default="all", help="Which layer to benchmark")
+    parser.add_argument("--filter", default=None, help="Only run cases whose name contains this string")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the synthetic profiles")
+    parser.add_argument("--roster-size", type=int, default=5619, help="Students in the synthetic TA roster when STRATUS_TA_ROSTER_PATH is unset (default 5619)")
+    parser.add_argument("--cache", action="store_true", help="Keep the prediction cache enabled (off by default so every call is scored)")
+    parser.add_argument("--output", default=None, help="Where to write the JSON results (default benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="Previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent for --compare (default 10)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 when --compare finds a regression")
+    return parser.parse_args()
+
+
+def summarize(latencies: List[float], total_seconds: float, rows: int) -> Dict[str, Any]:
+    """Throughput and latency percentiles (milliseconds) for one case."""
+    import numpy as np
+
+    samples = np.asarray(latencies) * 1000
+    return {
+        "calls": len(latencies),
+        "rows": rows,
+        "total_seconds": round(total_seconds, 4),
+        "calls_per_second": round(len(latencies) / total_seconds, 2),
+        "rows_per_second": round(rows / total_seconds, 2),
+        "latency_ms": {
+            "mean": round(float(samples.mean()), 4),
+            "p50": round(float(np.percentile(samples, 50)), 4),
+            "p95": round(float(np.percentile(samples, 95)), 4),
+            "p99": round(float(np.percentile(samples, 99)), 4),
+            "max": round(float(samples.max()), 4),
+        },
+    }
+
+
+def run_case(fn: Callable[[Any], Any], inputs: List[Any], warmup: int, rows_per_call: int = 1) -> Dict[str, Any]:
+    """Call fn once per input (after warmup untimed calls) and time each call."""
+    for item in inputs[:warmup]:
+        fn(item)
+
+    latencies = []
+    start = time.perf_counter()
+    for item in inputs:
+        call_start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - call_start)
+    total = time.perf_counter() - start
+    return summarize(latencies, total, len(inputs) * rows_per_call)
+
+
+def build_cases(args: argparse.Namespace, client=None) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    """Map case name -> zero-argument runner, for the selected mode."""
+    import numpy as np
+
+    from benchmarks.profiles import make_profiles
+    from app.services.success_service import get_success_service
+    from app.services.dropout_service import get_dropout_service
+    from app.services.recommendation_service import get_recommendation_service
+    from app.services.enrollment_service import get_enrollment_service
+    from app.services.segmentation_service import segmentation_service
+    from app.services.student_ta_eligibility_service import student_ta_eligibility_service
+    from app.services.ta_eligibility_service import ta_eligibility_service
+
+    n, warmup, batch_size = args.iterations, args.warmup, args.batch_size
+    roster_calls = max(n // ROSTER_ITERATION_DIVISOR, 5)
+
+    def singles(service: str) -> List[Dict[str, Any]]:
+        return make_profiles(service, n, args.seed)
+
+    def batches(service: str) -> List[List[Dict[str, Any]]]:
+        profiles = make_profiles(service, args.batches * batch_size, args.seed)
+        return [profiles[i:i + batch_size] for i in range(0, len(profiles), batch_size)]
+
+    def roster_columns() -> List[Dict[str, Any]]:
+        profiles = make_profiles("student_ta", args.roster_size, args.seed)
+        return [{col: np.array([p[col] for p in profiles]) for col in student_ta_eligibility_service.base_features}]
+
+    years = [1 + i % 10 for i in range(n)]
+    cases: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    if args.mode in ("all", "inprocess"):
+        success, dropout, recommendation = get_success_service(), get_dropout_service(), get_recommendation_service()
+        enrollment = get_enrollment_service()
+
+        cases["inprocess.success.single"] = lambda: run_case(success.predict, singles("success"), warmup)
+        cases["inprocess.success.batch"] = lambda: run_case(success.predict_many, batches("success"), 1, batch_size)
+        cases["inprocess.dropout.single"] = lambda: run_case(dropout.predict, singles("dropout"), warmup)
+        cases["inprocess.dropout.batch"] = lambda: run_case(dropout.predict_many, batches("dropout"), 1, batch_size)
+        cases["inprocess.recommendation.single"] = lambda: run_case(recommendation.predict, singles("recommendation"), warmup)
+        cases["inprocess.recommendation.batch"] = lambda: run_case(recommendation.predict_many, batches("recommendation"), 1, batch_size)
+        cases["inprocess.segmentation.single"] = lambda: run_case(
+            lambda p: segmentation_service.segment_student(**p), singles("segmentation"), warmup)
+        cases["inprocess.segmentation.batch"] = lambda: run_case(
+            segmentation_service.segment_many, batches("segmentation"), 1, batch_size)
+        cases["inprocess.student_ta.single"] = lambda: run_case(
+            student_ta_eligibility_service.predict_student_eligibility, singles("student_ta"), warmup)
+        cases["inprocess.student_ta.batch"] = lambda: run_case(
+            student_ta_eligibility_service.predict_many, batches("student_ta"), 1, batch_size)
+        cases["inprocess.enrollment.single"] = lambda: run_case(enrollment.forecast, years, warmup)
+        cases["inprocess.ta_eligibility.roster"] = lambda: run_case(
+            lambda _: ta_eligibility_service.predict_employability(), [None] * roster_calls, 1)
+        cases["inprocess.ta_eligibility.scoring"] = lambda: run_case(
+            student_ta_eligibility_service.calculate_eligibility_scores, roster_columns() * roster_calls, 1, args.roster_size)
+
+    if args.mode in ("all", "http") and client is not None:
+        def post(path: str) -> Callable[[Any], Any]:
+            def call(payload):
+                response = client.post(path, json=payload)
+                response.raise_for_status()
+                return response
+            return call
+
+        def get(path: str) -> Callable[[Any], Any]:
+            def call(_):
+                response = client.get(path)
+                response.raise_for_status()
+                return response
+            return call
+
+        def post_bulk(batch):
+            body = "".join(json.dumps(profile) + "\n" for profile in batch)
+            response = client.post(
+                "/api/predict/success/bulk",
+                params={"format": "ndjson", "chunk_size": batch_size},
+                files={"file": ("students.ndjson", body, "application/x-ndjson")},
+            )
+            response.raise_for_status()
+            return response.text
+
+        cases["http.success.single"] = lambda: run_case(post("/api/predict/success"), singles("success"), warmup)
+        cases["http.success.bulk"] = lambda: run_case(post_bulk, batches("success"), 1, batch_size)
+        cases["http.dropout.single"] = lambda: run_case(post("/api/predict/dropout"), singles("dropout"), warmup)
+        cases["http.dropout.batch"] = lambda: run_case(
+            post("/api/predict/dropout/batch"), [{"students": batch} for batch in batches("dropout")], 1, batch_size)
+        cases["http.recommendation.single"] = lambda: run_case(post("/api/predict/recommend"), singles("recommendation"), warmup)
+        cases["http.segmentation.single"] = lambda: run_case(post("/api/student/segment"), singles("segmentation"), warmup)
+        cases["http.segmentation.batch"] = lambda: run_case(
+            post("/api/student/segment/batch"), [{"students": batch} for batch in batches("segmentation")], 1, batch_size)
+        cases["http.student_ta.single"] = lambda: run_case(post("/api/student/ta-check"), singles("student_ta"), warmup)
+        cases["http.student_ta.batch"] = lambda: run_case(
+            post("/api/student/ta-check/batch"), [{"students": batch} for batch in batches("student_ta")], 1, batch_size)
+        cases["http.enrollment.single"] = lambda: run_case(
+            post("/api/admin/forecast"), [{"years_ahead": y} for y in years], warmup)
+        cases["http.ta_eligibility.roster"] = lambda: run_case(get("/api/admin/eligibility"), [None] * roster_calls, 1)
+
+    if args.filter:
+        cases = {name: runner for name, runner in cases.items() if args.filter in name}
+    return cases
+
+
+def environment_info(args: argparse.Namespace) -> Dict[str, Any]:
+    """What the numbers were measured on, stored alongside the results."""
+    from app import config
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=Path(__file__).parent, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "iterations": args.iterations,
+        "batch_size": args.batch_size,
+        "batches": args.batches,
+        "seed": args.seed,
+        "config": {
+            "batching_enabled": config.BATCHING_ENABLED,
+            "batch_window_ms": config.BATCH_WINDOW_MS,
+            "inference_threads": config.INFERENCE_THREADS,
+            "compiled_inference": config.COMPILED_INFERENCE,
+            "prediction_cache_size": config.PREDICTION_CACHE_SIZE,
+            "model_cache_dir": config.MODEL_CACHE_DIR,
+            "ta_roster_path": str(config.TA_ROSTER_PATH),
+        },
+    }
+
+
+def print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    print(f"\n{'case':<36} {'calls':>6} {'rows/s':>11} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    print("-" * 84)
+    for name, stats in results.items():
+        latency = stats["latency_ms"]
+        print(f"{name:<36} {stats['calls']:>6} {stats['rows_per_second']:>11.1f} "
+              f"{latency['p50']:>9.3f} {latency['p95']:>9.3f} {latency['p99']:>9.3f}")
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline_path: str, threshold: float, batch_size: int) -> List[str]:
+    """Print the change against a previous run and return the cases that regressed."""
+    baseline_run = json.loads(Path(baseline_path).read_text())
+    baseline = baseline_run["results"]
+    regressions = []
+
+    print(f"\nComparison with {baseline_path} (regression threshold {threshold:.0f}%)")
+    baseline_batch_size = baseline_run.get("environment", {}).get("batch_size")
+    if baseline_batch_size != batch_size:
+        print(f"Note: baseline used --batch-size {baseline_batch_size}, batch latencies are not comparable")
+    print(f"{'case':<36} {'p50 before':>11} {'p50 after':>10} {'Δ p50':>8} {'Δ rows/s':>9}")
+    print("-" * 84)
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<36} {'(new)':>11}")
+            continue
+        p50_before, p50_after = before["latency_ms"]["p50"], stats["latency_ms"]["p50"]
+        p50_change = (p50_after - p50_before) / p50_before * 100 if p50_before else 0.0
+        rate_change = (stats["rows_per_second"] - before["rows_per_second"]) / before["rows_per_second"] * 100
+        regressed = p50_change > threshold or rate_change < -threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<36} {p50_before:>11.3f} {p50_after:>10.3f} {p50_change:>+7.1f}% {rate_change:>+8.1f}%"
+              f"{'  ✗ REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main() -> int:
+    args = parse_args()
+
+    # Settings are read at import time, so they must be in place before the app is imported
+    if not args.cache:
+        os.environ["STRATUS_PREDICTION_CACHE_SIZE"] = "0"
+    os.environ.setdefault("STRATUS_LOG_LEVEL", "WARNING")
+    if not os.environ.get("STRATUS_TA_ROSTER_PATH"):
+        roster = Path(tempfile.gettempdir()) / f"stratus-bench-roster-{args.roster_size}-{args.seed}.csv"
+        if not roster.exists():
+            from benchmarks.profiles import write_roster
+            write_roster(roster, args.roster_size, args.seed)
+        os.environ["STRATUS_TA_ROSTER_PATH"] = str(roster)
+
+    print("=" * 84)
+    print("STRATUS ML BENCHMARKS")
+    print("=" * 84)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    client = None
+    if args.mode in ("all", "http"):
+        from fastapi.testclient import TestClient
+        from app.main import app
+        client = TestClient(app)
+        client.__enter__()
+        while client.get("/ready").status_code == 503:
+            time.sleep(0.1)
+
+    try:
+        cases = build_cases(args, client)
+        for name, runner in cases.items():
+            print(f"  running {name} ...", flush=True)
+            results[name] = runner()
+    finally:
+        if client is not None:
+            client.__exit__(None, None, None)
+
+    print_results(results)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"environment": environment_info(args), "results": results}, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold, args.batch_size)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s): {', '.join(regressions)}")
+            if args.fail_on_regression:
+                return 1
+        else:
+            print("\n✓ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""
+In-process test of the micro-batching layer (no server needed).
+Run from the backend directory: python tests/test_batching.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.batching import MicroBatcher
+
+batch_sizes = []
+
+
+def square_all(items):
+    """Batch function that fails the whole batch if any item is negative."""
+    batch_sizes.append(len(items))
+    if any(item < 0 for item in items):
+        raise ValueError("negative input")
+    return [item * item for item in items]
+
+
+async def main():
+    batcher = MicroBatcher("test", square_all, max_batch_size=16, max_wait_ms=5, enabled=True)
+    
+    print("=" * 70)
+    print("MICRO-BATCHING TEST")
+    print("=" * 70)
+    
+    # 40 concurrent calls -> flushed as 16 + 16 + 8
+    results = await asyncio.gather(*[batcher.submit(i) for i in range(40)])
+    ok = results == [i * i for i in range(40)]
+    print(f"\n1. Results in caller order: {'✓' if ok else '✗'}")
+    print(f"   Batch calls: {len(batch_sizes)} (sizes {batch_sizes})")
+    
+    # One bad item must only fail its own caller
+    batch_sizes.clear()
+    results = await asyncio.gather(*[batcher.submit(i) for i in (1, 2, -3, 4)], return_exceptions=True)
+    isolated = results[:2] == [1, 4] and isinstance(results[2], ValueError) and results[3] == 16
+    print(f"\n2. Failing item isolated: {'✓' if isolated else '✗'} ({results})")
+    
+    print("\n" + "=" * 70)
+    print("✓ SUCCESS!" if ok and isolated else "✗ FAILED")
+
+
+asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Parity test for the compiled inference backend (no server needed).
+Checks that compiled models give the same probabilities as sklearn and
+compares single-row latency.
+Run from the backend directory: python tests/test_compiled_models.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.compiled_models import compile_model
+
+rng = np.random.default_rng(42)
+X_train = rng.normal(size=(2000, 15))
+y_train = (X_train[:, 0] + X_train[:, 3] * X_train[:, 5] + rng.normal(scale=0.5, size=2000) > 0).astype(int)
+X_test = rng.normal(size=(5000, 15))
+
+models = {
+    "RandomForest": RandomForestClassifier(n_estimators=100, max_depth=10, random_state=0).fit(X_train, y_train),
+    "RandomForest (unlimited depth)": RandomForestClassifier(n_estimators=30, random_state=0).fit(X_train, y_train),
+    "ExtraTrees": ExtraTreesClassifier(n_estimators=50, random_state=0).fit(X_train, y_train),
+    "DecisionTree": DecisionTreeClassifier(max_depth=6, random_state=0).fit(X_train, y_train),
+    "LogisticRegression": LogisticRegression().fit(X_train, y_train),
+}
+
+# The deployed dropout model (scaled inputs)
+dropout_path = Path(__file__).parent.parent / "app" / "models" / "dropout(obj1).pkl"
+if dropout_path.exists():
+    dropout = joblib.load(dropout_path)
+    models["Dropout model (obj1)"] = dropout["model"]
+
+
+def single_row_latency(predict_proba, row, repeats=200):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        predict_proba(row)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+print("=" * 70)
+print("COMPILED INFERENCE PARITY TEST")
+print("=" * 70)
+
+all_ok = True
+for name, model in models.items():
+    X = X_test[:, :model.n_features_in_]
+    compiled = compile_model(model)
+    
+    expected = model.predict_proba(X)
+    actual = compiled.predict_proba(X)
+    exact = np.array_equal(expected, actual)
+    close = np.allclose(expected, actual, rtol=0, atol=1e-12)
+    all_ok = all_ok and close
+    
+    row = X[:1]
+    sklearn_ms = single_row_latency(model.predict_proba, row)
+    compiled_ms = single_row_latency(compiled.predict_proba, row)
+    
+    print(f"\n{name}")
+    print(f"  Parity: {'✓ identical' if exact else ('✓ within 1e-12' if close else '✗ MISMATCH')} "
+          f"(max abs diff {np.abs(expected - actual).max():.2e})")
+    print(f"  Single-row latency: sklearn {sklearn_ms:.3f} ms, compiled {compiled_ms:.3f} ms "
+          f"({sklearn_ms / compiled_ms:.1f}x)")
+
+print("\n" + "=" * 70)
+print("✓ SUCCESS! All compiled models match sklearn" if all_ok else "✗ FAILED")
@@ -0,0 +1,66 @@
+"""
+Test for the batch dropout endpoint: scores a small cohort in one call
+and checks that each result matches the single-student endpoint and that
+the cohort's factor counts add up.
+"""
+
+import requests
+
+single_url = "http://localhost:8000/api/predict/dropout"
+batch_url = "http://localhost:8000/api/predict/dropout/batch"
+
+base_student = {
+    "gender": 0,
+    "origin_governorate": "Nabeul",
+    "baccalaureate_score": 12.0,
+    "baccalaureate_type": "Sciences Exp",
+    "previous_years_average": 11.0,
+    "communication_skills_score": 7,
+    "technical_skills_score": 8,
+    "soft_skills_score": 7,
+    "projects_completed": 3,
+    "internship_completed": 1,
+    "internship_duration_months": 2,
+    "portfolio_exists": 1,
+    "linkedin_profile": 1
+}
+
+# Small cohort: vary the strongest predictor
+cohort = [dict(base_student, previous_years_average=avg) for avg in (6.0, 9.5, 11.0, 14.0, 17.5)]
+
+print("=" * 70)
+print("TESTING BATCH DROPOUT API")
+print("=" * 70)
+
+try:
+    response = requests.post(batch_url, json={"students": cohort})
+    
+    if response.status_code == 200:
+        result = response.json()
+        print(f"\nScored {result['count']} students")
+        
+        mismatches = 0
+        for student, batch_result in zip(cohort, result["results"]):
+            single_result = requests.post(single_url, json=student).json()
+            match = single_result == batch_result
+            mismatches += 0 if match else 1
+            print(f"  avg={student['previous_years_average']:>5}: "
+                  f"{batch_result['dropout_prediction']:<12} "
+                  f"p={batch_result['dropout_probability']:.3f} "
+                  f"{'✓' if match else '✗ differs from single endpoint'}")
+        
+        # Two averages below 10, and every student has a 2-month internship
+        counts = result["factor_counts"]
+        counts_ok = counts["low_average"] == 2 and counts["short_internship"] == len(cohort)
+        mismatches += 0 if counts_ok else 1
+        print(f"\nFactor counts: {counts['low_average']} low averages, "
+              f"{counts['short_internship']} short internships {'✓' if counts_ok else '✗'}")
+        
+        print("\n" + "=" * 70)
+        print("✓ SUCCESS! Batch matches single predictions" if mismatches == 0 else f"✗ {mismatches} mismatches")
+    else:
+        print(f"ERROR: {response.status_code}")
+        print(response.text)
+        
+except Exception as e:
+    print(f"ERROR: {e}")
@@ -29,3 +29,22 @@ try:
 except Exception as e:
     print(f"\n❌ EXCEPTION!")
     print(f"Error: {str(e)}")
+
+# Cached GET: repeating the request with the ETag should return 304
+print("\nTesting conditional GET (ETag / If-None-Match)...")
+
+try:
+    response = requests.get('http://localhost:8000/api/admin/forecast', params=data)
+    etag = response.headers.get('ETag')
+    print(f"Status Code: {response.status_code}")
+    print(f"ETag: {etag}")
+    print(f"Cache-Control: {response.headers.get('Cache-Control')}")
+    
+    revalidated = requests.get('http://localhost:8000/api/admin/forecast', params=data,
+                               headers={'If-None-Match': etag})
+    print(f"Revalidation Status Code: {revalidated.status_code}")
+    print("✅ SUCCESS!" if revalidated.status_code == 304 else "❌ ERROR! Expected 304")
+        
+except Exception as e:
+    print(f"\n❌ EXCEPTION!")
+    print(f"Error: {str(e)}")
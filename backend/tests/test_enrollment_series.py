@@ -0,0 +1,99 @@
+"""
+Multi-series enrollment forecasting test (no server needed).
+Fits synthetic campus/program series with mixed training periods, then checks
+the vectorized batch forecast against a per-series np.polyfit/np.polyval,
+that refitting the global model's own curve reproduces the global forecast
+and that fitted series are shared through the series file (another worker or
+a restart sees them).
+Run from the backend directory: python tests/test_enrollment_series.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import config
+from app.services.enrollment_service import EnrollmentForecastService, get_enrollment_service
+
+CAMPUSES = ["Tunis Main", "Monastir"]
+PROGRAMS = ["Computer Science", "Cybersecurity", "Software Engineering", "Civil Engineering",
+            "Business Management", "Digital Marketing", "Preparatory Classes"]
+
+
+def main():
+    print("=" * 70)
+    print("ENROLLMENT SERIES TEST")
+    print("=" * 70)
+    
+    tmp = tempfile.TemporaryDirectory()
+    config.FORECAST_SERIES_PATH = Path(tmp.name) / "enrollment_series.npz"
+    service = get_enrollment_service()
+    rng = np.random.default_rng(42)
+    
+    series = []
+    for campus in CAMPUSES:
+        for program in PROGRAMS:
+            first_year = int(rng.integers(2012, 2019))
+            years = list(range(first_year, 2025))
+            trend = rng.normal(5, 8) * np.arange(len(years))
+            series.append({
+                "key": f"{campus}/{program}",
+                "campus": campus,
+                "program": program,
+                "years": years,
+                "enrollments": (rng.normal(300, 20, len(years)) + trend).tolist(),
+            })
+    
+    start = time.perf_counter()
+    summaries = service.fit_series(series, degree=2)
+    fit_ms = (time.perf_counter() - start) * 1000
+    print(f"\n1. Fitted {len(summaries)} series in {fit_ms:.1f} ms")
+    
+    start = time.perf_counter()
+    forecasts = service.forecast_series(5, [item["key"] for item in series])
+    forecast_ms = (time.perf_counter() - start) * 1000
+    
+    mismatches = 0
+    for item, forecast in zip(series, forecasts):
+        years = np.array(item["years"], dtype=float)
+        coefs = np.polyfit(years - years.mean(), item["enrollments"], 2)
+        future = np.arange(item["years"][-1] + 1, item["years"][-1] + 6)
+        expected = np.maximum(np.round(np.polyval(coefs, future - years.mean())).astype(int), 0)
+        actual = [year["predicted_enrollment"] for year in forecast["forecasts"]]
+        if actual != expected.tolist() or forecast["key"] != item["key"]:
+            mismatches += 1
+    parity_ok = mismatches == 0
+    print(f"\n2. Batch forecast matches per-series polyval: {'✓' if parity_ok else '✗'} "
+          f"({mismatches} mismatches, {forecast_ms:.1f} ms for {len(forecasts)} series)")
+    
+    # The global model is a degree-2 polynomial too: fitting its own curve must reproduce it
+    train_years = np.array(service.train_years)
+    service.fit_series([{
+        "key": "global",
+        "years": train_years.tolist(),
+        "enrollments": service.model.predict(train_years.reshape(-1, 1)).tolist(),
+    }])
+    refit = service.forecast_series(10, ["global"])[0]
+    original = service.forecast(10)
+    global_ok = refit["forecasts"] == original["forecasts"] and refit["trend_description"] == original["trend_description"]
+    print(f"\n3. Refitted global series matches the global model: {'✓' if global_ok else '✗'}")
+    
+    # A new instance (another worker, or after a restart) loads the saved series,
+    # and a fit made there is picked up by the first instance
+    other = EnrollmentForecastService()
+    shared_ok = other.series_keys() == service.series_keys() and other.forecast_series(5) == service.forecast_series(5)
+    other.fit_series([{"key": "other", "years": [2020, 2021, 2022], "enrollments": [100, 110, 120]}], degree=1)
+    shared_ok &= service.series_keys()[-1] == "other" and len(service.series_keys()) == len(series) + 2
+    print(f"\n4. Fitted series shared through the series file: {'✓' if shared_ok else '✗'}")
+    tmp.cleanup()
+    
+    print("\n" + "=" * 70)
+    print("✓ SUCCESS!" if parity_ok and global_ok and shared_ok else "✗ FAILED")
+
+
+main()
@@ -0,0 +1,189 @@
+"""
+Structured factor codes test (no server needed).
+Checks that the factor codes render to the original factor sentences, that
+recommendations are selected from the concern codes as the old substring
+scans did, that students with the same factor signature share one
+recommendation tuple, and that the columnar factor analysis and cohort
+counts match the per-student analysis.
+Run from the backend directory: python tests/test_factor_codes.py
+"""
+
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.routers import dropout as dropout_router
+from app.routers import success as success_router
+from app.services import dropout_service as dropout_module
+from app.services import success_service as success_module
+from app.services.factors import factor_flags, render_factors
+from benchmarks.profiles import make_profiles
+
+DROPOUT_STUDENT = {
+    "previous_years_average": 9.5,
+    "baccalaureate_score": 14.0,
+    "technical_skills_score": 7,
+    "communication_skills_score": 4,
+    "soft_skills_score": 8,
+    "projects_completed": 1,
+    "internship_completed": 1,
+    "internship_duration_months": 2,
+    "portfolio_exists": 0,
+    "linkedin_profile": 1,
+}
+
+DROPOUT_EXPECTED = {
+    "positive": ["Strong baccalaureate score (14.0/20)", "Strong soft skills (8/10)", "Active LinkedIn profile"],
+    "concerns": [
+        "Low previous years average (9.5/20) - High dropout risk",
+        "Weak communication skills (4/10) - Risk factor",
+        "Few projects completed (1) - Risk factor",
+        "No portfolio - Risk factor",
+    ],
+    "neutral": ["Adequate technical skills (7/10)", "Short internship (2 months)"],
+}
+
+SUCCESS_STUDENT = {
+    "baccalaureate_score": 12.5,
+    "scholarship_status": "Self-Funded",
+    "baccalaureate_type": "Math",
+    "age": 27,
+    "campus": "Monastir",
+}
+
+# Values on and around every threshold of the factor analysis
+DROPOUT_EDGES = {
+    "previous_years_average": [0.0, 9.99, 10.0, 13.99, 14.0, 20.0],
+    "baccalaureate_score": [10.99, 11.0, 13.99, 14.0],
+    "technical_skills_score": [6, 7, 8],
+    "communication_skills_score": [5, 6, 8],
+    "soft_skills_score": [6, 7, 8],
+    "projects_completed": [0, 1, 2, 4],
+    "internship_completed": [0, 1],
+    "internship_duration_months": [0, 2, 3],
+}
+
+SUCCESS_EDGES = {
+    "baccalaureate_score": [9.99, 10.0, 12.0, 13.29, 13.3, 14.0, 16.0],
+    "scholarship_status": ["Full Scholarship", "Partial Scholarship", "Self-Funded"],
+    "baccalaureate_type": ["Sciences", "Math", "Sciences Exp", "Tech"],
+    "age": [20, 21, 25, 26],
+    "campus": ["", "Monastir"],
+}
+
+SUCCESS_EXPECTED = {
+    "positive": ["Strong academic background (Math)"],
+    "concerns": [
+        "Baccalaureate score (12.5/20) - Below typical success threshold (13.3+)",
+        "Self-funded (no scholarship)",
+        "Non-traditional student age",
+    ],
+    "neutral": ["Campus: Monastir"],
+}
+
+
+def _scan_flags(concerns: list, keywords: dict) -> int:
+    """The pre-code behaviour: a flag is raised when any concern contains one of its keywords"""
+    flags = 0
+    for flag, words in keywords.items():
+        if any(word in concern.lower() for concern in concerns for word in words):
+            flags |= flag
+    return flags
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def main():
+    print("=" * 70)
+    print("FACTOR CODES TEST")
+    print("=" * 70)
+    
+    dropout = dropout_module.get_dropout_service()
+    success = success_module.get_success_service()
+    all_ok = True
+    
+    dropout_factors = dropout._analyze_factors(DROPOUT_STUDENT, 0.0)
+    success_factors = success._analyze_factors(SUCCESS_STUDENT, 0.0)
+    all_ok &= check("Dropout factors render to the original sentences",
+                    render_factors(dropout_factors, dropout_module.FACTOR_TEMPLATES) == DROPOUT_EXPECTED)
+    all_ok &= check("Success factors render to the original sentences",
+                    render_factors(success_factors, success_module.FACTOR_TEMPLATES) == SUCCESS_EXPECTED)
+    
+    # Every concern template raises exactly the flags the old keyword scans found in its text
+    dropout_keywords = {
+        dropout_module.CONCERN_ACADEMIC: ("average", "baccalaureate"),
+        dropout_module.CONCERN_SKILLS: ("skills",),
+        dropout_module.CONCERN_PROJECTS: ("projects",),
+        dropout_module.CONCERN_INTERNSHIP: ("internship",),
+        dropout_module.CONCERN_PORTFOLIO: ("portfolio",),
+        dropout_module.CONCERN_LINKEDIN: ("linkedin",),
+    }
+    success_keywords = {
+        success_module.CONCERN_SCORE: ("score",),
+        success_module.CONCERN_SCHOLARSHIP: ("scholarship",),
+        success_module.CONCERN_AGE: ("age",),
+    }
+    for label, module, keywords in (("Dropout", dropout_module, dropout_keywords),
+                                    ("Success", success_module, success_keywords)):
+        mismatched = [
+            code.name for code, template in module.FACTOR_TEMPLATES.items()
+            if template.category == "concerns"
+            and template.flags != _scan_flags([template.text.format(value=1)], keywords)
+        ]
+        all_ok &= check(f"{label} concern flags match the keyword scans" + (f": {mismatched}" if mismatched else ""),
+                        not mismatched)
+    
+    all_ok &= check("Dropout factor signature",
+                    factor_flags(dropout_factors, dropout_module.FACTOR_TEMPLATES)
+                    == dropout_module.CONCERN_ACADEMIC | dropout_module.CONCERN_SKILLS
+                    | dropout_module.CONCERN_PROJECTS | dropout_module.CONCERN_PORTFOLIO)
+    
+    high_risk = dropout_router._generate_recommendations("High Risk", "High", dropout_factors)
+    all_ok &= check("High-risk advice follows the concerns",
+                    "Schedule weekly meetings with academic advisor" in high_risk
+                    and "Create a professional portfolio showcasing your work" in high_risk
+                    and "Visit career services for internship opportunities" not in high_risk
+                    and high_risk[-1] == "Regular check-ins with advisors help catch issues early")
+    at_risk = success_router._generate_recommendations("At Risk", "Medium", success_factors)
+    all_ok &= check("At-risk advice follows the concerns",
+                    "Apply for financial aid and scholarships to reduce financial stress" in at_risk
+                    and "Connect with peer support groups and non-traditional student resources" in at_risk)
+    
+    # Same signature, different values: one shared, immutable tuple
+    other = dict(DROPOUT_STUDENT, previous_years_average=8.0, communication_skills_score=2)
+    other_factors = dropout._analyze_factors(other, 0.0)
+    shared = dropout_router._generate_recommendations("High Risk", "High", other_factors)
+    all_ok &= check("Recommendations shared across a factor signature",
+                    shared is high_risk and isinstance(shared, tuple))
+    
+    # Columnar analysis: same codes per student and same cohort counts as the per-student ladder
+    rng = random.Random(42)
+    for label, service, kind, edges in (("Dropout", dropout, "dropout", DROPOUT_EDGES),
+                                        ("Success", success, "success", SUCCESS_EDGES)):
+        students = make_profiles(kind, 5000, seed=7)
+        for student in students[:2500]:
+            student.update({field: rng.choice(values) for field, values in edges.items()})
+        
+        codes = service.analyze_factors_batch(service.factor_columns(students))
+        mismatches = sum(
+            [code for code in row if code] != [int(factor.code) for factor in service._analyze_factors(student, 0.0)]
+            for row, student in zip(codes.tolist(), students)
+        )
+        all_ok &= check(f"{label} columnar factor codes match per-student analysis ({mismatches} mismatches)",
+                        mismatches == 0)
+        
+        expected = Counter(factor.code for student in students for factor in service._analyze_factors(student, 0.0))
+        counts = service.factor_counts(students)
+        all_ok &= check(f"{label} cohort factor counts", all(counts[code] == expected[code] for code in counts))
+    
+    print("\n" + "=" * 70)
+    print("✓ SUCCESS!" if all_ok else "✗ FAILED")
+
+
+main()
@@ -0,0 +1,83 @@
+"""
+Parity test for folded KMeans cluster assignment (no server needed).
+Checks that FoldedKMeans gives the same labels as
+kmeans.predict(scaler.transform(X)) and compares single-row latency.
+Run from the backend directory: python tests/test_kmeans_fast.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.kmeans_fast import FoldedKMeans
+
+rng = np.random.default_rng(42)
+X_train = rng.normal(loc=[10, 50, 0.5, 3], scale=[3, 20, 0.2, 1], size=(3000, 4))
+scaler = StandardScaler().fit(X_train)
+models = {"Synthetic (k=5)": (KMeans(n_clusters=5, n_init=10, random_state=0).fit(scaler.transform(X_train)), scaler)}
+
+# The deployed recommendation clustering (scaler fitted with feature names)
+recommendation_path = Path(__file__).parent.parent / "app" / "models" / "program_recommendation_model(obj3).pkl"
+if recommendation_path.exists():
+    recommendation = joblib.load(recommendation_path)
+    models["Recommendation model (obj3)"] = (recommendation["kmeans_model"], recommendation["cluster_scaler"])
+
+
+def _frame(X, fitted_scaler):
+    """Scalers fitted with feature names expect a DataFrame."""
+    return pd.DataFrame(X, columns=fitted_scaler.feature_names_in_)
+
+
+def main():
+    print("=" * 70)
+    print("FOLDED KMEANS TEST")
+    print("=" * 70)
+    
+    all_ok = True
+    for name, (kmeans, fitted_scaler) in models.items():
+        folded = FoldedKMeans(kmeans, fitted_scaler)
+        n_features = folded.n_features
+        mean, scale = fitted_scaler.mean_, fitted_scaler.scale_
+        
+        # Wide random rows plus rows right between two centroids
+        X = mean + scale * rng.normal(scale=1.5, size=(200000, n_features))
+        C = folded.centroids
+        boundary = np.concatenate([
+            (C[i] + C[j]) / 2 + rng.normal(scale=1e-6, size=(5000, n_features))
+            for i in range(len(C)) for j in range(i + 1, len(C))
+        ])
+        X = np.vstack([X, boundary])
+        
+        with_names = getattr(fitted_scaler, "feature_names_in_", None) is not None
+        scaled = fitted_scaler.transform(X if not with_names else _frame(X, fitted_scaler))
+        expected = kmeans.predict(scaled)
+        mismatches = int((folded.predict(X) != expected).sum())
+        ok = mismatches == 0
+        all_ok &= ok
+        
+        row = X[0]
+        start = time.perf_counter()
+        for _ in range(2000):
+            folded.predict(row)
+        folded_us = (time.perf_counter() - start) / 2000 * 1e6
+        start = time.perf_counter()
+        for _ in range(200):
+            kmeans.predict(fitted_scaler.transform(X[:1] if not with_names else _frame(X[:1], fitted_scaler)))
+        sklearn_us = (time.perf_counter() - start) / 200 * 1e6
+        
+        print(f"\n{name}: {'✓' if ok else '✗'} {mismatches} mismatches in {len(X)} rows")
+        print(f"   Single row: folded {folded_us:.1f} µs vs scaler+KMeans {sklearn_us:.1f} µs")
+    
+    print("\n" + "=" * 70)
+    print("✓ SUCCESS!" if all_ok else "✗ FAILED")
+
+
+main()
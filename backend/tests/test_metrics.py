@@ -0,0 +1,46 @@
+"""
+In-process test of the /metrics exposition (no server needed).
+Run from the backend directory: python tests/test_metrics.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.metrics import Histogram, render_metrics, stage_timer
+
+
+def main():
+    print("=" * 70)
+    print("METRICS TEST")
+    print("=" * 70)
+    
+    # Buckets are cumulative and inclusive of their upper bound
+    histogram = Histogram("test_seconds", "Test histogram", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "model")
+    lines = histogram.render()
+    expected = [
+        'test_seconds_bucket{stage="model",le="0.1"} 2',
+        'test_seconds_bucket{stage="model",le="1"} 3',
+        'test_seconds_bucket{stage="model",le="+Inf"} 4',
+        'test_seconds_count{stage="model"} 4',
+    ]
+    buckets_ok = all(line in lines for line in expected)
+    print(f"\n1. Cumulative buckets: {'✓' if buckets_ok else '✗'}")
+    for line in lines[2:]:
+        print(f"   {line}")
+    
+    # Stage timers show up in the rendered output
+    with stage_timer("test_endpoint", "preprocess"):
+        sum(range(1000))
+    text = render_metrics()
+    stage_ok = 'stratus_stage_duration_seconds_count{endpoint="test_endpoint",stage="preprocess"} 1' in text
+    print(f"\n2. Stage timer recorded: {'✓' if stage_ok else '✗'}")
+    
+    print("\n" + "=" * 70)
+    print("✓ SUCCESS!" if buckets_ok and stage_ok else "✗ FAILED")
+
+
+main()
@@ -0,0 +1,167 @@
+"""
+Model bundle test (no server needed).
+Exports every model pickle in app/models to a bundle in a temporary
+directory and checks that the bundle rebuilds the same object graph, that
+the services loaded from it predict exactly as from the pickle, that a
+bundle no longer matching its pickle is ignored, and that bundles naming
+anything outside ALLOWED_GLOBALS (eval, exec, getattr, __import__, attribute
+walks past an allowed name) are refused.
+Run from the backend directory: python tests/test_model_bundle.py
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import config
+from app.services.dropout_service import DropoutPredictionService
+from app.services.enrollment_service import EnrollmentForecastService
+from app.services.model_bundle import MANIFEST_FILE, BundleError, bundle_path, export_bundle, load_bundle
+from app.services.model_store import export_model_bundle, load_model_artifact
+from app.services.recommendation_service import ProgramRecommendationService
+from app.services.success_service import SuccessPredictionService
+from benchmarks.profiles import make_profiles
+
+# Manifest roots that would run code if the names they reference were resolved
+UNSAFE_ROOTS = {
+    "os.system": {"$reduce": "os:system", "args": {"$tuple": ["echo unsafe"]}},
+    "builtins.eval": {"$reduce": "builtins:eval", "args": {"$tuple": ["__import__('os').system('echo unsafe')"]}},
+    "builtins.exec": {"$reduce": "builtins:exec", "args": {"$tuple": ["import os; os.system('echo unsafe')"]}},
+    "builtins.getattr": {"$reduce": "builtins:getattr", "args": {"$tuple": [{"$global": "builtins:object"}, "__subclasses__"]}},
+    "builtins.__import__": {"$reduce": "builtins:__import__", "args": {"$tuple": ["os"]}},
+    "a walk through copyreg.__builtins__": {"$reduce": "copyreg:__builtins__.eval", "args": {"$tuple": ["1"]}},
+    "a walk past an allowed class": {"$global": "sklearn.pipeline:Pipeline.__init__.__globals__"},
+}
+
+SERVICES = [
+    ("dropout", DropoutPredictionService, lambda service, students: service.predict_many(students)),
+    ("success", SuccessPredictionService, lambda service, students: service.predict_many(students)),
+    ("recommendation", ProgramRecommendationService, lambda service, students: service.predict_many(students)),
+    ("enrollment", EnrollmentForecastService, lambda service, students: [service.forecast(years) for years in range(1, 11)]),
+]
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def difference(a, b, where="artifact"):
+    """First place where two object graphs differ (None when they are the same)."""
+    if type(a) is not type(b):
+        return f"{where}: {type(a).__name__} != {type(b).__name__}"
+    if isinstance(a, np.ndarray):
+        if a.dtype != b.dtype or a.shape != b.shape:
+            return f"{where}: {a.dtype}{a.shape} != {b.dtype}{b.shape}"
+        if a.dtype.hasobject:
+            return difference(list(a.ravel()), list(b.ravel()), where)
+        # Field by field: structured arrays (tree nodes) have uninitialized padding bytes
+        for field in a.dtype.names or (None,):
+            x, y = (a, b) if field is None else (a[field], b[field])
+            if not np.array_equal(x, y, equal_nan=x.dtype.kind in "fc"):
+                return f"{where}: array content"
+        return None
+    if isinstance(a, (list, tuple)):
+        if len(a) != len(b):
+            return f"{where}: length {len(a)} != {len(b)}"
+        return next((d for i, (x, y) in enumerate(zip(a, b)) if (d := difference(x, y, f"{where}[{i}]"))), None)
+    if isinstance(a, dict):
+        if list(a) != list(b):
+            return f"{where}: keys differ"
+        return next((d for key in a if (d := difference(a[key], b[key], f"{where}.{key}"))), None)
+    if isinstance(a, (str, int, float, bytes, bytearray, type(None), np.generic, np.dtype, type)) or callable(a):
+        return None if a == b or (a != a and b != b) else f"{where}: {a!r} != {b!r}"
+    return difference(a.__reduce_ex__(2)[1:], b.__reduce_ex__(2)[1:], f"{where}<{type(a).__name__}>")
+
+
+def _from_bundle(path: Path) -> bool:
+    """Whether the dropout artefact at path was loaded from its bundle (read-only mapped arrays)."""
+    return not load_model_artifact(path)["model"].coef_.flags.writeable
+
+
+def main():
+    print("=" * 70)
+    print("MODEL BUNDLE TEST")
+    print("=" * 70)
+    
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        models_dir = Path(tmp)
+        
+        # Same object graph as the pickle, for every shipped model
+        for source in sorted(config.MODELS_DIR.glob("*.pkl")):
+            path = models_dir / source.name
+            shutil.copy2(source, path)
+            bundle = export_model_bundle(path)
+            diff = difference(joblib.load(path), load_bundle(bundle))
+            all_ok &= check(f"{source.name}: bundle matches the pickle" + (f" ({diff})" if diff else ""), diff is None)
+        
+        # Services load the bundle (read-only mapped arrays) and predict exactly as from the pickle
+        for name, service_class, run in SERVICES:
+            path = models_dir / service_class.MODEL_FILE
+            if not path.exists():
+                print(f"- {name}: {service_class.MODEL_FILE} not found, skipped")
+                continue
+            students = make_profiles(name, 300, seed=3) if name != "enrollment" else None
+            from_bundle = service_class(model_path=path)
+            config.MODEL_BUNDLES = False
+            try:
+                from_pickle = service_class(model_path=path)
+            finally:
+                config.MODEL_BUNDLES = True
+            all_ok &= check(f"{name}: service predictions from the bundle match the pickle",
+                            run(from_bundle, students) == run(from_pickle, students))
+        
+        # Arrays loaded from a bundle are read-only views of its mapped arrays file
+        path = models_dir / DropoutPredictionService.MODEL_FILE
+        all_ok &= check("Artefact loaded from the bundle", _from_bundle(path))
+        
+        # A copied pickle (new modification time, same content) still uses its bundle
+        stamp = time.time() + 60
+        os.utime(path, (stamp, stamp))
+        all_ok &= check("Bundle used after the pickle is copied (content hash matches)", _from_bundle(path))
+        
+        # A replaced pickle makes the bundle stale: the new pickle is loaded
+        artifact = joblib.load(path)
+        artifact["threshold"] = 0.25
+        joblib.dump(artifact, path)
+        all_ok &= check("Stale bundle ignored after the pickle changes",
+                        load_model_artifact(path)["threshold"] == 0.25)
+        
+        # Bundles may only reference the exact names in ALLOWED_GLOBALS
+        export_model_bundle(path)
+        manifest_path = bundle_path(path) / MANIFEST_FILE
+        manifest = json.loads(manifest_path.read_text())
+        for name, root in UNSAFE_ROOTS.items():
+            manifest["root"] = root
+            manifest_path.write_text(json.dumps(manifest))
+            try:
+                load_bundle(bundle_path(path))
+                refused = False
+            except BundleError:
+                refused = True
+            all_ok &= check(f"Bundle referencing {name} refused", refused)
+        all_ok &= check("Refused bundle falls back to the pickle", load_model_artifact(path)["threshold"] == 0.25)
+        
+        # Nothing outside ALLOWED_GLOBALS can be exported either
+        try:
+            export_bundle({"callback": os.system}, models_dir / "unsafe.bundle")
+            refused = False
+        except BundleError:
+            refused = True
+        all_ok &= check("Export of os.system refused", refused)
+    
+    print("\n" + "=" * 70)
+    print("✓ SUCCESS!" if all_ok else "✗ FAILED")
+
+
+main()
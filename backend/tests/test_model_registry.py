@@ -0,0 +1,127 @@
+"""
+Model registry hot-reload test (no server needed).
+Publishes new dropout model versions into a temporary models directory and
+checks that they are swapped in while the previous service keeps working,
+that a half-copied file waits a poll, that a broken version is rejected
+without replacing the live one, that the prediction cache is purged on a
+swap and that removing versions rolls back to the newest remaining one.
+Run from the backend directory: python tests/test_model_registry.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import config
+from app.services.dropout_service import DropoutPredictionService
+from app.services.model_registry import ModelRegistry, discover_versions
+from app.services.prediction_cache import prediction_cache
+from app.services.warmup import DROPOUT_WARMUP_STUDENT, PROBES
+
+MODEL_FILE = DropoutPredictionService.MODEL_FILE
+STEM = Path(MODEL_FILE).stem
+
+
+def check(name: str, ok: bool) -> bool:
+    print(f"{'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def publish(models_dir: Path, version: str, source: Path = None) -> Path:
+    """Copy an artefact in as a new version, with a distinct modification time."""
+    target = models_dir / f"{STEM}@{version}.pkl"
+    shutil.copyfile(source or config.MODELS_DIR / MODEL_FILE, target)
+    stamp = time.time() + len(list(models_dir.iterdir()))
+    os.utime(target, (stamp, stamp))
+    return target
+
+
+def main():
+    print("=" * 70)
+    print("MODEL REGISTRY TEST")
+    print("=" * 70)
+    
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        models_dir = Path(tmp)
+        shutil.copyfile(config.MODELS_DIR / MODEL_FILE, models_dir / MODEL_FILE)
+        
+        registry = ModelRegistry(models_dir, poll_interval=0)
+        registry.register("dropout", MODEL_FILE, DropoutPredictionService, cache_namespace="dropout")
+        registry.set_probe("dropout", PROBES["dropout"])
+        
+        first = registry.get("dropout")
+        all_ok &= check("Base version loaded on first use",
+                        registry.status()[0]["active_version"] == "base" and registry.get("dropout") is first)
+        all_ok &= check("No swap without a new version", registry.check_for_updates() == [])
+        
+        # Natural version order: 10 is newer than 2
+        publish(models_dir, "2")
+        publish(models_dir, "10")
+        all_ok &= check("Versions discovered in natural order",
+                        [v.version for v in discover_versions(models_dir, MODEL_FILE)] == ["base", "2", "10"])
+        
+        # Cached results of the old version are purged on a swap
+        key = prediction_cache.make_key("dropout", registry.active_path("dropout"), DROPOUT_WARMUP_STUDENT)
+        prediction_cache.set(key, {"stale": True})
+        swapped = registry.check_for_updates()
+        second = registry.get("dropout")
+        all_ok &= check("Newest version swapped in",
+                        swapped == ["dropout"] and second is not first
+                        and registry.status()[0]["active_version"] == "10")
+        all_ok &= check("Previous service still serves in-flight requests",
+                        first.predict(DROPOUT_WARMUP_STUDENT) == second.predict(DROPOUT_WARMUP_STUDENT))
+        all_ok &= check("Prediction cache purged on swap", prediction_cache.get(key) is None)
+        
+        # Polling only loads a candidate that is unchanged since the previous poll
+        publish(models_dir, "11")
+        all_ok &= check("New file waits one poll", registry.check_for_updates(settle=True) == [])
+        all_ok &= check("Unchanged file swapped on the next poll",
+                        registry.check_for_updates(settle=True) == ["dropout"]
+                        and registry.status()[0]["active_version"] == "11")
+        
+        # A broken version is reported and never replaces the live service
+        live = registry.get("dropout")
+        broken = models_dir / f"{STEM}@12.pkl"
+        broken.write_bytes(b"not a pickle")
+        os.utime(broken, (time.time() + 100, time.time() + 100))
+        all_ok &= check("Broken version rejected",
+                        registry.check_for_updates() == [] and registry.get("dropout") is live
+                        and registry.status()[0]["active_version"] == "11"
+                        and registry.status()[0]["last_error"] is not None)
+        all_ok &= check("Rejected version not retried", registry.check_for_updates() == [])
+        
+        # A version that loads but fails its probe is rejected too
+        def failing_probe(service):
+            raise ValueError("probe prediction out of range")
+        registry.set_probe("dropout", failing_probe)
+        publish(models_dir, "13")
+        all_ok &= check("Version failing its probe rejected",
+                        registry.check_for_updates() == [] and registry.get("dropout") is live)
+        registry.set_probe("dropout", PROBES["dropout"])
+        
+        # Removing the newer files rolls back to the newest remaining version
+        for version in ("13", "12", "11", "10"):
+            (models_dir / f"{STEM}@{version}.pkl").unlink()
+        all_ok &= check("Rollback to the newest remaining version",
+                        registry.check_for_updates() == ["dropout"]
+                        and registry.status()[0]["active_version"] == "2")
+        
+        # A fresh registry falls back past a broken newest version
+        broken.write_bytes(b"not a pickle")
+        fresh = ModelRegistry(models_dir, poll_interval=0)
+        fresh.register("dropout", MODEL_FILE, DropoutPredictionService)
+        fresh.get("dropout")
+        all_ok &= check("First load falls back past a broken version",
+                        fresh.status()[0]["active_version"] == "2" and fresh.status()[0]["last_error"] is not None)
+    
+    print("\n" + "=" * 70)
+    print("✓ SUCCESS!" if all_ok else "✗ FAILED")
+
+
+main()
@@ -0,0 +1,72 @@
+"""
+Segmentation engine test (no server needed).
+Checks that the lookup-array encoding plus folded KMeans assignment gives the
+same clusters as scaler.transform + KMeans.predict on the training notebook's
+encoding, and that batch and single-student segmentation agree.
+Run from the backend directory: python tests/test_segmentation_batch.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.profiles import make_profiles
+from app.services.segmentation_service import segmentation_service
+
+
+def notebook_encoding(student: dict) -> list:
+    """Encode one student the way the training notebook did (unknown categories at the scaler mean)."""
+    service = segmentation_service
+    mean = service.scaler.mean_
+    governorate = service.governorate_index.get(student["origin_governorate"], mean[4])
+    program = service.program_index.get(student["chosen_program"], mean[5])
+    return [
+        int(student["scholarship_status"] == "Full Scholarship"),
+        int(student["scholarship_status"] == "Partial Scholarship"),
+        int(student["scholarship_status"] == "Self-Funded"),
+        student["baccalaureate_score"],
+        governorate,
+        program,
+    ]
+
+
+def main():
+    print("=" * 70)
+    print("SEGMENTATION BATCH TEST")
+    print("=" * 70)
+    
+    service = segmentation_service
+    if service.cluster_assigner is None:
+        print("\n✗ Clustering model not loaded (running on fallback rules)")
+        return
+    
+    students = make_profiles("segmentation", 5000, seed=11)
+    
+    start = time.perf_counter()
+    batch = service.segment_many(students)
+    batch_ms = (time.perf_counter() - start) * 1000
+    
+    X = pd.DataFrame([notebook_encoding(s) for s in students], columns=service.FEATURES)
+    expected = service.kmeans_model.predict(service.scaler.transform(X))
+    mismatches = sum(int(result["cluster"] != cluster) for result, cluster in zip(batch, expected))
+    parity_ok = mismatches == 0
+    print(f"\n1. Matches scaler + KMeans.predict: {'✓' if parity_ok else '✗'} "
+          f"({mismatches} mismatches, {batch_ms:.1f} ms for {len(students)} students)")
+    
+    singles = [service.segment_student(**s) for s in students[:500]]
+    single_ok = singles == batch[:500]
+    print(f"\n2. Single-student results match the batch: {'✓' if single_ok else '✗'}")
+    
+    counts = pd.Series([r["cluster"] for r in batch]).value_counts().sort_index()
+    for cluster, count in counts.items():
+        print(f"   cluster {cluster} ({service.cluster_interpretations[cluster]}): {count}")
+    
+    print("\n" + "=" * 70)
+    print("✓ SUCCESS!" if parity_ok and single_ok else "✗ FAILED")
+
+
+main()
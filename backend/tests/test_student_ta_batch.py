@@ -0,0 +1,56 @@
+"""
+Test for the batch TA eligibility endpoint: checks a small group of applicants
+in one call and checks that each result matches the single-student endpoint.
+"""
+
+import requests
+
+single_url = "http://localhost:8000/api/student/ta-check"
+batch_url = "http://localhost:8000/api/student/ta-check/batch"
+
+base_student = {
+    "previous_years_average": 15.0,
+    "communication_skills_score": 8,
+    "technical_skills_score": 8,
+    "soft_skills_score": 7,
+    "internship_completed": 1,
+    "internship_duration_months": 4,
+    "projects_completed": 3,
+    "portfolio_exists": 1,
+    "linkedin_profile": 0,
+    "teaching_interest": 8,
+    "english_level": "B2"
+}
+
+# Small group of applicants: cross every academic band
+applicants = [dict(base_student, previous_years_average=avg) for avg in (10.0, 12.0, 14.0, 15.5, 16.0, 18.5)]
+
+print("=" * 70)
+print("TESTING BATCH TA ELIGIBILITY API")
+print("=" * 70)
+
+try:
+    response = requests.post(batch_url, json={"students": applicants})
+    
+    if response.status_code == 200:
+        result = response.json()
+        print(f"\nChecked {result['count']} students, {result['eligible_count']} eligible")
+        
+        mismatches = 0
+        for student, batch_result in zip(applicants, result["results"]):
+            single_result = requests.post(single_url, json=student).json()
+            match = single_result == batch_result
+            mismatches += 0 if match else 1
+            print(f"  avg={student['previous_years_average']:>5}: "
+                  f"{'Eligible' if batch_result['employable'] else 'Not eligible':<13} "
+                  f"p={batch_result['probability']:6.2f}% "
+                  f"{'✓' if match else '✗ differs from single endpoint'}")
+        
+        print("\n" + "=" * 70)
+        print("✓ SUCCESS! Batch matches single checks" if mismatches == 0 else f"✗ {mismatches} mismatches")
+    else:
+        print(f"ERROR: {response.status_code}")
+        print(response.text)
+        
+except Exception as e:
+    print(f"ERROR: {e}")
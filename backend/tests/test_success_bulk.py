@@ -0,0 +1,46 @@
+"""Test the streaming bulk success endpoint with a small NDJSON upload"""
+import requests
+import json
+
+url = "http://localhost:8000/api/predict/success/bulk"
+
+students = [
+    {
+        "gender": 1,
+        "age": 19,
+        "origin_governorate": "Tunis",
+        "baccalaureate_score": score,
+        "baccalaureate_type": "Math",
+        "enrollment_year": 2024,
+        "scholarship_status": "Partial Scholarship",
+        "campus": "Tunis Main"
+    }
+    for score in (9.5, 12.0, 14.5, 17.0)
+]
+
+# One invalid record to check per-row error reporting
+students.append({"gender": 1, "age": 12})
+
+body = "\n".join(json.dumps(student) for student in students)
+
+print("Testing bulk success endpoint...")
+
+try:
+    response = requests.post(url, files={"file": ("roster.ndjson", body, "application/x-ndjson")}, stream=True)
+    print(f"Status Code: {response.status_code}")
+    
+    if response.status_code == 200:
+        print(f"\n✅ SUCCESS!")
+        for line in response.iter_lines():
+            result = json.loads(line)
+            if "error" in result:
+                print(f"  row {result['row']}: error - {result['error']}")
+            else:
+                print(f"  row {result['row']}: {result['success_prediction']} ({result['success_probability']:.3f})")
+    else:
+        print(f"\n❌ ERROR!")
+        print(f"Response: {response.text}")
+        
+except Exception as e:
+    print(f"\n❌ EXCEPTION!")
+    print(f"Error: {str(e)}")
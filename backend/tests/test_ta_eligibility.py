@@ -7,7 +7,7 @@ print("TA ELIGIBILITY PREDICTION TEST")
 print("="*70)
 
 try:
-    response = requests.get(url)
+    response = requests.get(url, params={"page": 1, "page_size": 5, "sort_by": "eligibility_score", "order": "desc"})
     
     if response.status_code == 200:
         result = response.json()
@@ -19,6 +19,10 @@ try:
         print(f"Predicted employable students  : {result['employable_students']}")
         print(f"Employability rate             : {result['employability_rate']:.2f}%")
         print(f"\nMessage: {result['message']}")
+        print(f"\nTop eligible students (page {result['page']}/{result['total_pages']}, sorted by {result['sort_by']} {result['order']}):")
+        for student in result['eligible_students_list']:
+            print(f"  {student['student_id']}  {student['name']:<20} {student['program']:<22} "
+                  f"avg {student['average_score']:5.2f}  score {student['eligibility_score']:6.2f}")
         print("="*70)
     else:
         print(f"✗ Error: {response.status_code}")
@@ -0,0 +1,76 @@
+"""
+TA roster scoring test (no server needed).
+Writes a synthetic roster CSV, checks the vectorized roster scores against the
+per-student TA check, then checks that results are cached until the file
+changes and that pages/sorting slice the eligible list correctly.
+Run from the backend directory: python tests/test_ta_roster.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.profiles import make_profiles
+from app.services.student_ta_eligibility_service import student_ta_eligibility_service
+from app.services.ta_eligibility_service import ta_eligibility_service
+
+PROGRAMS = ["Cybersecurity", "Software Engineering", "Data Science", "Information Systems"]
+
+
+def main():
+    print("=" * 70)
+    print("TA ROSTER TEST")
+    print("=" * 70)
+    
+    students = make_profiles("student_ta", 20000, seed=7)
+    roster = pd.DataFrame(students)
+    roster.insert(0, "student_id", [f"STU{2024000 + i + 1:07d}" for i in range(len(roster))])
+    roster.insert(1, "name", [f"Student {i + 1}" for i in range(len(roster))])
+    roster["program"] = [PROGRAMS[i % len(PROGRAMS)] for i in range(len(roster))]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        ta_eligibility_service.roster_path = Path(tmp) / "roster.csv"
+        roster.to_csv(ta_eligibility_service.roster_path, index=False)
+        
+        # 1. Vectorized roster scores vs the individual TA check
+        start = time.perf_counter()
+        result = ta_eligibility_service.predict_employability(page=1, page_size=len(roster))
+        first_ms = (time.perf_counter() - start) * 1000
+        expected = {}
+        for row, student in zip(roster.itertuples(), students):
+            employable, probability = student_ta_eligibility_service._calculate_fallback_prediction(student)
+            if employable:
+                expected[row.student_id] = round(probability, 2)
+        actual = {item["student_id"]: item["eligibility_score"] for item in result["eligible_students_list"]}
+        parity_ok = actual == expected and result["employable_students"] == len(expected)
+        print(f"\n1. Roster scores match the individual check: {'✓' if parity_ok else '✗'} "
+              f"({len(expected)}/{len(roster)} eligible, {first_ms:.1f} ms)")
+        
+        # 2. Cached until the file changes
+        start = time.perf_counter()
+        ta_eligibility_service.predict_employability()
+        cached_ms = (time.perf_counter() - start) * 1000
+        roster.iloc[:1000].to_csv(ta_eligibility_service.roster_path, index=False)
+        rescored = ta_eligibility_service.predict_employability()
+        cache_ok = rescored["total_students"] == 1000
+        print(f"\n2. Cached ({cached_ms:.2f} ms) and rescored after the file changed: {'✓' if cache_ok else '✗'}")
+        
+        # 3. Pagination and sorting
+        full = ta_eligibility_service.predict_employability(page=1, page_size=1000, sort_by="average_score", order="asc")
+        pages = [ta_eligibility_service.predict_employability(page=page, page_size=7, sort_by="average_score", order="asc")
+                 for page in range(1, full["employable_students"] // 7 + 2)]
+        stitched = [item for page in pages for item in page["eligible_students_list"]]
+        scores = [item["average_score"] for item in stitched]
+        paging_ok = stitched == full["eligible_students_list"] and scores == sorted(scores)
+        print(f"\n3. Pages stitch back into the sorted list: {'✓' if paging_ok else '✗'} ({len(stitched)} students)")
+    
+    print("\n" + "=" * 70)
+    print("✓ SUCCESS!" if parity_ok and cache_ok and paging_ok else "✗ FAILED")
+
+
+main()